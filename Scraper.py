@@ -1,34 +1,43 @@
-import requests
-import json
-import random
-from bs4 import BeautifulSoup
-from threading import Thread, current_thread
-from time import sleep
-from urllib.parse import urljoin
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, Future
+from threading import Condition, Thread
+from questions import QuestionIndex, TENSES, resolve_weights
+from fetching import AsyncFetcher, ResponseCache, UrlResolutions
+from parsing import get_parser
+from storage import StorageService, LazyVerbData
+from forms import AnswerMatcher, FormIndex
+from query import QueryParser
+from srs import SpacedRepetition, GRADE_CORRECT, GRADE_WRONG
+from progress import ImportProgress, print_progress
+from refresh import RefreshJob, page_digest
+from packs import read_pack, write_pack
 
 
 class ThreadLimiter:
     """Convenience class for limiting the maximum amount of threads executing certain tasks"""
 
-    def __init__(self, tasks: list, args: list, max_threads: int, on_finish=None, allow_empty_tasks: bool = False):
+    def __init__(self, tasks: list, args: list, max_threads: int, on_finish=None, allow_empty_tasks: bool = False,
+                 on_progress=None):
         """
         :param tasks: Thread tasks (which will immediately be run on initialization)
         :param args: Arguments corresponding to thread tasks (defaults to [], which represents no arguments)
-        :param max_threads: Maximum amount of threads this class should run (Note that it runs an additional manage thread)
-        :param on_finish: Optional on_finish callback run on the manage thread
+        :param max_threads: Maximum amount of threads this class should run
+        :param on_finish: Optional on_finish callback run on the thread that finished the last task
         :param allow_empty_tasks: Allow the initialization of the class without starting the tasks due to having none
+        :param on_progress: Optional callback on_progress(finished, total, future) run after every finished task
         :return: Runs multiple tasks threaded with a given limit of how much should run at the same time
         """
-        self.current_threads = []
         self.allow_empty = allow_empty_tasks
+        self.tasks = tasks
+        self.args = args
+        self.max_threads = max_threads
+        self.on_finish = on_finish
+        self.on_progress = on_progress
+        self.futures = []
+        self.finished = 0
+        self.condition = Condition()
         if tasks and max_threads > 0:
-            self.tasks = tasks
-            self.args = args if args else [[] for _ in range(len(self.tasks))]
-            self.max_threads = max_threads
-            self.managed = False
-            self.active = True
-            self.on_finish = on_finish
-            Thread(target=self.manage).start()
+            self.__submit()
         elif (not tasks and not self.allow_empty) or max_threads < 0:
             raise ValueError("Parameter tasks must not be empty" if not tasks else "Parameter max_threads must be greater than 0")
         else:
@@ -37,58 +46,82 @@ class ThreadLimiter:
     def restart(self) -> None:
         """
         This should be called if the __init__ method allowed the emptiness of the tasks parameter and therefore did
-        not start the manage thread along with the tasks to be threaded
+        not start the tasks to be threaded
 
-        :return: Calls a certain part of the __init__ method for setup and then restarts the execution of tasks
+        :return: Restarts the execution of tasks
         """
-        if self.tasks:
-            self.args = self.args if self.args else [[] for _ in range(len(self.tasks))]
-            self.managed = False
-            self.active = True
-            Thread(target=self.manage).start()
+        if self.tasks and self.max_threads > 0:
+            self.__submit()
         elif (not self.tasks and not self.allow_empty) or self.max_threads < 0:
             raise ValueError(
                 "tasks must not be empty" if not self.tasks else "max_threads must be greater than 0")
         else:
             self.active = False
 
-    def manage(self) -> None:
+    def __submit(self) -> None:
+        self.args = self.args if self.args else [[] for _ in range(len(self.tasks))]
+        with self.condition:
+            self.active = True
+            self.finished = 0
+            executor = ThreadPoolExecutor(max_workers=self.max_threads)
+            self.futures = [executor.submit(task, *args) for task, args in zip(self.tasks, self.args)]
+        for future in self.futures:
+            future.add_done_callback(self.__task_done)
+        executor.shutdown(wait=False)
+
+    def __task_done(self, future: Future) -> None:
+        with self.condition:
+            self.finished += 1
+            finished, total = self.finished, len(self.futures)
+        if self.on_progress is not None:
+            self.on_progress(finished, total, future)
+        if finished == total:
+            try:
+                if self.on_finish is not None:
+                    self.on_finish()
+            finally:
+                # Even if on_finish fails, so join does not block forever
+                with self.condition:
+                    self.active = False
+                    self.tasks.clear()
+                    self.args.clear()
+                    self.condition.notify_all()
+
+    def cancel(self) -> int:
         """
-        :return: Manages the currently running threads and starts new ones once old ones have finished executing
+        :return: Cancels all tasks that have not started yet and returns how many were cancelled (on_finish is still
+                 called once the running tasks are done)
         """
-        for i, (task, args) in enumerate(zip(self.tasks, self.args)):
-            if len([t for t in self.current_threads if t.is_alive()]) < self.max_threads:
-                if i != len(self.tasks)-1:
-                    T = Thread(target=task, args=(*args,))
-                    T.start()
-                    self.current_threads.append(T)
-                else:
-                    self.current_threads.append(current_thread())
-                    task(*args)
-                    self.current_threads.remove(current_thread())
-                self.managed = True
-            else:
-                while len([t for t in self.current_threads if t.is_alive()]) == self.max_threads:
-                    sleep(0.05)
-        self.join()
-        if self.on_finish is not None:
-            self.on_finish()
-        self.active = False
-        self.tasks.clear()
-        self.args.clear()
+        return sum(future.cancel() for future in list(self.futures))
 
-    def join(self, checking_delay: int = 0.05) -> None:
+    @property
+    def results(self) -> list:
+        """Results of the tasks in order (the exception for failed tasks, None for cancelled or unfinished ones)"""
+        return [None if not future.done() or future.cancelled() else future.exception() or future.result()
+                for future in self.futures]
+
+    def join(self, timeout: float = None) -> bool:
         """
-        :param checking_delay: The delay to wait between calling the is_alive() method of all running threads
-        :return: Waits until the is_alive() method of all running threads returns False indicating they have finished
+        :param timeout: Maximum amount of seconds to wait (None to wait until finished)
+        :return: Blocks until all tasks and the on_finish callback have finished and returns whether they did
         """
-        while bool([t for t in self.current_threads if t.is_alive()]) or not self.managed:
-            sleep(checking_delay)
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.active, timeout=timeout)
 
 
 class VerbenScraper:
-    def __init__(self):
-        self.base_address = "https://www.frag-caesar.de/lateinwoerterbuch/"
+    def __init__(self, base_address: str = "https://www.frag-caesar.de/lateinwoerterbuch/",
+                 cache_path: str = "./cache.db", offline: bool = False, parser: str = "html.parser",
+                 storage: StorageService = None):
+        """
+        :param base_address: Address the dictionary pages are requested from (can point to a local server serving
+                             recorded pages)
+        :param cache_path: Path of the persistent response cache (which also stores the resolved page urls)
+        :param offline: Whether to only serve pages from the response cache
+        :param parser: Parser backend for the pages ('html.parser', 'lxml' or 'auto', see parsing.get_parser)
+        :param storage: StorageService the verbs are saved with (shared with the app, by default a new one is opened)
+        """
+        self.base_address = base_address
         self.base_address_extension = "-uebersetzung.html"
         self.headers = {
             'authority': 'www.frag-caesar.de',
@@ -108,266 +141,494 @@ class VerbenScraper:
             'upgrade-insecure-requests': '1',
             'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/113.0.0.0 Safari/537.36 OPR/99.0.0.0'
         }
+        self.storage = storage if storage is not None else StorageService()
         self.data = self.load_data()
-        self.session = requests.session()
-        self.failures = []
-        self.success = []
+        self.forms = FormIndex()
+        self.query = QueryParser()
+        self.scheduler = SpacedRepetition(self.storage)
+        self.refresh_job = RefreshJob(self.storage)
+        self.scheduled_options = None
+        self.scheduled_excluded = None
+        # Only the verb names are loaded up front, the index loads the data of a verb once it is drawn and builds the
+        # rest in the background (filling the form index along the way)
+        self.index = QuestionIndex(loader=self.__load_verb)
+        self.index.add_pending(self.data)
+        self.synced_version = self.data.version
+        Thread(target=self.__load_background, daemon=True).start()
+        self.cache = ResponseCache(cache_path, offline=offline)
+        self.fetcher = AsyncFetcher(self.headers, cache=self.cache)
+        self.resolutions = UrlResolutions(cache_path)
+        self.parser = get_parser(parser)
+
+    def search_url(self, verb_base: str) -> str:
+        return f"{self.base_address}{verb_base}{self.base_address_extension}"
 
     def get_data(self, verb_base: str, exclude_supina: bool = False) -> dict:
-        response = self.session.get(f"{self.base_address}{verb_base}{self.base_address_extension}", headers=self.headers)
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        if (selection := soup.find("div", attrs={"id": "testimonials-1"})) is not None:
-            all_verb_options = [sel for sel in selection.find_all("li", attrs={"class": "list-group-item list-toggle"})
-                                if sel.find("span", attrs={"class": "badge badge-orange rounded badge-wordtype"}).text == "Verb"]
-            if all_verb_options:
-                response = self.session.get(urljoin(self.base_address, all_verb_options[0].find("a").attrs["href"]),
-                                            headers=self.headers)
-                soup = BeautifulSoup(response.text, "html.parser")
-            else:
-                return {}
-        try:
-            title_translation_dict = {"Imperative": "Imperativ", "Infinite": "Infinitiv"}
-            content = [child for child in soup.find("div", attrs={"id": "vtab-1"}).children if not child.text == "\n"]
-            grouped_content = {title_translation_dict.get(a.text, a.text): self.extract_from_toggle_element(b) for a, b in zip(content[::2], content[1::2])}
-            if exclude_supina:
-                if "Supina" in grouped_content.keys():
-                    del grouped_content["Supina"]
-            else:
-                grouped_content.update({"Supina": dict(zip(*grouped_content.get("Supina").items()))})
-            try:
-                grouped_content.update({"Gerundivum": grouped_content.get("Gerundivum").get("PPP")})
-                grouped_content.update({"Imperativ": {"Imperativ I": grouped_content.get("Imperativ").get("Aktiv"),
-                                        "Imperativ II": grouped_content.get("Imperativ").get("Passiv")}})
-            finally:
-                return {soup.find("div", attrs={"class": "table-responsive"}).find("td", attrs={"class": "eh2"}).text: grouped_content}
-        except Exception:
-            return {}
+        if (url := self.resolutions.get(verb_base)) is not None:
+            if result := self.parse_page(self.fetcher.get(url), exclude_supina, follow=False):
+                return result
+        url = self.search_url(verb_base)
+        result = self.parse_page(self.fetcher.get(url), exclude_supina)
+        if isinstance(result, str):
+            url = result
+            result = self.parse_page(self.fetcher.get(url), exclude_supina, follow=False)
+        self.remember_resolution(verb_base, url, result)
+        return result
+
+    async def get_data_async(self, fetch, verb_base: str, exclude_supina: bool = False) -> dict:
+        """
+        :param fetch: Coroutine function fetching the text of an url (see AsyncFetcher)
+        :return: Same as get_data, but fetches on the running event loop and parses in a worker thread
+        """
+        loop = asyncio.get_running_loop()
+        if (url := self.resolutions.get(verb_base)) is not None:
+            if result := await loop.run_in_executor(None, self.parse_page, await fetch(url), exclude_supina, False):
+                return result
+        url = self.search_url(verb_base)
+        result = await loop.run_in_executor(None, self.parse_page, await fetch(url), exclude_supina)
+        if isinstance(result, str):
+            url = result
+            result = await loop.run_in_executor(None, self.parse_page, await fetch(url), exclude_supina, False)
+        self.remember_resolution(verb_base, url, result)
+        return result
 
-    def multi_update_data(self, new_words: list, exclude_supina: bool = False, save: bool = True, joining: bool = True) -> ThreadLimiter:
-        Limiter = ThreadLimiter([self.update_data for _ in range(len(new_words))], [[word.strip(), exclude_supina] for word in new_words], 10, on_finish=lambda *_: self.multi_update_on_finish_callback(save))
+    def remember_resolution(self, verb_base: str, url: str, result: dict) -> None:
+        """
+        :return: Stores the url of the conjugation page for the looked up word and the verb's canonical name, so
+                 later lookups and refreshes skip the search page
+        """
+        if result:
+            self.resolutions.put({verb_base: url, next(iter(result)): url})
+
+    def parse_page(self, html: str, exclude_supina: bool = False, follow: bool = True):
+        """
+        :param html: Text of a search result or conjugation page
+        :param exclude_supina: Whether to leave out the Supina
+        :param follow: Whether html may be a search result page
+        :return: The url of the conjugation page to follow if html is a search result page listing a verb, else the
+                 parsed data of the conjugation page ({} if nothing was found)
+        """
+        return self.parser.parse_page(html, self.base_address, exclude_supina=exclude_supina, follow=follow)
+
+    def multi_update_data(self, new_words: list, exclude_supina: bool = False, save: bool = True, joining: bool = True,
+                          progress: ImportProgress = None) -> ThreadLimiter:
+        """
+        :param progress: ImportProgress the events of the import are emitted to (a new one if None)
+        """
+        progress = progress if progress is not None else ImportProgress()
+        new_words = [word.strip() for word in new_words]
+        progress.queue(new_words)
+        Limiter = ThreadLimiter([self.async_update_data], [[new_words, exclude_supina, progress]], 1,
+                                on_finish=lambda *_: self.multi_update_on_finish_callback(save, progress))
         if joining:
             Limiter.join()
         return Limiter
 
-    def multi_update_on_finish_callback(self, saving: bool):
-        if saving:
-            self.save_data()
+    def async_update_data(self, new_words: list, exclude_supina: bool = False, progress: ImportProgress = None) -> None:
+        """
+        :return: Fetches and adds the data of all given verbs concurrently through self.fetcher (blocks until done)
+        """
+        progress = progress if progress is not None else ImportProgress()
 
-    def update_data(self, verb_base: str, exclude_supina: bool = False, save: bool = False) -> None:
-        try:
-            new_data = self.get_data(verb_base, exclude_supina=exclude_supina)
-            if new_data:
-                self.success.append(list(new_data.keys())[0])
-                self.data.update(new_data)
-                if save:
-                    self.save_data()
-            else:
-                self.failures.append(verb_base)
-        except Exception:
-            self.failures.append(f"{verb_base}(Verbindungsfehler)")
+        async def worker(fetch, verb_base):
+            try:
+                result = await self.get_data_async(self.__reporting(fetch, verb_base, progress), verb_base,
+                                                   exclude_supina=exclude_supina)
+            except Exception:
+                progress.failed(verb_base, "Verbindungsfehler")
+                return
+            try:
+                self.add_data(verb_base, result, progress=progress)
+            except Exception:
+                # Otherwise swallowed by the fetcher's gather, leaving the verb neither parsed nor failed
+                progress.failed(verb_base, "Verarbeitungsfehler")
 
-    def extract_from_toggle_element(self, element) -> dict:
-        tables = element.find_all("table")
-        special_table = tables[0].find("tr").text.strip().replace("\n", "") == "MaskulinumFemininumNeutrum"
-        infinitive_table_counter = 0
-        found = {"Aktiv": {}, "Passiv": {}} if not special_table else {"PPP": {"Singular": {}, "Plural": {}},
-                                                                       "PPA": {"Singular": {}, "Plural": {}},
-                                                                       "PFA": {"Singular": {}, "Plural": {}}}
-        for i, table in enumerate(tables):
-            if not special_table:
-                for tr in table.find_all("tr"):
-                    if tr.text.strip().replace("\n", "") not in ["Passiv", "LateinDeutsch", "Latein", "Aktiv", "Supin I	Supin II", ]:
-                        tds = tr.find_all("td")
-                        try:
-                            found.get("Aktiv" if not i and not infinitive_table_counter else "Passiv").update({tds[0].text: self.__get_td_text(tds[1])})
-                        except AttributeError:
-                            found.get("Aktiv" if not i and not infinitive_table_counter else "Passiv").update({tds[0].text: tds[1].text})
-                    elif len(tables) == 1 and tr.text.strip().replace("\n", "") == "Passiv":
-                        infinitive_table_counter += 1
-            else:
-                for tr in table.find_all("tr"):
-                    if tr.text.strip().replace("\n", "") not in ["Passiv", "LateinDeutsch", "Latein", "Aktiv",
-                                                                 "MaskulinumFemininumNeutrum"]:
-                        tds = tr.find_all("td")
-                        try:
-                            found.get("PPP" if i < 2 else "PPA" if i < 4 else "PFA").get("Singular" if not i % 2 else "Plural").update(
-                                {tds[0].text: {"Maskulinum": self.__get_td_text(tds[1]),
-                                               "Femininum": self.__get_td_text(tds[2]),
-                                                "Neutrum": self.__get_td_text(tds[3])}})
-                        except AttributeError:
-                            found.get("PPP" if i < 2 else "PPA" if i < 4 else "PFA").get(
-                                "Singular" if not i % 2 else "Plural").update(
-                                {tds[0].text: {"Maskulinum": tds[1].text,
-                                               "Femininum": tds[2].text,
-                                               "Neutrum": tds[3].text}})
-        return found if special_table or found.get("Passiv") else found.get("Aktiv")
+        self.fetcher.run(new_words, worker)
 
     @staticmethod
-    def __get_td_text(element) -> str:
-        if len(element.find_all("span", attrs={"class": "f"})) == 1:
-            return element.text
-        else:
-            return element.find("span", attrs={"class": "f"}).text
+    def __reporting(fetch, verb_base: str, progress: ImportProgress):
+        """
+        :return: fetch, emitting a fetched event of verb_base to progress for every fetched page
+        """
+        async def reporting_fetch(url):
+            text = await fetch(url)
+            progress.fetched(verb_base, url)
+            return text
 
-    @staticmethod
-    def load_data() -> dict:
+        return reporting_fetch
+
+    def multi_update_on_finish_callback(self, saving: bool, progress: ImportProgress = None):
+        try:
+            if saving:
+                self.save_data()
+                if progress is not None:
+                    progress.saved()
+        finally:
+            if progress is not None:
+                progress.finish()
+
+    def update_data(self, verb_base: str, exclude_supina: bool = False, save: bool = False,
+                    progress: ImportProgress = None) -> None:
+        try:
+            result = self.get_data(verb_base, exclude_supina=exclude_supina)
+        except Exception:
+            if progress is not None:
+                progress.failed(verb_base, "Verbindungsfehler")
+            return
+        self.add_data(verb_base, result, save=save, progress=progress)
+
+    def add_data(self, verb_base: str, new_data: dict, save: bool = False, progress: ImportProgress = None) -> None:
+        if new_data:
+            new_data = {verb: self.storage.schema.compact(paradigm) for verb, paradigm in new_data.items()}
+            with self.index.lock:
+                self.data.update(new_data)
+                self.index.update(new_data)
+                self.forms.update(new_data)
+            if save:
+                self.save_data()
+            if progress is not None:
+                progress.parsed(verb_base, next(iter(new_data)))
+        elif progress is not None:
+            progress.failed(verb_base, "nicht gefunden")
+
+    def import_pack(self, path: str, save: bool = True, progress: ImportProgress = None, batch_size: int = 256) -> list:
+        """
+        :param path: Path of a vocabulary pack (see packs.write_pack)
+        :param progress: ImportProgress the events of the import are emitted to (finished once the import is done)
+        :param batch_size: Amount of verbs added to the data and the indexes at once
+        :return: Adds the verbs of the pack that are not contained yet (streamed from the file, without scraping them)
+                 and returns their names. Invalid verbs are skipped, a ValueError is raised if the file is no pack of
+                 a supported version
+        """
+        progress = progress if progress is not None else ImportProgress()
+        added, batch = [], {}
         try:
-            with open("./data.json", "r") as data_file:
-                try:
-                    data = json.load(data_file)
-                except Exception:
-                    data = {}
-            return {} if not data else data if "options" not in data.keys() and "data" not in data.keys() else data.get("data")
-        except FileNotFoundError:
-            return {}
+            records = read_pack(path)
+            header = next(records)
+            if isinstance(count := header.get("count"), int) and count > 0:
+                progress.expect(count)
+            for name, paradigm, error in records:
+                progress.queue([name])
+                if error is not None:
+                    progress.failed(name, "ungültig")
+                elif name in self.data or name in batch:
+                    progress.unchanged(name)
+                else:
+                    batch[name] = self.storage.schema.compact(paradigm)
+                    if len(batch) >= batch_size:
+                        added.extend(self.__add_batch(batch, progress))
+                        batch = {}
+            added.extend(self.__add_batch(batch, progress))
+        except ValueError:
+            progress.failed(path, "ungültiges Paket")
+            raise
+        finally:
+            if save and added:
+                self.save_data()
+                progress.saved()
+            progress.finish()
+        return added
+
+    def __add_batch(self, batch: dict, progress: ImportProgress) -> dict:
+        # Like the stored verbs on startup, the imported ones are only indexed once they are drawn (or loaded in the
+        # background), so the import does not build the rows and forms of every verb up front
+        with self.index.lock:
+            self.data.update(batch)
+            self.index.add_pending(batch)
+        for name in batch:
+            progress.parsed(name, name)
+        return batch
+
+    def export_pack(self, path: str, names: list = None) -> int:
+        """
+        :param names: The verbs to export (all contained verbs if None)
+        :return: Writes the verbs to a vocabulary pack (see packs.write_pack) and returns how many were written
+        """
+        return write_pack(path, self.data, self.currently_contained if names is None else names)
+
+    def extract_from_toggle_element(self, element) -> dict:
+        return self.parser.extract_from_toggle_element(element)
+
+    def load_data(self) -> LazyVerbData:
+        return LazyVerbData(self.storage)
 
     def save_data(self) -> None:
-        with open("./data.json", "w") as data_file:
-            json.dump(self.data, data_file)
+        """
+        :return: Queues the verbs added, refreshed or deleted since the last save for the writer of the storage
+        """
+        self.data.save()
 
     def get_random_question(self, exclude_tense: list = 'Defaults to ["Supina"]', ignore_gender_parti: bool = False,
                             ignore_gender_gerundivum: bool = False, exclude_imperativ_2: bool = True,
                             exclude_non_existing: bool = True, ask_question_with_input: bool = False, weights="relevant",
-                            exclude_choice: list = None) -> tuple:
+                            exclude_choice: list = None, scheduled: bool = True) -> tuple:
         """
         :param exclude_tense: Which tenses to exclude
         :param ignore_gender_parti: Ignore gender for participles
         :param ignore_gender_gerundivum: Ignore gender for gerundivum
         :param exclude_imperativ_2: Only ask about the Imperativ I (exclude Imperative II)
         :param exclude_non_existing: Whether to exclude questions that don't have an answer
-        :param weights: Weights for the random selection of tenses (list of ints with len 16). Presets: 'relevant', 'basic', 'gerund', 'partizip', 'special', 'supina'
+        :param weights: Weights for the random selection of tenses (list of ints with len 16). Presets: 'relevant', 'basic', 'gerund', 'partizip', 'special', 'supina', 'zeiten'
         :param ask_question_with_input: Whether to enter an interactive (question -> user input -> solution)-state?
         :param exclude_choice: Which words to exclude
+        :param scheduled: Whether to ask the slots that are due for a review first (see record_answer), new questions
+                          are only drawn if none of them is due
         :return: A tuple with the question (str) at index 0 and the answer(s) (list -> multiple or str -> one) at index 1
         """
-        question = self.__get_random_question(exclude_tense, ignore_gender_parti, ignore_gender_gerundivum, exclude_imperativ_2, weights, exclude_choice=exclude_choice)
-        while ("existiert nicht" in question[1] or not all(question)) and exclude_non_existing:
-            question = self.__get_random_question(exclude_tense, ignore_gender_parti, ignore_gender_gerundivum,
-                                                  exclude_imperativ_2, exclude_choice=exclude_choice)
+        if exclude_tense == 'Defaults to ["Supina"]':
+            exclude_tense = ["Supina"]
+        self.sync_index()
+        question = None
+        if scheduled:
+            question = self.scheduler.next_due(lambda slot: self.index.slot_question(
+                slot, exclude_tense, ignore_gender_parti, ignore_gender_gerundivum, exclude_imperativ_2,
+                exclude_non_existing, weights, exclude_choice=exclude_choice), self.__scheduled_excluded(
+                exclude_tense, ignore_gender_parti, ignore_gender_gerundivum, exclude_imperativ_2,
+                exclude_non_existing, weights, exclude_choice))
+        if question is None:
+            question = self.index.sample(exclude_tense, ignore_gender_parti, ignore_gender_gerundivum,
+                                         exclude_imperativ_2, exclude_non_existing, weights,
+                                         exclude_choice=exclude_choice)
         if ask_question_with_input:
-            self.ask_question(*question)
-        if "Imperativ Imperativ" in question[0]:
-            question = (question[0].replace("Imperativ Imperativ", "Imperativ"), question[1])
+            self.record_answer(question, GRADE_CORRECT if self.ask_question(*question) else GRADE_WRONG)
         return question
 
-    def __get_random_question(self, exclude_tense: list = 'Defaults to ["Supina"]', ignore_gender_parti: bool = False,
-                              ignore_gender_gerundivum: bool = False, exclude_imperativ_2: bool = True, weights="relevant",
-                              exclude_choice: list = None) -> tuple:
+    def __scheduled_excluded(self, exclude_tense: list, ignore_gender_parti: bool, ignore_gender_gerundivum: bool,
+                             exclude_imperativ_2: bool, exclude_non_existing: bool, weights, exclude_choice: list):
         """
-        :param exclude_tense: Which tenses to exclude
-        :param ignore_gender_parti: Ignore gender for participles
-        :param ignore_gender_gerundivum: Ignore gender for gerundivum
-        :param exclude_imperativ_2: Only ask about the Imperativ I (exclude Imperative II)
-        :param weights: Weights for the random selection of tenses (list of ints with len 16). Presets: 'relevant', 'basic', 'gerund', 'partizip', 'special', 'supina'
-        :param exclude_choice: Which words to exclude
-        :return: A tuple with the question (str) at index 0 and the answer(s) (list -> multiple or str -> one) at index 1
+        :return: A check whether the options exclude a slot by its verb or tense. If the options or the verbs changed
+                 since the last question, the slots parked by the scheduler are put back first
+        """
+        options = (tuple(exclude_tense), ignore_gender_parti, ignore_gender_gerundivum, exclude_imperativ_2,
+                   exclude_non_existing, tuple(weights) if isinstance(weights, list) else weights,
+                   frozenset(exclude_choice or ()), self.data.version)
+        if options != self.scheduled_options:
+            verbs = options[6]
+            tenses = {tense for tense, weight in zip(TENSES, resolve_weights(weights, exclude_tense)) if not weight}
+            self.scheduled_excluded = lambda slot: slot[0] in verbs or slot[1] in tenses
+            self.scheduled_options = options
+            self.scheduler.unpark()
+        return self.scheduled_excluded
+
+    def sync_index(self) -> None:
+        """
+        :return: Syncs the question index with the data, if the data was changed by something else than the methods
+                 of this class (which keep the index up to date themselves)
+        """
+        if (version := self.data.version) != self.synced_version:
+            self.index.sync(self.data)
+            self.synced_version = version
+
+    def record_answer(self, question: tuple, grade: int) -> None:
+        """
+        :param question: A question as returned by get_random_question
+        :param grade: Quality of the answer from 0 to 5, below 3 counts as wrong (see srs.ReviewState.review)
+        :return: Schedules the next review of the slot of question
+        """
+        if (slot := getattr(question, "slot", None)) is not None:
+            self.scheduler.record(slot, grade)
+
+    def release_questions(self, questions: list) -> None:
+        """
+        :param questions: Questions as returned by get_random_question that are dropped without being asked
+        :return: Releases the due slots held back for them, so they are asked next instead of after their lease
+        """
+        self.scheduler.release([question.slot for question in questions
+                                if getattr(question, "slot", None) is not None])
+
+    def get_random_questions(self, number: int, exclude_tense: list = 'Defaults to ["Supina"]',
+                             ignore_gender_parti: bool = False, ignore_gender_gerundivum: bool = False,
+                             exclude_imperativ_2: bool = True, exclude_non_existing: bool = True, weights="relevant",
+                             exclude_choice: list = None, seed: int = None) -> list:
+        """
+        :param number: How many questions to generate
+        :param seed: Optional seed to generate a reproducible set of questions
+        :return: A list of questions in the format of get_random_question, drawn in one vectorized batch (see
+                 get_random_question for the other parameters)
         """
         if exclude_tense == 'Defaults to ["Supina"]':
             exclude_tense = ["Supina"]
-        if isinstance(weights, str):
-            if (w := weights.lower()) == "relevant":
-                weights = [6.5, 6.5, 6.5, 6.5, 6.5, 6.5, 6.5, 6.5, 6.5, 6.5, 4, 3, 4, 6.5, 14.5, 3]
-            elif w == "zeiten":
-                weights = [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0]
-            elif w == "basic":
-                weights = [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0]
-            elif w.startswith("gerund"):
-                weights = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 0, 0]
-            elif w.startswith("partizip"):
-                weights = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0]
-            elif w in ["special", "spezial", "abwandlungen"]:
-                weights = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 3, 0]
-            elif w == "supina":
-                weights = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1]
-            else:
-                raise ValueError(f"Got invalid preset for weights: {weights}")
-        elif not isinstance(weights, list) or (len(weights) != 16 and
-                                               ("supina" not in exclude_tense and "Supina" not in exclude_tense)):
-            raise ValueError("Invalid value for weights was given")
-        elif ("supina" in exclude_tense or "Supina" in exclude_tense) and len(weights) != 15:
-            raise ValueError("Invalid length for weights")
-        elif ("supina" in exclude_tense or "Supina" in exclude_tense) and len(weights) == 15:
-            weights.append(0)
-        choice = random.choices(list(self.data.keys()))[0]
-        while exclude_choice is not None and choice in exclude_choice:
-            choice = random.choices(list(self.data.keys()))[0]
-        tense = random.choices(list(self.data.get(choice).keys()), weights=weights)[0]
-        while tense in exclude_tense:
-            tense = random.choices(list(self.data.get(choice).keys()), weights=weights)[0]
-        if exclude_imperativ_2 and tense == "Imperativ":
-            person = random.choices(list(self.data.get(choice).get(tense).get("Imperativ I").keys()))[0]
-            return f"Was ist {tense} {person} von {choice}? ", self.data.get(choice).get(tense).get("Imperativ I").get(person)
-        elif tense not in ["Gerundium", "Gerundivum", "Partizipien", "Supina"]:
-            voice = random.choices(list(self.data.get(choice).get(tense).keys()))[0]
-            person = random.choices(list(self.data.get(choice).get(tense).get(voice).keys()))[0]
-            return f"Was ist {tense} {voice} {person} von {choice}? ", self.data.get(choice).get(tense).get(voice).get(person)
-        elif tense in ["Gerundium", "Supina"]:
-            time_or_case = random.choices(list(self.data.get(choice).get(tense).keys()))[0]
-            return f"Was ist {tense} {time_or_case} von {choice}? ", self.data.get(choice).get(tense).get(time_or_case)
-        elif tense == "Gerundivum":
-            mode = random.choices(list(self.data.get(choice).get(tense).keys()))[0]
-            case = random.choices(list(self.data.get(choice).get(tense).get(mode).keys()))[0]
-            if not ignore_gender_gerundivum:
-                gender = random.choices(list(self.data.get(choice).get(tense).get(mode).get(case).keys()))[0]
-                return f"Was ist {tense} {mode} {case} {gender} von {choice}? ", self.data.get(choice).get(tense).get(mode).get(case).get(gender)
-            else:
-                return f"Was ist {tense} {mode} {case} von {choice}? ", [(c := self.data.get(choice).get(tense).get(mode).get(case)).get("Maskulinum"), c.get("Femininum"), c.get("Neutrum")]
-        elif tense == "Partizipien":
-            P_type = random.choices(list(self.data.get(choice).get(tense).keys()))[0]
-            mode = random.choices(list(self.data.get(choice).get(tense).get(P_type).keys()))[0]
-            case = random.choices(list(self.data.get(choice).get(tense).get(P_type).get(mode).keys()))[0]
-            if not ignore_gender_parti:
-                gender = random.choices(list(self.data.get(choice).get(tense).get(P_type).get(mode).get(case).keys()))[0]
-                return f"Was ist {P_type} {mode} {case} {gender} von {choice}? ", self.data.get(choice).get(tense).get(P_type).get(mode).get(case).get(gender)
-            else:
-                return f"Was ist {P_type} {mode} {case} von {choice}? ", [(c := self.data.get(choice).get(tense).get(P_type).get(mode).get(case)).get("Maskulinum"), c.get("Femininum"), c.get("Neutrum")]
+        self.sync_index()
+        return self.index.sample_many(number, exclude_tense, ignore_gender_parti, ignore_gender_gerundivum,
+                                      exclude_imperativ_2, exclude_non_existing, weights,
+                                      exclude_choice=exclude_choice, seed=seed)
+
+    def delete_data(self, verb_base: str) -> None:
+        with self.index.lock:
+            if verb_base in self.data:
+                del self.data[verb_base]
+            self.index.remove(verb_base)
+            self.forms.remove(verb_base)
+        self.scheduler.forget(verb_base)
+        self.refresh_job.forget(verb_base)
 
     def search_in_data(self, choice: str, tense: str, voice: str, person: str) -> str:
-        choice = choice.strip().replace("  ", " ")
-        tense = " ".join([{"Imp": "Imperfekt", "Perf": "Perfekt", "Fut": "Futur", "1": "I", "2": "II", "Präs":
-            "Präsens", "Prä": "Präsens", "Per": "Perfekt", "Plus": "Plusquamperfekt", "Plusquam": "Plusquamperfekt",
-            "Plusquamperf": "Plusquamperfekt", "Gerundiv": "Gerundivum", "Ind": "Indikativ", "Konj":
-            "Konjunktiv", "Kon": "Konjunktiv", "Fut1": "Futur I", "Fut2": "Futur II", "FutII": "Futur II",
-            "FutI": "Futur I", "FuturI": "Futur I", "FuturII": "Futur II", "Futur1": "Futur I", "Futur2": "Futur II"}
-                         .get(x.strip().rstrip('.'), x.strip()) for x in tense.split(sep=" ")]).replace("  ", " ")
-        voice = {"Pass": "Passiv", "Passive": "Passiv", "Akt": "Aktiv", "Aktive": "Aktiv"}.get(voice.strip().rstrip("."), voice.strip()).replace("  ",  " ")
-        person = " ".join([{"Zweite": "2.", "Dritte": "3.", "Erste": "1.", "Pers.": "Person", "Pers": "Person",
-                  "Sing": "Singular", "Plur": "Plural", "Plu": "Plural", "P.": "Person", "P": "Person",
-                  "S": "Singular", "Pl": "Plural", "2": "2.", "3": "3.", "1": "1."}.get(x.strip().rstrip("."), x.strip()) for x in person.split(sep=" ")]).replace("  ", " ")
-        return self.data.get(choice.strip()).get(tense.strip()).get(voice.strip()).get(person.strip())
+        return self.search(" ".join((choice, tense, voice, person)))
+
+    def __load_background(self) -> None:
+        self.scheduler.load()
+        self.index.load_pending()
+
+    def __load_verb(self, verb_base: str):
+        paradigm = self.data[verb_base]
+        self.forms.add(verb_base, paradigm)
+        return paradigm
+
+    def analyse_form(self, form: str) -> list:
+        """
+        :param form: A Latin form, e.g. 'amavissem'
+        :return: Descriptions of every slot of the contained verbs producing form, e.g.
+                 ['Plusquamperfekt Konjunktiv Aktiv 1. Person Singular von amare']
+        """
+        self.index.load_pending()
+        return [slot.describe() for slot in self.forms.lookup(form)]
+
+    def describe_form(self, form: str, limit: int = 2) -> str:
+        """
+        :return: Which form the input is, according to the verbs indexed so far (e.g. to explain a wrong answer), or
+                 an empty string if it is unknown
+        """
+        slots = self.forms.lookup(form)
+        described = ", ".join(slot.describe() for slot in slots[:limit])
+        return f"{described} (+{len(slots) - limit})" if len(slots) > limit else described
 
     def search(self, inpt: str) -> str:
-        split = inpt.strip().replace(".", " ").replace("  ", " ").split(sep=" ")
-        if len(split) > 5:
-            return self.search_in_data(choice=split[0], tense=" ".join(split[1:3]), voice=split[3],
-                                       person=" ".join(split[4:]))
-        elif len(split) == 5:
-            return self.search_in_data(choice=split[0], tense=" ".join(split[1]), voice=split[2],
-                                       person=" ".join(split[3:]))
+        """
+        :param inpt: The verb followed by the (abbreviated) slot, e.g. 'amare Konj Plusq Pass 3 Pl'
+        :return: The form of that slot, or None if the verb is not contained or the slot cannot be resolved
+        """
+        verb, _, description = inpt.strip().partition(" ")
+        try:
+            paradigm = self.data[verb]
+        except KeyError:
+            return None
+        return self.query.lookup(paradigm, description)
+
+    def search_many(self, inputs: list) -> list:
+        """
+        :return: search for each of inputs (the descriptions are only resolved once per distinct description)
+        """
+        return [self.search(inpt) for inpt in inputs]
 
     def assert_data_contains(self, word_list: list, save: bool = True, exclude_supina: bool = False,
-                             joining: bool = True) -> ThreadLimiter:
+                             joining: bool = True, progress: ImportProgress = None) -> ThreadLimiter:
+        """
+        :param progress: ImportProgress the events of the import are emitted to (finished right away if all words
+                         are contained already)
+        """
         if remaining_words := [word.strip() for word in word_list if word.strip() not in self.data.keys()]:
-            return self.multi_update_data(remaining_words, save=save, exclude_supina=exclude_supina, joining=joining)
+            return self.multi_update_data(remaining_words, save=save, exclude_supina=exclude_supina, joining=joining,
+                                          progress=progress)
         else:
+            if progress is not None:
+                progress.finish()
             return ThreadLimiter([], [], 1, allow_empty_tasks=True)
 
-    def refresh_all(self, save: bool = True, exclude_supina: bool = False, joining: bool = True):
-        to_refresh = list(self.data.keys())
-        self.multi_update_data(to_refresh, exclude_supina=exclude_supina, joining=joining, save=save)
+    def refresh_all(self, save: bool = True, exclude_supina: bool = False, joining: bool = True,
+                    progress: ImportProgress = None) -> ThreadLimiter:
+        """
+        :param save: Whether to save every changed verb right away (only then an interrupted refresh can be resumed)
+        :param progress: ImportProgress the events of the refresh are emitted to (a new one if None)
+        :return: Refreshes the stored verbs in the background, continuing an interrupted refresh if there is one.
+                 Pages that did not change are not parsed again and only verbs whose data changed are saved
+        """
+        progress = progress if progress is not None else ImportProgress()
+        to_refresh = self.refresh_job.start(list(self.data.keys()), persist=save)
+        progress.queue(to_refresh)
+        Limiter = ThreadLimiter([self.async_refresh_data], [[to_refresh, exclude_supina, save, progress]], 1,
+                                on_finish=lambda *_: self.refresh_on_finish_callback(save, progress))
+        if joining:
+            Limiter.join()
+        return Limiter
 
-    def ask_question(self, question: str, correct_answer: str) -> None:
-        inpt = input(question).strip().lower()
-        if isinstance(correct_answer, str):
-            if inpt != correct_answer.lower():
-                print(f"Falsch! Die richtige Antwort wäre gewesen: {correct_answer}")
-            else:
-                print("Richtig!")
-        elif inpt not in correct_answer:
-            print(f"Falsch! Folgende Antworten wären richtig gewesen: {', '.join(correct_answer)}")
+    def resume_refresh(self, exclude_supina: bool = False, progress: ImportProgress = None) -> ThreadLimiter:
+        """
+        :return: Continues an interrupted refresh in the background (None if there is none)
+        """
+        if self.refresh_job.pending:
+            return self.refresh_all(exclude_supina=exclude_supina, joining=False, progress=progress)
+
+    def async_refresh_data(self, verbs: list, exclude_supina: bool = False, save: bool = True,
+                           progress: ImportProgress = None) -> None:
+        """
+        :return: Refreshes the given stored verbs concurrently through self.fetcher (blocks until done)
+        """
+        progress = progress if progress is not None else ImportProgress()
+
+        async def worker(fetch, verb_base):
+            try:
+                page, result = await self.refresh_data_async(self.__reporting(fetch, verb_base, progress), verb_base,
+                                                             exclude_supina=exclude_supina)
+            except Exception:
+                progress.failed(verb_base, "Verbindungsfehler")
+                return
+            try:
+                self.apply_refresh(verb_base, page, result, save=save, progress=progress)
+            except Exception:
+                progress.failed(verb_base, "Verarbeitungsfehler")
+
+        self.fetcher.run(verbs, worker)
+
+    async def refresh_data_async(self, fetch, verb_base: str, exclude_supina: bool = False) -> tuple:
+        """
+        :param fetch: Coroutine function fetching the text of an url (see AsyncFetcher)
+        :return: The hash of the conjugation page of verb_base (None if the page had to be looked up again) and its
+                 parsed data, which is None if the page did not change since it was last parsed
+        """
+        if (url := self.resolutions.get(verb_base)) is not None:
+            text = await fetch(url)
+            if self.refresh_job.page_unchanged(verb_base, page := page_digest(text, exclude_supina)):
+                return page, None
+            loop = asyncio.get_running_loop()
+            if result := await loop.run_in_executor(None, self.parse_page, text, exclude_supina, False):
+                return page, result
+        return None, await self.get_data_async(fetch, verb_base, exclude_supina=exclude_supina)
+
+    def apply_refresh(self, verb_base: str, page: str, result: dict, save: bool = True,
+                      progress: ImportProgress = None) -> None:
+        """
+        :param page: Hash of the page result was parsed from (see refresh_data_async)
+        :param result: The parsed data of verb_base, None if its page did not change
+        :return: Adds the refreshed data of verb_base if it changed and marks verb_base as done in the refresh
+        """
+        progress = progress if progress is not None else ImportProgress()
+        if verb_base not in self.data or result is None:
+            progress.unchanged(verb_base)
+        elif not result:
+            progress.failed(verb_base, "nicht gefunden")
         else:
+            name, paradigm = next(iter(result.items()))
+            paradigm = self.storage.schema.compact(paradigm)
+            if self.refresh_job.paradigm_changed(name, paradigm, self.data.get(name)):
+                self.add_data(verb_base, {name: paradigm}, save=save, progress=progress)
+            else:
+                progress.unchanged(verb_base)
+            self.refresh_job.done(verb_base, name, page, paradigm, persist=save)
+            return
+        self.refresh_job.done(verb_base, persist=save)
+
+    def refresh_on_finish_callback(self, saving: bool, progress: ImportProgress = None):
+        try:
+            self.refresh_job.finish(persist=saving)
+        finally:
+            if progress is not None:
+                progress.finish()
+
+    def ask_question(self, question: str, correct_answer: str) -> bool:
+        inpt = input(question).strip()
+        matcher = AnswerMatcher(correct_answer)
+        if matcher.matches(inpt):
             print("Richtig!")
+            return True
+        if isinstance(correct_answer, str):
+            print(f"Falsch! Die richtige Antwort wäre gewesen: {correct_answer}")
+        else:
+            print(f"Falsch! Folgende Antworten wären richtig gewesen: {', '.join(correct_answer)}")
+        if (closest := matcher.near_miss(inpt)) is not None:
+            print(f"Knapp daneben, gemeint war wohl: {closest}")
+        elif typed := self.describe_form(inpt):
+            print(f"Deine Eingabe ist: {typed}")
+        return False
 
     def ask_random_question(self, exclude_tense: list = 'Defaults to ["Supina"]', ignore_gender_parti: bool = False,
                             ignore_gender_gerundivum: bool = False, exclude_imperativ_2: bool = True,
@@ -387,12 +648,10 @@ class VerbenScraper:
                                  weights=weights)
 
     def test_random_questions(self, number: int = 200, print_out: bool = False):
-        if not print_out:
-            for _ in range(number):
-                self.get_random_question()
-        else:
-            for _ in range(number):
-                print(self.get_random_question())
+        questions = self.get_random_questions(number)
+        if print_out:
+            for question in questions:
+                print(question)
 
     @property
     def currently_contained(self) -> list:
@@ -401,7 +660,9 @@ class VerbenScraper:
 
 if __name__ == '__main__':
     Scraper = VerbenScraper()
-    Scraper.assert_data_contains(["esse"])
+    progress = ImportProgress()
+    Scraper.assert_data_contains(["esse"], joining=False, progress=progress)
+    print_progress(progress)
     try:
         print("Testing 200 random questions...")
         Scraper.test_random_questions(print_out=True)
@@ -1,9 +1,16 @@
-from threading import Thread
+from collections import OrderedDict
+from functools import wraps
+from threading import Lock, Thread
+from time import perf_counter
 from kivymd.app import MDApp
 from os import listdir
 from os.path import join
+from time import monotonic
 from kivy.uix.image import Image
-from kivy.storage.jsonstore import JsonStore
+from kivy.uix.recycleview import RecycleView
+from kivy.properties import BooleanProperty, StringProperty
+from kivy.core.image import Image as CoreImage
+from storage import StorageService
 from kivymd.uix.chip import MDChip
 from kivymd.uix.boxlayout import MDBoxLayout
 from kivymd.uix.button import MDRectangleFlatIconButton
@@ -14,6 +21,62 @@ from kivymd.uix.textfield import MDTextField
 from kivymd.uix.label import MDLabel
 
 
+class UIBatcher:
+    """
+    Collects UI updates from any thread and applies them on the main thread in one Clock callback per frame, running
+    only as many of them as fit into the frame budget (the rest continue in the next frame) \n
+    Updates submitted with a key replace a still pending update with the same key (e.g. repeated changes of a label),
+    so only the latest one is applied
+    """
+    def __init__(self, budget: float = 0.004):
+        """
+        :param budget: Seconds per frame the updates may take (an update is never interrupted, so a single slow one
+                       can exceed it)
+        """
+        self.budget = budget
+        self.lock = Lock()
+        self.pending = OrderedDict()
+        self.trigger = Clock.create_trigger(self.__apply)
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def submit(self, func, *args, key=None, **kwargs) -> None:
+        """
+        :return: Queues func(*args, **kwargs) to be called on the main thread
+        """
+        with self.lock:
+            self.pending[key if key is not None else object()] = (func, args, kwargs)
+        self.trigger()
+
+    def set_text(self, widget, text: str) -> None:
+        self.submit(setattr, widget, "text", text, key=(id(widget), "text"))
+
+    def __apply(self, *_) -> None:
+        deadline = perf_counter() + self.budget
+        try:
+            while perf_counter() < deadline:
+                with self.lock:
+                    if not self.pending:
+                        return
+                    _, (func, args, kwargs) = self.pending.popitem(last=False)
+                func(*args, **kwargs)
+        finally:
+            if self.pending:
+                self.trigger()
+
+
+def ui_update(func):
+    """
+    Like kivy.clock.mainthread, but queues the call in the UIBatcher of the app (self.ui), so the calls of many
+    (worker) threads are applied in frame budgeted batches
+    """
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        self.ui.submit(func, self, *args, **kwargs)
+    return wrapper
+
+
 class SettingsChip(MDChip):
     def on_long_touch(self, *args) -> None:
         pass
@@ -41,89 +104,184 @@ class BaseLabel(MDLabel):
 
 
 class GIF(Image):
+    """
+    Countdown animation, whose frames are decoded into textures once on creation, so advancing a frame only swaps the
+    texture instead of resolving (and maybe decoding) an image file on the main thread \n
+    The countdown runs against a deadline on the monotonic clock with one Clock event per frame, scheduled for the
+    deadline of the next frame, so pausing or extending the current frame (modify_delay) only move the deadline and a
+    late event catches up instead of delaying all following frames. While the target screen is not shown, no event is
+    scheduled at all: the countdown is paused from a binding on the current screen of its ScreenManager
+    """
+
     def __init__(self, **kwargs):
         src_dir = kwargs.pop("source")
         self.src = sorted([join(src_dir, f) for f in listdir(src_dir)], key=lambda x: int("".join([y for y in x if y.isnumeric()])))
+        self.textures = [CoreImage(path).texture for path in self.src]
         self.current = 0
         self.delay = 1
-        self.original_delay = 1
-        self.current_schedule = None
-        self.modified = False
+        self.deadline = None
+        self.remaining = None
+        self.extension = 0
+        self.hidden = False
+        self.repeat = False
+        self.target_screen = None
+        self.screen_manager = None
         self.finished_callback = None
         self.total_modified = 0
-        kwargs.update({"source": self.src[self.current]})
+        self.event = None
         super().__init__(**kwargs)
+        # Set after the initialization, which clears the texture as no source is set
+        self.texture = self.textures[self.current]
 
     @property
     def remaining_frames(self) -> int:
-        return len(self.source)-self.current-1
+        return len(self.textures)-self.current-1
 
     @property
     def is_animating(self) -> bool:
-        return self.current_schedule is not None
+        """
+        :return: Whether a countdown is running or paused (see stop)
+        """
+        return self.deadline is not None or self.remaining is not None
+
+    @property
+    def is_shown(self) -> bool:
+        return self.target_screen is None or self.target_screen[0].current == self.target_screen[1]
 
     @mainthread
     def next_frame(self) -> None:
+        self.__advance()
+
+    def __advance(self) -> None:
         if self.remaining_frames:
             self.current += 1
-            self.source = self.src[self.current]
+            self.texture = self.textures[self.current]
+
+    def __schedule(self) -> None:
+        self.__cancel()
+        self.event = Clock.schedule_once(self.__tick, max(self.deadline - monotonic(), 0))
+
+    def __cancel(self) -> None:
+        if self.event is not None:
+            self.event.cancel()
+            self.event = None
+
+    def __pause(self) -> None:
+        self.__cancel()
+        if self.deadline is not None:
+            self.remaining = max(self.deadline - monotonic(), 0)
+        self.deadline = None
+
+    def __continue(self) -> None:
+        if self.remaining is not None:
+            self.deadline = monotonic() + self.remaining
+            self.remaining = None
+            self.__schedule()
 
     def reset(self) -> None:
         if self.is_animating:
             self.stop()
         self.current = 0
         self.total_modified = 0
-        self.source = self.src[0]
+        self.texture = self.textures[0]
 
     def stop(self, keep_schedule_ref: bool = False) -> None:
-        self.current_schedule.cancel()
-        self.total_modified = 0
+        """
+        :param keep_schedule_ref: Whether to only pause the countdown (keeping the time left for the current frame),
+                                  so it can be continued with resume
+        """
+        self.__pause()
         if not keep_schedule_ref:
-            self.current_schedule = None
+            self.remaining = None
+        self.hidden = False
+        self.total_modified = 0
+
+    def resume(self) -> None:
+        """
+        :return: Continues a countdown paused with stop(keep_schedule_ref=True) with the time that was left (once the
+                 target screen is shown, if it is not right now)
+        """
+        if self.is_shown:
+            self.__continue()
+        else:
+            self.hidden = self.remaining is not None
 
     def modify_delay(self, original_factor: float, tolerance_cap: int = 0, max_delay_increase_factor: float = None) -> None:
-        if self.is_animating and (not tolerance_cap or tolerance_cap >= self.total_modified) and \
-                (max_delay_increase_factor is None or (self.delay / max_delay_increase_factor) < self.original_delay):
-            if not self.modified:
-                self.original_delay = self.delay
-                self.modified = True
+        """
+        :param original_factor: The current frame is extended by delay * (original_factor - 1)
+        :param tolerance_cap: Maximum amount of extensions per countdown (0 for no limit)
+        :param max_delay_increase_factor: Maximum factor of delay the current frame can be extended to
+        """
+        if self.deadline is not None and (not tolerance_cap or tolerance_cap >= self.total_modified) and \
+                (max_delay_increase_factor is None or (self.delay + self.extension) / max_delay_increase_factor < self.delay):
             self.total_modified += 1
-            self.delay += self.original_delay * (original_factor-1)
-
-    def reset_delay(self, *_) -> None:
-        self.delay = self.original_delay
-        self.modified = False
+            self.extension += self.delay * (original_factor-1)
+            self.deadline += self.delay * (original_factor-1)
+            self.__schedule()
 
     def start_animation_schedule(self, delay=None, repeat: bool = False, target_screen: list = None, instant: bool = False) -> None:
+        """
+        :param delay: Seconds per frame (the current delay if None)
+        :param repeat: Whether to keep running after the last frame instead of calling finished_callback
+        :param target_screen: [ScreenManager, name] of the screen the countdown is shown on, it is paused while another
+                              screen is shown
+        :param instant: Whether to show the next frame right away
+        """
         if delay is not None:
             self.delay = delay
-            self.original_delay = delay
+        self.repeat = repeat
+        self.__watch(target_screen)
+        self.remaining = None
+        self.extension = 0
+        self.deadline = monotonic()
         if not instant:
-            self.current_schedule = Clock.schedule_once(lambda *_: self.__animate(repeat=repeat, target_screen=target_screen), self.delay)
+            self.deadline += self.delay
+        self.hidden = False
+        if self.is_shown:
+            self.__schedule()
         else:
-            self.current_schedule = Clock.schedule_once(lambda *_: self.__animate(repeat=repeat, target_screen=target_screen))
-
-    def __animate(self, repeat: bool = False, target_screen: list = None) -> None:
-        delay = self.delay
-        self.reset_delay()
-        if target_screen is not None and target_screen[0].current != target_screen[1]:
-            self.current_schedule = Clock.schedule_once(lambda *_: self.__animate(repeat=repeat, target_screen=target_screen), 0.2)
+            self.__pause()
+            self.hidden = True
+
+    def __watch(self, target_screen: list) -> None:
+        manager = target_screen[0] if target_screen is not None else None
+        if manager is not self.screen_manager:
+            if self.screen_manager is not None:
+                self.screen_manager.unbind(current=self.__on_screen)
+            if manager is not None:
+                manager.bind(current=self.__on_screen)
+            self.screen_manager = manager
+        self.target_screen = target_screen
+
+    def __on_screen(self, *_) -> None:
+        if not self.is_shown:
+            if self.deadline is not None:
+                self.__pause()
+                self.hidden = True
+        elif self.hidden:
+            self.hidden = False
+            self.__continue()
+
+    def __tick(self, *_) -> None:
+        self.event = None
+        if self.deadline is None:
             return
-        self.next_frame()
-        if repeat or self.remaining_frames:
-            self.current_schedule = Clock.schedule_once(
-                lambda *_: self.__animate(repeat=repeat, target_screen=target_screen), delay)
-        else:
+        now = monotonic()
+        while now >= self.deadline and (self.remaining_frames or self.repeat):
+            self.__advance()
+            self.extension = 0
+            self.deadline += self.delay
+        if not self.remaining_frames and not self.repeat:
+            self.deadline = None
             if self.finished_callback is not None:
                 self.finished_callback()
-            self.current_schedule = None
+        else:
+            self.__schedule()
 
 
 class ListItem(OneLineRightIconListItem):
-    def __init__(self, *args, **kwargs):
-        if "text" in kwargs.keys():
-            self.txt = kwargs.pop("text")
-        super().__init__(*args, **kwargs)
+    txt = StringProperty()
+    toggled = BooleanProperty(True)
 
     def on_touch_down(self, touch) -> None:
         selected = [child for child in self.ids.container.children if child.collide_point(*touch.pos)]
@@ -131,6 +289,55 @@ class ListItem(OneLineRightIconListItem):
             selected[0].on_touch_down(touch)
 
 
+class WordList(RecycleView):
+    """
+    Data driven list of the verbs: only the visible rows are instantiated (as ListItems, recycled while scrolling) \n
+    The rows are kept in self.data in the order they were added, with an index from the verb to its row, so a verb is
+    found without searching the rows. Every change of the rows makes the RecycleView refresh its views, next to that
+    the index updates (shifting the rows after a removed verb) are negligible
+    """
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.rows = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def add_many(self, names: list, toggled: dict = None) -> None:
+        """
+        :param names: Verbs to add (verbs that are already contained are skipped)
+        :param toggled: Verbs mapped to whether they are toggled on (defaults to True)
+        """
+        toggled = toggled or {}
+        new = []
+        for name in names:
+            if name not in self.rows:
+                self.rows[name] = len(self.data) + len(new)
+                new.append({"txt": name, "toggled": toggled.get(name, True)})
+        if new:
+            self.data.extend(new)
+
+    def remove(self, name: str) -> bool:
+        """
+        :return: Removes the row of a verb and returns whether it was contained
+        """
+        if (row := self.rows.pop(name, None)) is None:
+            return False
+        del self.data[row]
+        for verb, index in self.rows.items():
+            if index > row:
+                self.rows[verb] = index - 1
+        return True
+
+    def set_toggled(self, name: str, toggled: bool) -> None:
+        if (row := self.rows.get(name)) is not None and self.data[row]["toggled"] != toggled:
+            self.data[row]["toggled"] = toggled
+            self.refresh_from_data()
+
+
 class ListItemHeader(OneLineRightIconListItem):
     def on_touch_down(self, touch) -> None:
         return
@@ -157,15 +364,16 @@ class BaseTextField(MDTextField):
 
 class BaseApp(MDApp):
     """
-    Provides some basic JsonStore functionality to store data and options/settings for the app and uses a
-    Dark / BlueGray theme \n
+    Persists the options/settings of the app through a StorageService (which subclasses also use for their data) and
+    uses a Dark / BlueGray theme \n
     Also has a method to toggle a SettingsChip (see SettingsChip class) \n
     This is a base class and hence should be inherited from and not be instantiated on its own
     """
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.store_name = "data.json"
+        self.storage = StorageService()
+        self.ui = UIBatcher()
         self.options = {}
         self.data = {}
 
@@ -175,46 +383,27 @@ class BaseApp(MDApp):
         self.theme_cls.theme_text_color = (1, 1, 1, 1)
 
     def on_start(self) -> None:
-        self.store = JsonStore(self.store_name)
-        del self.store_name
         self.check_store()
         if hasattr(self, "on_startup"):
             Thread(target=self.on_startup).start()
 
     def on_stop(self):
         self.save_store()
+        self.storage.close()
 
     def on_pause(self):
         self.save_store()
         return True
 
     def save_store(self) -> None:
-        self.store.put("options", **self.options)
-        self.store.put("data", **self.data)
-
-    def check_store(self, options_defaults_to: dict = None, data_defaults_to: dict = None) -> None:
-        try:
-            options = self.store.get("options")
-            if options_defaults_to is not None:
-                options.update({k: v for k, v in options.items() if v is None and k in options_defaults_to.keys()})
-            self.store.put("options", **options)
-        except KeyError:
-            if options_defaults_to is not None:
-                self.store.put("options", **options_defaults_to)
-                options = options_defaults_to
-            else:
-                options = {}
-        try:
-            data = self.store.get("data")
-            if data_defaults_to is not None:
-                data.update({k: v for k, v in data.items() if v is None and k in data_defaults_to.keys()})
-        except KeyError:
-            if data_defaults_to is not None:
-                self.store.put("data", **data_defaults_to)
-                data = data_defaults_to
-            else:
-                data = {}
-        self.data = data
+        self.storage.put_options(self.options)
+        self.storage.flush(timeout=5)
+
+    def check_store(self, options_defaults_to: dict = None) -> None:
+        options = self.storage.load_options()
+        if options_defaults_to is not None:
+            options.update({k: v for k, v in options_defaults_to.items() if options.get(k) is None})
+            self.storage.put_options(options)
         self.options = options
 
     def toggle_chip(self, obj) -> None:
@@ -0,0 +1,49 @@
+import os
+import sys
+import time
+
+# Headless window: no visible window is opened (can be overridden from the environment)
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from kivy.core.window import Window  # noqa: E402 (creates the window / GL context the textures are created in)
+from kivy.uix.image import Image  # noqa: E402
+
+from base import GIF  # noqa: E402
+
+
+def measure(swap, frames: int, rounds: int) -> list:
+    """
+    :return: The duration of every single frame swap in microseconds
+    """
+    durations = []
+    for _ in range(rounds):
+        for frame in range(frames):
+            start = time.perf_counter()
+            swap(frame)
+            durations.append((time.perf_counter() - start) * 1e6)
+    return durations
+
+
+def report(name: str, durations: list) -> None:
+    durations = sorted(durations)
+    print(f"{name}: median {durations[len(durations) // 2]:.1f} µs, p99 {durations[int(len(durations) * 0.99)]:.1f} "
+          f"µs, max {durations[-1]:.1f} µs")
+
+
+def benchmark(source: str = "./frames/", rounds: int = 50) -> None:
+    """
+    :return: Prints the latency of swapping the frames of the GIF (preloaded textures) and of the previous approach
+             (setting the source of an Image to the path of the frame)
+    """
+    gif = GIF(source=source)
+    image = Image(source=gif.src[0])
+    report("Preloaded textures", measure(lambda frame: setattr(gif, "texture", gif.textures[frame]), len(gif.src),
+                                         rounds))
+    report("Image sources", measure(lambda frame: setattr(image, "source", gif.src[frame]), len(gif.src), rounds))
+
+
+if __name__ == '__main__':
+    benchmark(*sys.argv[1:2], *map(int, sys.argv[2:3]))
+    Window.close()
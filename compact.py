@@ -0,0 +1,180 @@
+from array import array
+from collections.abc import Mapping
+from threading import Lock
+
+FORM_SEPARATOR = "\x1f"
+EMPTY_MARKER = "\x1e"
+
+
+class Schema:
+    """
+    Interns the keys of all paradigms ("Indikativ Präsens", "Aktiv", "1. Person Singular", ...) into one shared tree
+    of nodes, so a verb only has to store the node ids of its forms. The tree only ever grows (ids are never reused)
+    """
+    ROOT = 0
+
+    def __init__(self, nodes: list = ()):
+        """
+        :param nodes: (id, parent, key) of the nodes to restore, ordered by id
+        """
+        self.lock = Lock()
+        self.keys = [None]
+        self.parents = [-1]
+        self.lineages = [(self.ROOT,)]
+        self.children = [{}]
+        for node, parent, key in nodes:
+            if self.__add(parent, key) != node:
+                raise ValueError(f"Got a gap in the node ids of the schema at {node}")
+        self.persisted = len(self.keys)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __add(self, parent: int, key: str) -> int:
+        node = len(self.keys)
+        self.keys.append(key)
+        self.parents.append(parent)
+        self.lineages.append(self.lineages[parent] + (node,))
+        self.children.append({})
+        self.children[parent][key] = node
+        return node
+
+    def node(self, parent: int, key: str) -> int:
+        """
+        :return: The id of the node of key below parent (added if it does not exist yet)
+        """
+        if (node := self.children[parent].get(key)) is None:
+            with self.lock:
+                if (node := self.children[parent].get(key)) is None:
+                    node = self.__add(parent, key)
+        return node
+
+    def path(self, node: int) -> tuple:
+        return tuple(self.keys[n] for n in self.lineages[node][1:])
+
+    def unpersisted(self) -> list:
+        """
+        :return: (id, parent, key) of all nodes added since the last call of mark_persisted
+        """
+        return [(node, self.parents[node], self.keys[node]) for node in range(self.persisted, len(self.keys))]
+
+    def mark_persisted(self, count: int) -> None:
+        self.persisted = max(self.persisted, count)
+
+    def compact(self, paradigm: Mapping) -> "CompactParadigm":
+        """
+        :param paradigm: Conjugation data of a single verb (nested dicts with the forms as strings)
+        :return: The compact representation of paradigm
+        """
+        if isinstance(paradigm, CompactParadigm):
+            return paradigm
+        nodes, forms = array("I"), []
+        self.__flatten(paradigm, self.ROOT, nodes, forms)
+        return CompactParadigm(self, nodes, forms)
+
+    def __flatten(self, content: Mapping, parent: int, nodes: array, forms: list) -> None:
+        if not content and parent != self.ROOT:
+            nodes.append(parent)
+            forms.append(None)
+        for key, value in content.items():
+            node = self.node(parent, key)
+            if isinstance(value, str):
+                nodes.append(node)
+                forms.append(value)
+            elif isinstance(value, Mapping):
+                self.__flatten(value, node, nodes, forms)
+            else:
+                raise ValueError(f"Got invalid form (expected str or dict): {value!r}")
+
+
+class CompactParadigm(Mapping):
+    """
+    Read-only dict-like view of the conjugation data of a single verb \n
+    The verb only stores the schema node ids of its forms (depth first, so the forms below any key are one contiguous
+    range) and the forms themselves. Both are kept encoded as loaded from the storage until first accessed. Nested
+    keys return views of the same verb, so no forms are copied (a view only caches its own keys once accessed)
+    """
+    __slots__ = ("schema", "root", "node", "depth", "start", "stop", "_nodes", "_forms", "_children")
+
+    def __init__(self, schema: Schema, nodes, forms, root: "CompactParadigm" = None, node: int = Schema.ROOT,
+                 depth: int = 0, start: int = 0, stop: int = None):
+        """
+        :param nodes: Schema node ids of the forms (array or encoded bytes)
+        :param forms: The forms (list, None marking an empty mapping, or the encoded str)
+        """
+        self.schema = schema
+        self.root = self if root is None else root
+        self.node = node
+        self.depth = depth
+        self.start = start
+        self.stop = stop
+        self._nodes = nodes
+        self._forms = forms
+        self._children = None
+
+    def encode(self) -> tuple:
+        """
+        :return: The node ids as bytes and the forms as one str, as stored by the StorageService
+        """
+        nodes, forms = self.__decoded()
+        return nodes.tobytes(), FORM_SEPARATOR.join(EMPTY_MARKER if form is None else form for form in forms)
+
+    def __decoded(self) -> tuple:
+        root = self.root
+        if isinstance(root._forms, str):
+            nodes = array("I")
+            nodes.frombytes(root._nodes)
+            forms = [None if form == EMPTY_MARKER else form for form in root._forms.split(FORM_SEPARATOR)] \
+                if nodes else []
+            root._nodes, root._forms = nodes, forms
+        return root._nodes, root._forms
+
+    def __items(self) -> dict:
+        if self._children is None:
+            self._children = dict(self.__groups())
+        return self._children
+
+    def __groups(self):
+        """
+        :return: Yields (key, value) for every key directly below this view
+        """
+        nodes, forms = self.__decoded()
+        lineages, depth = self.schema.lineages, self.depth + 1
+        i, stop = self.start, len(nodes) if self.stop is None else self.stop
+        while i < stop:
+            node = nodes[i]
+            if node == self.node:
+                # Marker of an empty mapping
+                i += 1
+                continue
+            child = lineages[node][depth]
+            j = i + 1
+            while j < stop and len(lineages[nodes[j]]) > depth and lineages[nodes[j]][depth] == child:
+                j += 1
+            if node == child and j == i + 1 and forms[i] is not None:
+                yield self.schema.keys[child], forms[i]
+            else:
+                yield self.schema.keys[child], CompactParadigm(self.schema, None, None, self.root, child, depth, i, j)
+            i = j
+
+    def __getitem__(self, key):
+        return self.__items()[key]
+
+    def __iter__(self):
+        return iter(self.__items())
+
+    def __len__(self) -> int:
+        return len(self.__items())
+
+    def items(self):
+        return self.__items().items()
+
+    def to_dict(self) -> dict:
+        """
+        :return: The plain nested dict this view represents
+        """
+        return {key: value.to_dict() if isinstance(value, CompactParadigm) else value
+                for key, value in self.__items().items()}
+
+    def __repr__(self) -> str:
+        return f"CompactParadigm({self.to_dict()!r})"
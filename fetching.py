@@ -0,0 +1,255 @@
+import asyncio
+import random
+import sqlite3
+from threading import Lock, local
+from time import time
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+import requests
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+RETRYABLE_ERRORS = (OSError, asyncio.TimeoutError, requests.RequestException) + \
+                   ((aiohttp.ClientError,) if aiohttp is not None else ())
+
+
+class FetchError(Exception):
+    """Raised once a request still fails after all retries"""
+
+
+class CachedResponse(NamedTuple):
+    body: str
+    etag: str
+    last_modified: str
+    fetched: float
+
+
+class ResponseCache:
+    """
+    Persistent HTTP response cache keyed by URL. Entries younger than ttl are served directly, older ones are
+    revalidated with conditional requests (ETag / Last-Modified). The total size is capped by evicting the least
+    recently used entries and in offline mode only cached responses are served
+    """
+
+    def __init__(self, path: str = "./cache.db", ttl: float = 24 * 3600, max_size: int = 64 * 2 ** 20,
+                 offline: bool = False):
+        """
+        :param path: Path of the SQLite database holding the cache
+        :param ttl: Seconds a response is served without revalidation
+        :param max_size: Maximum total size of all cached bodies in bytes
+        :param offline: Whether to serve only from the cache and never send requests
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self.offline = offline
+        self.lock = Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS responses (url TEXT PRIMARY KEY, body TEXT, etag TEXT, "
+                                "last_modified TEXT, fetched REAL, accessed REAL, size INTEGER)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    def get(self, url: str) -> CachedResponse:
+        """
+        :return: The cached response for url (marking it as recently used) or None
+        """
+        with self.lock:
+            row = self.connection.execute("SELECT body, etag, last_modified, fetched FROM responses WHERE url = ?",
+                                          (url,)).fetchone()
+            if row is not None:
+                self.connection.execute("UPDATE responses SET accessed = ? WHERE url = ?", (time(), url))
+                return CachedResponse(*row)
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return entry is not None and time() - entry.fetched < self.ttl
+
+    @staticmethod
+    def conditional_headers(entry: CachedResponse) -> dict:
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def put(self, url: str, body: str, etag: str = None, last_modified: str = None) -> None:
+        now = time()
+        with self.lock:
+            self.connection.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                    (url, body, etag, last_modified, now, now, len(body.encode())))
+            self.__evict()
+
+    def touch(self, url: str) -> None:
+        """
+        :return: Marks the cached response of url as revalidated (e.g. after a 304 Not Modified)
+        """
+        with self.lock:
+            self.connection.execute("UPDATE responses SET fetched = ? WHERE url = ?", (time(), url))
+
+    def clear(self) -> None:
+        with self.lock:
+            self.connection.execute("DELETE FROM responses")
+
+    def __evict(self) -> None:
+        total = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total > self.max_size:
+            for url, size in self.connection.execute("SELECT url, size FROM responses ORDER BY accessed").fetchall():
+                if total <= self.max_size:
+                    break
+                self.connection.execute("DELETE FROM responses WHERE url = ?", (url,))
+                total -= size
+
+
+class UrlResolutions:
+    """Persistent map from looked up words (and the canonical verb names) to the url of their conjugation page"""
+
+    def __init__(self, path: str = "./cache.db"):
+        self.lock = Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS resolutions (word TEXT PRIMARY KEY, url TEXT)")
+        self.urls = dict(self.connection.execute("SELECT word, url FROM resolutions").fetchall())
+
+    def get(self, word: str) -> str:
+        return self.urls.get(word)
+
+    def put(self, resolved: dict) -> None:
+        """
+        :param resolved: Words mapped to the url of their conjugation page
+        """
+        if changed := {word: url for word, url in resolved.items() if self.urls.get(word) != url}:
+            with self.lock:
+                self.urls.update(changed)
+                self.connection.executemany("INSERT OR REPLACE INTO resolutions VALUES (?, ?)", changed.items())
+
+    def delete(self, word: str) -> None:
+        with self.lock:
+            if self.urls.pop(word, None) is not None:
+                self.connection.execute("DELETE FROM resolutions WHERE word = ?", (word,))
+
+
+class HostRateLimiter:
+    """Spaces out the starts of requests to the same host by a minimum interval"""
+
+    def __init__(self, requests_per_second: float):
+        self.interval = 1 / requests_per_second if requests_per_second > 0 else 0
+        self.next_slot = {}
+
+    async def wait(self, url: str) -> None:
+        host = urlsplit(url).netloc
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self.next_slot.get(host, now))
+        self.next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class AsyncFetcher:
+    """
+    Fetches pages concurrently on an asyncio event loop with a concurrency limit, per host rate limiting, timeouts
+    and retries with exponential backoff. Uses aiohttp if it is installed and falls back to running requests in
+    worker threads (one session per thread) otherwise. If a ResponseCache is given, fresh responses are served from
+    it and stale ones are revalidated with conditional requests
+    """
+
+    def __init__(self, headers: dict = None, concurrency: int = 10, requests_per_second: float = 25,
+                 retries: int = 3, backoff: float = 0.5, timeout: float = 15, cache: ResponseCache = None):
+        """
+        :param headers: Headers sent with every request
+        :param concurrency: Maximum amount of requests in flight at the same time
+        :param requests_per_second: Maximum amount of requests started per second and host (0 disables the limit)
+        :param retries: How often a failed request (connection error, timeout, 429 or 5xx) is retried
+        :param backoff: Base delay in seconds before the first retry, doubled for every further retry
+        :param timeout: Timeout in seconds for a single request
+        :param cache: Optional ResponseCache to serve and store responses
+        """
+        self.headers = headers or {}
+        self.concurrency = concurrency
+        self.requests_per_second = requests_per_second
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache = cache
+        self.sessions = local()
+
+    def get(self, url: str) -> str:
+        """
+        :return: The text of url, fetched synchronously on the calling thread (through the cache, without retries)
+        """
+        entry = self.__cached(url)
+        if isinstance(entry, str):
+            return entry
+        status, text, headers = self.__blocking_get(url, self.cache.conditional_headers(entry) if entry else {})
+        return self.__handle(url, entry, status, text, headers)
+
+    def __cached(self, url: str):
+        """
+        :return: The cached body if it can be served without a request, else the (possibly stale) cache entry or None
+        """
+        if self.cache is None:
+            return None
+        entry = self.cache.get(url)
+        if entry is not None and (self.cache.offline or self.cache.is_fresh(entry)):
+            return entry.body
+        if self.cache.offline:
+            raise FetchError(f"{url} is not cached (offline mode)")
+        return entry
+
+    def __handle(self, url: str, entry: CachedResponse, status: int, text: str, headers) -> str:
+        if status == 304 and entry is not None:
+            self.cache.touch(url)
+            return entry.body
+        if status == 200 and self.cache is not None:
+            self.cache.put(url, text, headers.get("ETag"), headers.get("Last-Modified"))
+        return text
+
+    def run(self, jobs: list, worker) -> list:
+        """
+        :param jobs: Arguments, each passed to worker on its own
+        :param worker: Coroutine function worker(fetch, job), where fetch(url) is a coroutine returning the page text
+        :return: Runs all jobs on a new event loop and returns their results (or raised exceptions) in order
+        """
+        return asyncio.run(self.gather(jobs, worker))
+
+    async def gather(self, jobs: list, worker) -> list:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        limiter = HostRateLimiter(self.requests_per_second)
+        if aiohttp is not None:
+            async with aiohttp.ClientSession(headers=self.headers,
+                                             timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
+                fetch = lambda url: self.__fetch(url, semaphore, limiter, session)
+                return await asyncio.gather(*[worker(fetch, job) for job in jobs], return_exceptions=True)
+        fetch = lambda url: self.__fetch(url, semaphore, limiter, None)
+        return await asyncio.gather(*[worker(fetch, job) for job in jobs], return_exceptions=True)
+
+    async def __fetch(self, url: str, semaphore: asyncio.Semaphore, limiter: HostRateLimiter, session) -> str:
+        entry = self.__cached(url)
+        if isinstance(entry, str):
+            return entry
+        conditional = self.cache.conditional_headers(entry) if entry else {}
+        for attempt in range(self.retries + 1):
+            try:
+                async with semaphore:
+                    await limiter.wait(url)
+                    if session is not None:
+                        async with session.get(url, headers=conditional) as response:
+                            status, text, headers = response.status, await response.text(), response.headers
+                    else:
+                        status, text, headers = await asyncio.to_thread(self.__blocking_get, url, conditional)
+                if status != 429 and status < 500:
+                    return self.__handle(url, entry, status, text, headers)
+                error = FetchError(f"Got status {status} for {url}")
+            except RETRYABLE_ERRORS as e:
+                error = FetchError(f"Failed to fetch {url}: {e!r}")
+            if attempt < self.retries:
+                await asyncio.sleep(self.backoff * 2 ** attempt * (1 + random.random() / 2))
+        raise error
+
+    def __blocking_get(self, url: str, conditional: dict) -> tuple:
+        if (session := getattr(self.sessions, "session", None)) is None:
+            session = self.sessions.session = requests.session()
+        response = session.get(url, headers={**self.headers, **conditional}, timeout=self.timeout)
+        return response.status_code, response.text, response.headers
@@ -0,0 +1,138 @@
+import unicodedata
+from threading import RLock
+from typing import NamedTuple
+
+from questions import QuestionIndex, iter_slots
+
+
+def normalize_form(form: str, fold_accents: bool = True, fold_letters: bool = False) -> str:
+    """
+    :param fold_accents: Whether to remove accents / macrons
+    :param fold_letters: Whether to write j as i and v as u
+    :return: form in lower case with single spaces (and folded as requested)
+    """
+    form = form.lower()
+    if fold_accents and not form.isascii():
+        form = "".join(c for c in unicodedata.normalize("NFD", form) if not unicodedata.combining(c))
+    if fold_letters:
+        form = form.replace("j", "i").replace("v", "u")
+    return " ".join(form.split())
+
+
+def edit_distance(a: str, b: str, bound: int) -> int:
+    """
+    :return: The edit distance of a and b (insertions, deletions, substitutions and swaps of adjacent characters), or
+             bound + 1 if it exceeds bound
+    """
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    previous, row = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(row[j] + 1, current[j - 1] + 1, row[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous[j - 2] + 1)
+        if min(current) > bound:
+            return bound + 1
+        previous, row = row, current
+    return min(row[-1], bound + 1)
+
+
+class FormSlot(NamedTuple):
+    verb: str
+    tense: str
+    path: tuple
+
+    def describe(self) -> str:
+        """
+        :return: The slot in the wording of the questions, e.g. 'Präsens Indikativ Aktiv 1. Person Singular von amare'
+        """
+        # The paths of the Partizipien and the Imperativ already name them ('PPP ...', 'Imperativ I ...')
+        words = self.path if self.tense in ("Partizipien", "Imperativ") else (self.tense, *self.path)
+        return f"{' '.join(words)} von {self.verb}"
+
+
+class FormIndex:
+    """Reverse index from the normalized Latin forms to every (verb, tense, path) slot producing them"""
+
+    def __init__(self, data: dict = None):
+        self.lock = RLock()
+        self.forms = {}
+        self.verb_forms = {}
+        if data:
+            self.update(data)
+
+    def __len__(self) -> int:
+        return len(self.forms)
+
+    def __contains__(self, verb: str) -> bool:
+        return verb in self.verb_forms
+
+    def add(self, verb: str, paradigm: dict) -> None:
+        """
+        :return: Adds the forms of a verb, replacing the forms it had before
+        """
+        with self.lock:
+            self.remove(verb)
+            keys = self.verb_forms[verb] = []
+            for tense, path, answer, _, _ in iter_slots(paradigm):
+                if QuestionIndex.is_valid(answer):
+                    keys.append(key := normalize_form(answer, fold_letters=True))
+                    self.forms.setdefault(key, []).append(FormSlot(verb, tense, path))
+
+    def update(self, new_data: dict) -> None:
+        for verb, paradigm in new_data.items():
+            self.add(verb, paradigm)
+
+    def remove(self, verb: str) -> None:
+        with self.lock:
+            for key in self.verb_forms.pop(verb, ()):
+                if slots := [slot for slot in self.forms.get(key, ()) if slot.verb != verb]:
+                    self.forms[key] = slots
+                else:
+                    self.forms.pop(key, None)
+
+    def lookup(self, form: str) -> list:
+        """
+        :return: Every FormSlot producing form (an empty list if no indexed verb does)
+        """
+        return list(self.forms.get(normalize_form(form, fold_letters=True), ()))
+
+
+class AnswerMatcher:
+    """
+    Checks typed answers against the correct answer(s) of a question. The comparison keys of the answers are computed
+    once per question, so checking an input is one normalization and a set lookup. Inputs that are wrong but within
+    max_distance edits of an answer are reported as near misses
+    """
+
+    def __init__(self, answers, fold_accents: bool = True, fold_letters: bool = False, max_distance: int = 1):
+        """
+        :param answers: The correct answer (str) or answers (list)
+        :param fold_accents: Whether accents / macrons are ignored
+        :param fold_letters: Whether j / i and v / u are treated as the same letter (optional, as it accepts answers
+                             that are spelled differently than taught)
+        :param max_distance: Maximum amount of edits for an input to count as a near miss (0 to not report any)
+        """
+        self.answers = (answers,) if isinstance(answers, str) else tuple(answers)
+        self.fold_accents = fold_accents
+        self.fold_letters = fold_letters
+        self.max_distance = max_distance
+        self.keys = frozenset(self.key(answer) for answer in self.answers)
+
+    def key(self, text: str) -> str:
+        return normalize_form(text, self.fold_accents, self.fold_letters)
+
+    def matches(self, text: str) -> bool:
+        return self.key(text) in self.keys
+
+    def near_miss(self, text: str):
+        """
+        :return: The answer text is a near miss of (the closest one), or None if it is correct or no near miss
+        """
+        if (key := self.key(text)) in self.keys or not key:
+            return None
+        distance, closest = min((edit_distance(key, self.key(answer), self.max_distance), answer)
+                                for answer in self.answers)
+        return closest if distance <= self.max_distance else None
@@ -0,0 +1,77 @@
+from bisect import bisect_right
+from typing import NamedTuple
+
+
+class LevelState(NamedTuple):
+    level: int
+    streak: int
+    delay_factor: float
+
+    def label(self) -> str:
+        return f"Level: {self.level}-{self.streak + 1}"
+
+
+class LevelCurve:
+    """
+    Table driven level progression: the level bounds split the levels into bands, each band has the streak needed
+    for the next level. A streak of demotion_streak drops one level, continuing with the streak just below the
+    promotion threshold of the new level
+    """
+
+    def __init__(self, bounds: list = (1, 3, 5, 8, 10, 13), thresholds: list = (2, 3, 4, 6, 7, 9, 10),
+                 delay_factors: list = (1.5, 1.2, 1.1, 1, 0.95, 0.9, 0.85, 0.8, 0.75, 0.7, 0.65, 0.6, 0.55, 0.5),
+                 demotion_streak: int = -2):
+        """
+        :param bounds: Ascending first levels of the bands after the first one (which starts at level 0)
+        :param thresholds: Streak needed for the next level in each band (one more than bounds)
+        :param delay_factors: Factor of the answer time for each level (the last one applies to all higher levels)
+        :param demotion_streak: Streak (negative) at which the level drops
+        """
+        # Converted up front, so a malformed curve (e.g. from the options) fails here and not while answering
+        bounds, thresholds = tuple(map(int, bounds)), tuple(map(int, thresholds))
+        delay_factors, demotion_streak = tuple(map(float, delay_factors)), int(demotion_streak)
+        if len(thresholds) != len(bounds) + 1:
+            raise ValueError(f"Got {len(thresholds)} thresholds for {len(bounds) + 1} level bands")
+        if list(bounds) != sorted(set(bounds)) or (bounds and bounds[0] <= 0):
+            raise ValueError(f"Got invalid level bounds (expected ascending positive levels): {bounds}")
+        if not delay_factors:
+            raise ValueError("Got no delay factors")
+        if demotion_streak >= 0 or min(thresholds) <= 0:
+            raise ValueError("The demotion streak has to be negative and the thresholds positive")
+        self.bounds = bounds
+        self.thresholds = thresholds
+        self.delay_factors = delay_factors
+        self.demotion_streak = demotion_streak
+
+    @classmethod
+    def from_options(cls, options: dict = None) -> "LevelCurve":
+        """
+        :param options: Keyword arguments of LevelCurve (e.g. the 'level_curve' of the app options), None for defaults
+        :return: The curve, raises a ValueError or TypeError if options do not describe a valid curve
+        """
+        return cls(**(options or {}))
+
+    def threshold(self, level: int) -> int:
+        return self.thresholds[bisect_right(self.bounds, level)]
+
+    def delay_factor(self, level: int) -> float:
+        return self.delay_factors[min(max(level, 0), len(self.delay_factors) - 1)]
+
+    def state(self, level: int, streak: int) -> LevelState:
+        return LevelState(level, streak, self.delay_factor(level))
+
+    def answer(self, level: int, streak: int, correct: bool) -> LevelState:
+        """
+        :param level: Level before the answer
+        :param streak: Streak before the answer
+        :param correct: Whether the answer was correct
+        :return: Level, streak and delay factor after the answer
+        """
+        streak += 1 if correct else -1
+        if streak > self.demotion_streak:
+            if streak >= self.threshold(level):
+                return self.state(level + 1, 0)
+            return self.state(level, streak)
+        if level > 0:
+            return self.state(level - 1, self.threshold(level - 1) - 1)
+        return self.state(level, self.demotion_streak + 1)
@@ -1,53 +1,31 @@
-import json
-from kivy.clock import mainthread
+from threading import Thread
+from kivy.clock import Clock
 from kivymd.uix.button import MDFlatButton
 from kivymd.uix.dialog import MDDialog
 
 from Scraper import VerbenScraper
-from base import BaseApp, ListItem, ItemSeparator, GIF, BaseLabel
-
-
-class Scraper(VerbenScraper):
-    def __init__(self, multi_update_callback=None):
-        super().__init__()
-        self.multi_update_callback = multi_update_callback
-
-    @staticmethod
-    def load_data(only_data: bool = True) -> dict:
-        try:
-            with open("./data.json", "r") as data_file:
-                try:
-                    data = json.load(data_file)
-                except Exception:
-                    data = {}
-            if only_data:
-                return data.get("data", {})
-            else:
-                return data
-        except FileNotFoundError:
-            return {}
-
-    def save_data(self) -> None:
-        settings = self.load_data(only_data=False)
-        if "data" in settings:
-            del settings["data"]
-        with open("./data.json", "w") as file:
-            json.dump({"data": self.data, **settings}, file)
-
-    def multi_update_on_finish_callback(self, saving: bool):
-        super().multi_update_on_finish_callback(saving)
-        if self.multi_update_callback is not None:
-            self.multi_update_callback()
+from questions import QuestionQueue
+from forms import AnswerMatcher
+from srs import GRADE_CORRECT, GRADE_HARD, GRADE_WRONG
+from levels import LevelCurve
+from progress import ImportProgress
+from packs import PACK_EXTENSION
+from base import BaseApp, ListItem, ItemSeparator, GIF, BaseLabel, ui_update
 
 
 class LateinVerbenApp(BaseApp):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.Scraper = Scraper(multi_update_callback=self.get_data_callback)
-        self.current_words_widgets = []
-        self.current_words_separators = []
+        self.Scraper = VerbenScraper(storage=self.storage)
+        self.question_queue = QuestionQueue(self.Scraper.get_random_question, discard=self.Scraper.release_questions)
+        self.quiz_available = False
+        self.nothing_found_separators = []
         self.remove_dialog = None
         self.current_question = None
+        self.question_retry = None
+        self.answer_matcher = None
+        self.answered_wrong = False
+        self.level_curve = LevelCurve()
         self.nothing_found_label = BaseLabel(text="Es konnten keine Vokabel Daten gefunden werden."
                                                 "\nBitte aktualisieren sie die Vokabel Daten.", text_color=(1, 1, 1, 1),
                                            halign="center", font_style="H4", theme_text_color="Custom")
@@ -62,17 +40,29 @@ class LateinVerbenApp(BaseApp):
 
     def on_startup(self):
         self.load_from_scraper()
-        self.start_quiz()
+        self.refresh_question_queue()
+        self.ui.submit(self.start_quiz)
         self.load_gif()
-        self.GIF.bind(size=self.adjust_block_size)
+        self.ui.submit(self.GIF.bind, size=self.adjust_block_size)
+        self.resume_refresh()
+
+    def on_stop(self):
+        self.question_queue.stop()
+        super().on_stop()
 
     def save_store(self) -> None:
         self.options.update({"counters": {"correct": self.root.ids.correct_counter.text, "incorrect":
             self.root.ids.incorrect_counter.text}})
+        self.Scraper.save_data()
         super().save_store()
 
-    def check_store(self, options_defaults_to: dict = None, data_defaults_to: dict = None) -> None:
-        super().check_store(options_defaults_to, data_defaults_to)
+    def check_store(self, options_defaults_to: dict = None) -> None:
+        super().check_store(options_defaults_to)
+        try:
+            self.level_curve = LevelCurve.from_options(self.options.get("level_curve"))
+        except (TypeError, ValueError):
+            # A malformed stored curve must not keep the app from starting
+            self.level_curve = LevelCurve()
         self.set_correct_incorrect_counters()
         toggle_settings = self.options.get("toggle_settings", {})
         self.root.ids.delete_confirmation.toggled = toggle_settings.get("delete_confirmation", True)
@@ -82,6 +72,7 @@ class LateinVerbenApp(BaseApp):
         self.root.ids.exclude_imp2.toggled = toggle_settings.get("exclude_imp2", True)
         self.root.ids.exclude_supina.toggled = toggle_settings.get("exclude_supina", True)
         self.root.ids.use_levels.toggled = toggle_settings.get("use_levels", True)
+        self.root.ids.fold_letters.toggled = toggle_settings.get("fold_letters", False)
 
     def adjust_block_size(self, *_):
         x, y = self.GIF.get_norm_image_size()
@@ -89,7 +80,7 @@ class LateinVerbenApp(BaseApp):
         self.root.ids.block_container.x = self.GIF.get_center_x()-x/2.5
         self.root.ids.block_container.y = self.GIF.get_center_y()-y/2.75
 
-    @mainthread
+    @ui_update
     def set_correct_incorrect_counters(self):
         self.root.ids.correct_counter.text = self.options.get("counters", {}).get("correct", "Richtig: 0")
         self.root.ids.incorrect_counter.text = self.options.get("counters", {}).get("incorrect", "Falsch: 0")
@@ -103,52 +94,55 @@ class LateinVerbenApp(BaseApp):
             self.options.update({"counters": {"correct": "Richtig: 0", "incorrect": "Falsch: 0"}})
         self.set_correct_incorrect_counters()
 
-    @mainthread
+    @ui_update
     def load_gif(self):
         self.root.ids.main_box.add_widget(self.GIF)
         self.root.ids.main_box.add_widget(ItemSeparator())
 
-    @mainthread
-    def add_list_item(self, text: str):
-        Sep = ItemSeparator()
-        Item = ListItem(text=text)
-        Item.children[1].children[0].children[0].toggled = self.options.get("toggled", {}).get(text, True)
-        self.current_words_separators.append(Sep)
-        self.current_words_widgets.append(Item)
-        self.root.ids.current_words_box.add_widget(Sep)
-        self.root.ids.current_words_box.add_widget(Item)
-
-    @mainthread
+    @ui_update
+    def add_list_items(self, words: list):
+        self.root.ids.current_words_list.add_many(words, self.options.get("toggled", {}))
+
+    @ui_update
     def add_nothing_found_label(self):
-        self.current_words_separators.extend([ItemSeparator(height=self.root.ids.list_header.height), ItemSeparator(), ItemSeparator(), ItemSeparator()])
-        for sep in self.current_words_separators:
+        self.nothing_found_separators = [ItemSeparator(height=self.root.ids.list_header.height), ItemSeparator(), ItemSeparator(), ItemSeparator()]
+        for sep in self.nothing_found_separators:
             self.root.ids.current_words_box.add_widget(sep)
         self.root.ids.current_words_box.add_widget(self.nothing_found_label)
 
-    @mainthread
+    @ui_update
     def remove_nothing_found_label(self):
-        for sep in self.current_words_separators:
+        for sep in self.nothing_found_separators:
             self.root.ids.current_words_box.remove_widget(sep)
+        self.nothing_found_separators = []
         self.root.ids.current_words_box.remove_widget(self.nothing_found_label)
 
     def submit_answer(self, instance, *_):
         if instance.text and self.current_question is not None and "Zeit ist um!" not in self.root.ids.timed_out_label.text:
-            if isinstance(self.current_question[1], str):
-                if instance.text.lower().strip() == self.current_question[1].lower().strip():
-                    self.stop_gif()
-                    self.increase_correct_score()
-                    self.display_correct_answer()
-                    self.correct_text_field(self.root.ids.validate_field)
-                else:
-                    self.incorrect_text_field(self.root.ids.validate_field)
+            if self.answer_matcher.matches(instance.text):
+                self.Scraper.record_answer(self.current_question, GRADE_HARD if self.answered_wrong else GRADE_CORRECT)
+                self.stop_gif()
+                self.increase_correct_score()
+                self.display_correct_answer()
+                self.correct_text_field(self.root.ids.validate_field)
             else:
-                if instance.text.lower().strip() in [t.lower().strip() for t in self.current_question[1]]:
-                    self.stop_gif()
-                    self.increase_correct_score()
-                    self.display_correct_answer()
-                    self.correct_text_field(self.root.ids.validate_field)
-                else:
-                    self.incorrect_text_field(self.root.ids.validate_field)
+                self.answered_wrong = True
+                self.incorrect_text_field(self.root.ids.validate_field, self.incorrect_text(instance.text))
+
+    def incorrect_text(self, text: str) -> str:
+        if self.answer_matcher.near_miss(text) is not None:
+            return "Knapp daneben! Achte auf die Schreibweise."
+        if typed := self.Scraper.describe_form(text, limit=1):
+            return f"Falsch! Das ist {typed}"
+        return "Falsch!"
+
+    def analyse_form(self, *_):
+        if form := self.root.ids.analyse_field.text.strip():
+            Thread(target=lambda: self.set_analyse_result(self.Scraper.analyse_form(form))).start()
+
+    @ui_update
+    def set_analyse_result(self, found: list):
+        self.root.ids.analyse_label.text = "\n".join(found) if found else "Diese Form ist in keiner Vokabel enthalten."
 
     def display_correct_answer(self):
         self.root.ids.timed_out_label.text = f"[color=#9999cc]{self.current_question[0].replace('Was ist ', '').replace('?', '')} ist [size=35]{self.current_question[1]}[/size][/color]"
@@ -189,82 +183,28 @@ class LateinVerbenApp(BaseApp):
         text_field.icon_left_color_focused = (1, 0, 0, 1)
 
     def time_is_up(self, *_):
+        self.Scraper.record_answer(self.current_question, GRADE_WRONG)
         self.incorrect_text_field(self.root.ids.validate_field, f"Die Zeit ist um!")
         self.root.ids.timed_out_label.text = f"[size=40]Die Zeit ist um![/size]\n[color=#9999cc]{self.current_question[0].replace('Was ist ', '').replace('?', '')}" \
                                              f"ist [size=35]{self.current_question[1]}[/size][/color]"
         self.increase_incorrect_score()
 
-    @mainthread
+    @ui_update
     def increase_correct_score(self):
         self.root.ids.correct_counter.text = f"Richtig: {int(self.root.ids.correct_counter.text[self.root.ids.correct_counter.text.rfind(' ')+1:])+1}"
         if self.from_toggle_settings("use_levels"):
-            self.options.update({"streak": (streak := self.options.get("streak", 0)+1)})
-            self.determine_level(streak)
+            self.update_level(True)
 
-    @mainthread
+    @ui_update
     def increase_incorrect_score(self):
         self.root.ids.incorrect_counter.text = f"Falsch: {int(self.root.ids.incorrect_counter.text[self.root.ids.incorrect_counter.text.rfind(' ')+1:])+1}"
         if self.from_toggle_settings("use_levels"):
-            self.options.update({"streak": (streak := self.options.get("streak", 0)-1)})
-            self.determine_level(streak)
-
-    def determine_level(self, streak):
-        current_level = self.options.get("level", 1)
-        if streak > -2:
-            if not current_level and streak > 1:
-                self.options.update({"streak": 0, "level": current_level + 1})
-                self.root.ids.level_counter.text = f"Level: {current_level+1}-1"
-            elif current_level < 3 and streak > 2:
-                self.options.update({"streak": 0, "level": current_level + 1})
-                self.root.ids.level_counter.text = f"Level: {current_level+1}-1"
-            elif current_level < 5 and streak > 3:
-                self.options.update({"streak": 0, "level": current_level+1})
-                self.root.ids.level_counter.text = f"Level: {current_level+1}-1"
-            elif current_level < 8 and streak > 5:
-                self.options.update({"streak": 0, "level": current_level+1})
-                self.root.ids.level_counter.text = f"Level: {current_level+1}-1"
-            elif current_level < 10 and streak > 6:
-                self.options.update({"streak": 0, "level": current_level+1})
-                self.root.ids.level_counter.text = f"Level: {current_level+1}-1"
-            elif current_level < 13 and streak > 8:
-                self.options.update({"streak": 0, "level": current_level + 1})
-                self.root.ids.level_counter.text = f"Level: {current_level+1}-1"
-            elif streak > 9:
-                self.options.update({"streak": 0, "level": current_level+1})
-                self.root.ids.level_counter.text = f"Level: {current_level+1}-1"
-            else:
-                self.root.ids.level_counter.text = f"Level: {current_level}-{streak + 1}"
-        elif streak < -1 and current_level:
-            current_level -= 1
-            self.options.update({"streak": 0, "level": current_level})
-            if not current_level:
-                new_streak = 1
-                self.options.update({"streak": new_streak, "level": current_level})
-                self.root.ids.level_counter.text = f"Level: {current_level}-{new_streak+1}"
-            elif current_level < 3:
-                new_streak = 2
-                self.options.update({"streak": new_streak, "level": current_level})
-                self.root.ids.level_counter.text = f"Level: {current_level}-{new_streak+1}"
-            elif current_level < 5:
-                new_streak = 3
-                self.options.update({"streak": new_streak, "level": current_level})
-                self.root.ids.level_counter.text = f"Level: {current_level}-{new_streak+1}"
-            elif current_level < 8:
-                new_streak = 5
-                self.options.update({"streak": new_streak, "level": current_level})
-                self.root.ids.level_counter.text = f"Level: {current_level}-{new_streak+1}"
-            elif current_level < 10:
-                new_streak = 6
-                self.options.update({"streak": new_streak, "level": current_level})
-                self.root.ids.level_counter.text = f"Level: {current_level}-{new_streak+1}"
-            elif current_level < 13:
-                new_streak = 8
-                self.options.update({"streak": new_streak, "level": current_level})
-                self.root.ids.level_counter.text = f"Level: {current_level}-{new_streak+1}"
-            else:
-                new_streak = 9
-                self.options.update({"streak": new_streak, "level": current_level})
-                self.root.ids.level_counter.text = f"Level: {current_level}-{new_streak+1}"
+            self.update_level(False)
+
+    def update_level(self, correct: bool) -> None:
+        state = self.level_curve.answer(self.options.get("level", 1), self.options.get("streak", 0), correct)
+        self.options.update({"level": state.level, "streak": state.streak})
+        self.root.ids.level_counter.text = state.label()
 
     def remove_time_is_up_label(self):
         self.root.ids.timed_out_label.text = ""
@@ -277,10 +217,9 @@ class LateinVerbenApp(BaseApp):
         self.GIF.start_animation_schedule(target_screen=[self.root.ids.nav.children[1], "screen 1"], delay=self.options.get("delay", 1.2) * self.get_level_increase())
         self.root.ids.validate_field.set_text_func = lambda *_: self.GIF.modify_delay(1.25, tolerance_cap=len(self.current_question[1]), max_delay_increase_factor=1.75)
 
-    def get_level_increase(self) -> int:
+    def get_level_increase(self) -> float:
         if self.from_toggle_settings("use_levels"):
-            return {0: 1.5, 1: 1.2, 2: 1.1, 3: 1, 4: 0.95, 5: 0.9, 6: 0.85, 7: 0.8, 8: 0.75, 9: 0.7, 10: 0.65, 11: 0.6,
-                    12: 0.55}.get(level, 1) if (level := self.options.get("level", 1)) < 13 else 0.5
+            return self.level_curve.delay_factor(self.options.get("level", 1))
         return 1
 
     def start_quiz(self):
@@ -291,35 +230,60 @@ class LateinVerbenApp(BaseApp):
             self.root.ids.stop_btn.line_color = "orange"
             self.root.ids.stop_btn.icon_color = "orange"
             self.root.ids.stop_btn.text = "Stop"
-        exclude = [t for t in self.Scraper.data.keys() if not self.options.get("toggled", {}).get(t, True)]
         self.root.ids.validate_field.text = ""
         self.GIF.reset()
         self.reset_text_field(self.root.ids.validate_field)
-        if set(exclude) != set(self.Scraper.data.keys()):
+        if self.quiz_available:
             self.remove_time_is_up_label()
             if self.current_question is not None:
                 self.display_correct_answer()
-            self.current_question = self.Scraper.get_random_question(ignore_gender_parti=self.from_toggle_settings("ignore_gender_parti"),
-                                                                     exclude_choice=exclude, ignore_gender_gerundivum=self.from_toggle_settings("ignore_gender_geru", defaults_to=False),
-                                                                     exclude_imperativ_2=self.from_toggle_settings("exclude_imp2"), exclude_tense=["Supina"] if self.from_toggle_settings("exclude_supina") else [])
-            self.reset_text_field(self.root.ids.validate_field)
-            self.root.ids.current_q.text = self.current_question[0]
-            self.animate_gif()
+                self.current_question = None
+            self.show_next_question()
         else:
             self.root.ids.current_q.text = "Keine Daten vorhanden/ausgewählt"
 
+    def show_next_question(self, *_):
+        # The questions are prepared by the queue's producer thread, until one is ready (e.g. right after the settings
+        # changed) a placeholder is shown and the queue is polled again on the next frames
+        if self.question_retry is not None:
+            self.question_retry.cancel()
+            self.question_retry = None
+        if self.current_question is not None:
+            return
+        if not self.quiz_available:
+            self.root.ids.current_q.text = "Keine Daten vorhanden/ausgewählt"
+            return
+        if (question := self.question_queue.pop(timeout=0)) is None:
+            self.root.ids.current_q.text = "Keine Fragen verfügbar" if self.question_queue.error is not None else "Lädt..."
+            self.question_retry = Clock.schedule_once(self.show_next_question, 0.1)
+            return
+        self.current_question = question
+        self.answer_matcher = AnswerMatcher(self.current_question[1], fold_letters=self.from_toggle_settings(
+            "fold_letters", defaults_to=False))
+        self.answered_wrong = False
+        self.reset_text_field(self.root.ids.validate_field)
+        self.root.ids.current_q.text = self.current_question[0]
+        self.animate_gif()
+
+    def refresh_question_queue(self):
+        exclude = [t for t in self.Scraper.data.keys() if not self.options.get("toggled", {}).get(t, True)]
+        self.quiz_available = len(exclude) != len(self.Scraper.data)
+        self.question_queue.configure(ignore_gender_parti=self.from_toggle_settings("ignore_gender_parti"),
+                                      exclude_choice=exclude, ignore_gender_gerundivum=self.from_toggle_settings("ignore_gender_geru", defaults_to=False),
+                                      exclude_imperativ_2=self.from_toggle_settings("exclude_imp2"), exclude_tense=["Supina"] if self.from_toggle_settings("exclude_supina") else [])
+
     def from_toggle_settings(self, value, defaults_to=True):
         return self.options.get("toggle_settings", {}).get(value, defaults_to)
 
     def load_from_scraper(self):
-        if self.Scraper.currently_contained:
-            for word in self.Scraper.currently_contained:
-                self.add_list_item(word)
+        if words := self.Scraper.currently_contained:
+            self.add_list_items(words)
         else:
             self.add_nothing_found_label()
 
     def open_remove_dialog(self, item: ListItem):
-        self.last_pressed_item_delete = item
+        # The name, as the ListItem may be recycled for another verb while the dialog is open
+        self.last_pressed_item_delete = item.txt
         if self.root.ids.delete_confirmation.toggled:
             if self.remove_dialog is None:
                 self.remove_dialog = MDDialog(
@@ -338,36 +302,32 @@ class LateinVerbenApp(BaseApp):
         self.remove_dialog.dismiss()
         self.remove_item(self.last_pressed_item_delete)
 
-    def remove_item(self, item: ListItem):
-        if item in self.current_words_widgets:
-            i = self.current_words_widgets.index(item)
-            self.root.ids.current_words_box.remove_widget(self.current_words_separators[i])
-            self.root.ids.current_words_box.remove_widget(item)
-            del self.current_words_widgets[i], self.current_words_separators[i]
-
+    def remove_item(self, name: str):
+        if self.root.ids.current_words_list.remove(name):
             try:
-                del self.data[item.children[0].text]
+                del self.data[name]
             except Exception:
                 pass
+            self.Scraper.delete_data(name)
             try:
-                del self.Scraper.data[item.children[0].text]
-            except Exception:
-                pass
-            try:
-                del self.options["toggled"][item.children[0].text]
+                del self.options["toggled"][name]
             except Exception:
                 pass
+            self.refresh_question_queue()
+            self.question_queue.invalidate()
 
-            if not self.current_words_separators and not self.current_words_widgets:
+            if not len(self.root.ids.current_words_list):
                 self.add_nothing_found_label()
 
     def toggle_chip(self, obj) -> None:
         super().toggle_chip(obj)
         if hasattr(obj, "toggling_options"):
+            name = obj.parent.parent.parent.children[0].text
             if "toggled" in self.options:
-                self.options.get("toggled").update({obj.parent.parent.parent.children[0].text: obj.toggled})
+                self.options.get("toggled").update({name: obj.toggled})
             else:
-                self.options.update({"toggled": {obj.parent.parent.parent.children[0].text: obj.toggled}})
+                self.options.update({"toggled": {name: obj.toggled}})
+            self.root.ids.current_words_list.set_toggled(name, obj.toggled)
         elif obj.text == "Nach Löschbestätigung für Vokabeln fragen?":
             self.set_toggle_settings(obj.toggled, "delete_confirmation")
         elif obj.text == "Geschlecht bei Partizipien vernachlässigen?":
@@ -378,12 +338,17 @@ class LateinVerbenApp(BaseApp):
             self.set_toggle_settings(obj.toggled, "exclude_imp2")
         elif obj.text == "Supina ausschließen?":
             self.set_toggle_settings(obj.toggled, "exclude_supina")
+        elif obj.text == "j/i und v/u gleichsetzen?":
+            self.set_toggle_settings(obj.toggled, "fold_letters")
+            if self.answer_matcher is not None:
+                self.answer_matcher = AnswerMatcher(self.answer_matcher.answers, fold_letters=obj.toggled)
         elif obj.text == "Levelsystem benutzen?":
             self.set_toggle_settings(obj.toggled, "use_levels")
             if not obj.toggled:
                 self.root.ids.level_counter.text = ""
             else:
                 self.root.ids.level_counter.text = f"Level: {self.options.get('level', 1)}-{self.options.get('streak', 0)+1}"
+        self.refresh_question_queue()
 
     def set_toggle_settings(self, state, value):
         if "toggle_settings" in self.options:
@@ -392,48 +357,81 @@ class LateinVerbenApp(BaseApp):
             self.options.update({"toggle_settings": {value: state}})
 
     def update_current_words_list(self):
-        for to_add in [t for t in self.Scraper.data.keys() if t not in [x.children[0].text for x in self.current_words_widgets]]:
-            self.add_list_item(to_add)
+        self.add_list_items([t for t in self.Scraper.data.keys() if t not in self.root.ids.current_words_list])
 
-    @mainthread
-    def get_data_callback(self):
+    @ui_update
+    def get_data_callback(self, progress: ImportProgress):
         self.data = self.Scraper.data
 
-        if self.failure_label.text:
-            self.failure_label.text = ""
-        if self.success_label.text:
-            self.success_label.text = ""
-
-        if self.Scraper.failures:
-            failure = ', '.join(list({x.replace('\n', '').strip() for x in self.Scraper.failures}))
+        if progress.failures:
+            failure = ', '.join(f"{verb}({reason})" if reason != "nicht gefunden" else verb
+                                for verb, reason in progress.failures.items())
             self.failure_label.text = f"Folgende Vokabeln wurden nicht gefunden: {failure}"
-            self.Scraper.failures.clear()
             self.failure_label.text_color = (1, 0, 0, 1)
-        if self.Scraper.success:
-            success = ', '.join(list({x.replace('\n', '').strip() for x in self.Scraper.success}))
+        else:
+            self.failure_label.text = ""
+        if progress.succeeded:
+            success = ', '.join(dict.fromkeys(progress.succeeded))
             self.success_label.text = f"Folgende Vokabeln wurden hinzugefügt: {success}"
-            self.Scraper.success.clear()
             self.success_label.text_color = (0, 1, 0, 1)
+        else:
+            self.success_label.text = ""
 
         self.root.ids.get_data_field.text = ""
+        self.root.ids.get_data_btn.disabled = False
 
         if self.Scraper.currently_contained:
             self.remove_nothing_found_label()
 
         self.update_current_words_list()
+        self.refresh_question_queue()
+        self.question_queue.invalidate()
 
     def validate_get_data(self, *_):
-        self.root.ids.get_data_btn.disabled = True
-        if self.root.ids.get_data_field.text:
-            self.Scraper.assert_data_contains(list({y for x in self.root.ids.get_data_field.text.split(",") if (y := x.strip().lower())}), joining=False)
-        self.root.ids.get_data_btn.disabled = False
+        if (path := self.root.ids.get_data_field.text.strip()).endswith(PACK_EXTENSION):
+            self.root.ids.get_data_btn.disabled = True
+            self.failure_label.text = ""
+            progress = ImportProgress()
+            Thread(target=self.import_pack, args=(path, progress), daemon=True).start()
+            Thread(target=self.follow_import, args=(progress,), daemon=True).start()
+        elif words := list({y for x in self.root.ids.get_data_field.text.split(",") if (y := x.strip().lower())}):
+            self.root.ids.get_data_btn.disabled = True
+            self.failure_label.text = ""
+            progress = ImportProgress()
+            self.Scraper.assert_data_contains(words, joining=False, progress=progress)
+            Thread(target=self.follow_import, args=(progress,), daemon=True).start()
+
+    def import_pack(self, path: str, progress: ImportProgress):
+        """
+        :return: Imports a vocabulary pack (e.g. sideloaded onto the device) instead of looking the verbs up online
+        """
+        try:
+            self.Scraper.import_pack(path, progress=progress)
+        except ValueError:
+            pass  # Reported to progress as a failure of the import, which is shown by follow_import
+
+    def resume_refresh(self):
+        """
+        :return: Continues a refresh of the verbs that was interrupted (e.g. because the app was closed), if any
+        """
+        progress = ImportProgress()
+        if self.Scraper.resume_refresh(progress=progress) is not None:
+            Thread(target=self.follow_import, args=(progress,), daemon=True).start()
+
+    def follow_import(self, progress: ImportProgress):
+        """
+        :return: Shows the progress of an import while it runs (consuming its events on a worker thread)
+        """
+        for event in progress:
+            self.ui.set_text(self.success_label, event.describe())
+        self.get_data_callback(progress)
 
     def toggle_multi_chip(self, selected):
         super().toggle_multi_chip(selected)
         if selected.text in ["Einfach", "Sehr Einfach", "Schwierig", "Moderat"]:
             self.options.update({"delay": {"Einfach": 1.2, "Sehr Einfach": 2, "Moderat": 0.65, "Schwierig": 0.4}.get(selected.text)})
-            self.GIF.original_delay = self.options.get("delay", 1.2)
             self.GIF.delay = self.options.get("delay", 1.2)
+        self.refresh_question_queue()
 
     def stop_btn_pressed(self, *_):
         if self.GIF.is_animating:
@@ -446,7 +444,7 @@ class LateinVerbenApp(BaseApp):
                 self.root.ids.stop_btn.icon_color = 0.75, 0.92, 0.75, 1
                 self.root.ids.stop_btn.text = "Weiter"
             else:
-                self.GIF.start_animation_schedule(target_screen=[self.root.ids.nav.children[1], "screen 1"],delay=self.options.get("delay", 1.2) * self.get_level_increase(), instant=True)
+                self.GIF.resume()
                 self.stopped = False
                 self.root.ids.stop_btn.ripple_color = (1, 0, 0, 0.3)
                 self.root.ids.stop_btn.md_bg_color = (0.686, 0.133, 0.133)
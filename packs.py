@@ -0,0 +1,115 @@
+import gzip
+import json
+import sys
+import time
+from collections.abc import Mapping
+
+from questions import TENSES
+
+PACK_FORMAT = "lateinverben-pack"
+PACK_VERSION = 1
+PACK_EXTENSION = ".lvpack"
+
+
+def _count_forms(node, path: tuple) -> int:
+    """
+    :return: The amount of forms (string leaves) below node, raising a ValueError if node is no nested object of
+             forms with non-empty keys
+    """
+    if isinstance(node, str):
+        return 1
+    if not isinstance(node, Mapping):
+        raise ValueError(f"Got invalid conjugation data at {' > '.join(path)} (expected an object or a form)")
+    count = 0
+    for key, value in node.items():
+        if not isinstance(key, str) or not key:
+            raise ValueError(f"Got invalid key below {' > '.join(path)}: {key!r}")
+        count += _count_forms(value, path + (key,))
+    return count
+
+
+def validate_paradigm(paradigm) -> None:
+    """
+    :param paradigm: Conjugation data of a single verb (the tenses of questions.TENSES mapped to nested dicts with
+                     the forms as strings)
+    :return: Raises a ValueError if paradigm is not valid conjugation data: every top level key has to be a known
+             tense and at least one form has to be given
+    """
+    if not isinstance(paradigm, Mapping):
+        raise ValueError("Got invalid conjugation data (expected an object)")
+    forms = 0
+    for tense, node in paradigm.items():
+        if tense not in TENSES:
+            raise ValueError(f"Got unknown tense: {tense!r}")
+        if isinstance(node, str):
+            raise ValueError(f"Got a single form instead of the forms of {tense}")
+        forms += _count_forms(node, (tense,))
+    if not forms:
+        raise ValueError("Got conjugation data without any forms")
+
+
+def write_pack(path: str, verbs: Mapping, names: list) -> int:
+    """
+    :param path: Path of the pack to write (gzip compressed JSON lines: a header, then one verb per line)
+    :param verbs: Verbs mapped to their conjugation data (dicts or CompactParadigms, read one at a time)
+    :param names: The verbs to write
+    :return: The amount of verbs written
+    """
+    with gzip.open(path, "wt", encoding="utf-8") as pack:
+        pack.write(json.dumps({"format": PACK_FORMAT, "version": PACK_VERSION, "count": len(names),
+                               "created": time.time()}) + "\n")
+        for name in names:
+            paradigm = verbs[name]
+            paradigm = paradigm.to_dict() if hasattr(paradigm, "to_dict") else paradigm
+            pack.write(json.dumps({"name": name, "paradigm": paradigm}, ensure_ascii=False) + "\n")
+    return len(names)
+
+
+def read_pack(path: str):
+    """
+    :param path: Path of a pack written by write_pack
+    :return: Yields the header of the pack and then (name, conjugation data, error) for every verb, streamed from the
+             file. error is None for valid verbs, else the reason the verb is invalid (a ValueError is raised if the
+             file is no pack of a supported version)
+    """
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as pack:
+            header = json.loads(pack.readline() or "null")
+            if not isinstance(header, dict) or header.get("format") != PACK_FORMAT:
+                raise ValueError(f"{path} is no vocabulary pack")
+            if not isinstance(version := header.get("version"), int) or not 1 <= version <= PACK_VERSION:
+                raise ValueError(f"The pack has version {version}, but only up to {PACK_VERSION} is supported")
+            yield header
+            for number, line in enumerate(pack, 2):
+                if not line.strip():
+                    continue
+                record = None
+                try:
+                    record = json.loads(line)
+                    name, paradigm = record["name"], record["paradigm"]
+                    if not isinstance(name, str) or not name.strip():
+                        raise ValueError(f"Got invalid verb name: {name!r}")
+                    validate_paradigm(paradigm)
+                except (ValueError, KeyError, TypeError) as e:
+                    name = record.get("name") if isinstance(record, dict) else None
+                    yield name if isinstance(name, str) and name.strip() else f"Zeile {number}", None, str(e)
+                    continue
+                yield name.strip(), paradigm, None
+    except (OSError, EOFError) as e:
+        raise ValueError(f"Failed to read the pack {path}: {e}") from e
+
+
+if __name__ == '__main__':
+    # Builds a pack of all stored verbs, after adding the verbs given (scraped if they are not stored yet)
+    from Scraper import VerbenScraper
+    from progress import ImportProgress, print_progress
+
+    if len(sys.argv) < 2:
+        print(f"Usage: python packs.py <pack{PACK_EXTENSION}> [verbs...]")
+        sys.exit(1)
+    Scraper = VerbenScraper()
+    if words := sys.argv[2:]:
+        progress = ImportProgress()
+        Scraper.assert_data_contains(words, joining=False, progress=progress)
+        print_progress(progress)
+    print(f"{Scraper.export_pack(sys.argv[1])} Vokabeln exportiert")
@@ -0,0 +1,245 @@
+import json
+import sys
+from io import BytesIO
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.etree
+except ImportError:
+    lxml = None
+
+
+TITLE_TRANSLATIONS = {"Imperative": "Imperativ", "Infinite": "Infinitiv"}
+
+
+class SoupParser:
+    """
+    Parses the pages of frag-caesar.de with BeautifulSoup and the pure-Python html.parser \n
+    Other backends only override the node access methods (document, find, find_all, children, text), so every
+    backend runs the exact same extraction logic and produces the same dict structure
+    """
+    name = "html.parser"
+
+    def document(self, html: str):
+        return BeautifulSoup(html, "html.parser")
+
+    def find(self, node, tag: str, class_: str = None, id_: str = None):
+        attrs = {"class": class_} if class_ is not None else {"id": id_} if id_ is not None else {}
+        return node.find(tag, attrs=attrs)
+
+    def find_all(self, node, tag: str, class_: str = None, id_: str = None) -> list:
+        attrs = {"class": class_} if class_ is not None else {"id": id_} if id_ is not None else {}
+        return node.find_all(tag, attrs=attrs)
+
+    def children(self, node) -> list:
+        return list(node.children)
+
+    def text(self, node) -> str:
+        return node.text
+
+    def attribute(self, node, name: str) -> str:
+        return node.attrs[name]
+
+    def parse_page(self, html: str, base_address: str, exclude_supina: bool = False, follow: bool = True):
+        """
+        :param html: Text of a search result or conjugation page
+        :param base_address: Address relative links of search results are resolved against
+        :param exclude_supina: Whether to leave out the Supina
+        :param follow: Whether html may be a search result page
+        :return: The url of the conjugation page to follow if html is a search result page listing a verb, else the
+                 parsed data of the conjugation page ({} if nothing was found)
+        """
+        try:
+            document = self.document(html)
+        except Exception:
+            return {}
+
+        if follow and (selection := self.find(document, "div", id_="testimonials-1")) is not None:
+            all_verb_options = [sel for sel in self.find_all(selection, "li", "list-group-item list-toggle")
+                                if self.text(self.find(sel, "span", "badge badge-orange rounded badge-wordtype")) == "Verb"]
+            if all_verb_options:
+                return urljoin(base_address, self.attribute(self.find(all_verb_options[0], "a"), "href"))
+            return {}
+        try:
+            content = [child for child in self.children(self.find(document, "div", id_="vtab-1")) if not self.text(child) == "\n"]
+            grouped_content = {TITLE_TRANSLATIONS.get(self.text(a), self.text(a)): self.extract_from_toggle_element(b)
+                               for a, b in zip(content[::2], content[1::2])}
+            if exclude_supina:
+                if "Supina" in grouped_content.keys():
+                    del grouped_content["Supina"]
+            else:
+                grouped_content.update({"Supina": dict(zip(*grouped_content.get("Supina").items()))})
+            try:
+                grouped_content.update({"Gerundivum": grouped_content.get("Gerundivum").get("PPP")})
+                grouped_content.update({"Imperativ": {"Imperativ I": grouped_content.get("Imperativ").get("Aktiv"),
+                                        "Imperativ II": grouped_content.get("Imperativ").get("Passiv")}})
+            except Exception:
+                pass
+            return {self.text(self.find(self.find(document, "div", "table-responsive"), "td", "eh2")): grouped_content}
+        except Exception:
+            return {}
+
+    def extract_from_toggle_element(self, element) -> dict:
+        tables = self.find_all(element, "table")
+        special_table = self.text(self.find(tables[0], "tr")).strip().replace("\n", "") == "MaskulinumFemininumNeutrum"
+        infinitive_table_counter = 0
+        found = {"Aktiv": {}, "Passiv": {}} if not special_table else {"PPP": {"Singular": {}, "Plural": {}},
+                                                                       "PPA": {"Singular": {}, "Plural": {}},
+                                                                       "PFA": {"Singular": {}, "Plural": {}}}
+        for i, table in enumerate(tables):
+            if not special_table:
+                for tr in self.find_all(table, "tr"):
+                    if self.text(tr).strip().replace("\n", "") not in ["Passiv", "LateinDeutsch", "Latein", "Aktiv", "Supin I	Supin II", ]:
+                        tds = self.find_all(tr, "td")
+                        try:
+                            found.get("Aktiv" if not i and not infinitive_table_counter else "Passiv").update({self.text(tds[0]): self.td_text(tds[1])})
+                        except AttributeError:
+                            found.get("Aktiv" if not i and not infinitive_table_counter else "Passiv").update({self.text(tds[0]): self.text(tds[1])})
+                    elif len(tables) == 1 and self.text(tr).strip().replace("\n", "") == "Passiv":
+                        infinitive_table_counter += 1
+            else:
+                for tr in self.find_all(table, "tr"):
+                    if self.text(tr).strip().replace("\n", "") not in ["Passiv", "LateinDeutsch", "Latein", "Aktiv",
+                                                                       "MaskulinumFemininumNeutrum"]:
+                        tds = self.find_all(tr, "td")
+                        try:
+                            found.get("PPP" if i < 2 else "PPA" if i < 4 else "PFA").get("Singular" if not i % 2 else "Plural").update(
+                                {self.text(tds[0]): {"Maskulinum": self.td_text(tds[1]),
+                                                     "Femininum": self.td_text(tds[2]),
+                                                     "Neutrum": self.td_text(tds[3])}})
+                        except AttributeError:
+                            found.get("PPP" if i < 2 else "PPA" if i < 4 else "PFA").get(
+                                "Singular" if not i % 2 else "Plural").update(
+                                {self.text(tds[0]): {"Maskulinum": self.text(tds[1]),
+                                                     "Femininum": self.text(tds[2]),
+                                                     "Neutrum": self.text(tds[3])}})
+        return found if special_table or found.get("Passiv") else found.get("Aktiv")
+
+    def td_text(self, element) -> str:
+        if len(self.find_all(element, "span", "f")) == 1:
+            return self.text(element)
+        else:
+            return self.text(self.find(element, "span", "f"))
+
+
+class LxmlParser(SoupParser):
+    """
+    Parses the pages with lxml (libxml2), only keeping the subtrees the data is extracted from (the vtab-1 div with
+    the conjugation tables, the table with the name of the verb and the search results). Everything else is dropped
+    while parsing, so the extraction never walks it
+    """
+    name = "lxml"
+    KEPT = (("div", "id", "vtab-1"), ("div", "class", "table-responsive"), ("div", "id", "testimonials-1"))
+
+    @classmethod
+    def __kept(cls, element) -> bool:
+        return any(element.tag == tag and (value in (element.get(name) or "").split() if name == "class" else
+                                           element.get(name) == value) for tag, name, value in cls.KEPT)
+
+    @staticmethod
+    def __xpath(tag: str, class_: str = None, id_: str = None) -> str:
+        if class_ is not None:
+            # Same as BeautifulSoup: the whole class attribute or one of its classes has to match
+            return f'.//{tag}[normalize-space(@class)="{class_}" or ' \
+                   f'contains(concat(" ", normalize-space(@class), " "), " {class_} ")]'
+        if id_ is not None:
+            return f'.//{tag}[@id="{id_}"]'
+        return f".//{tag}"
+
+    def document(self, html: str):
+        # Open elements with whether they contain a kept subtree and the amount of open kept subtrees
+        root, path, inside = None, [], 0
+        for event, element in lxml.etree.iterparse(BytesIO(html.encode()), events=("start", "end"), html=True,
+                                                   recover=True, remove_comments=True, encoding="utf-8"):
+            if event == "start":
+                if root is None:
+                    root = element
+                if self.__kept(element):
+                    inside += 1
+                    path = [(open_element, True) for open_element, _ in path]
+                path.append((element, False))
+                continue
+            _, contains_kept = path.pop()
+            if self.__kept(element):
+                inside -= 1
+            elif not inside and not contains_kept and (parent := element.getparent()) is not None:
+                parent.remove(element)
+        if root is None:
+            raise ValueError("Got an empty page")
+        return root
+
+    def find(self, node, tag: str, class_: str = None, id_: str = None):
+        return found[0] if (found := self.find_all(node, tag, class_, id_)) else None
+
+    def find_all(self, node, tag: str, class_: str = None, id_: str = None) -> list:
+        return node.xpath(self.__xpath(tag, class_, id_))
+
+    def children(self, node) -> list:
+        found = [node.text] if node.text else []
+        for child in node:
+            found.append(child)
+            if child.tail:
+                found.append(child.tail)
+        return found
+
+    def text(self, node) -> str:
+        return node if isinstance(node, str) else "".join(node.itertext())
+
+    def attribute(self, node, name: str) -> str:
+        return node.attrib[name]
+
+
+PARSERS = {SoupParser.name: SoupParser, LxmlParser.name: LxmlParser}
+
+
+def get_parser(name: str = SoupParser.name) -> SoupParser:
+    """
+    :param name: 'html.parser' (the default), 'lxml' or 'auto' (lxml if it is installed, else html.parser). lxml is
+                 opt-in, as it is only checked against the golden files in tests/pages
+    :return: An instance of the requested parser backend
+    """
+    if name == "auto":
+        name = LxmlParser.name if lxml is not None else SoupParser.name
+    if name not in PARSERS:
+        raise ValueError(f"Got invalid parser: {name}")
+    if name == LxmlParser.name and lxml is None:
+        raise ValueError("The lxml parser requires lxml to be installed")
+    return PARSERS[name]()
+
+
+def compare_backends(paths: list, update_golden: bool = False, base_address: str = "https://www.frag-caesar.de/lateinwoerterbuch/") -> bool:
+    """
+    Golden-file check for saved pages: every available backend has to produce the content of <page>.json
+
+    :param paths: Paths of saved search result or conjugation pages
+    :param update_golden: Whether to (re)write the golden files with the output of the html.parser backend
+    :return: Whether all backends matched all golden files
+    """
+    backends = [get_parser(name) for name in PARSERS if name != LxmlParser.name or lxml is not None]
+    matching = True
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as page:
+            html = page.read()
+        golden_path = f"{path.rsplit('.', 1)[0]}.json"
+        if update_golden:
+            with open(golden_path, "w", encoding="utf-8") as golden_file:
+                json.dump(SoupParser().parse_page(html, base_address), golden_file, ensure_ascii=False, indent=1)
+        with open(golden_path, "r", encoding="utf-8") as golden_file:
+            golden = json.load(golden_file)
+        for backend in backends:
+            if (result := backend.parse_page(html, base_address)) != golden:
+                matching = False
+                print(f"{backend.name} differs from {golden_path}: {json.dumps(result, ensure_ascii=False)[:200]}")
+    return matching
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Usage: python parsing.py [--update] page.html [page.html ...]")
+        sys.exit(2)
+    update = "--update" in sys.argv
+    all_matching = compare_backends([arg for arg in sys.argv[1:] if arg != "--update"], update_golden=update)
+    print("All backends match the golden files" if all_matching else "Some backends differ")
+    sys.exit(0 if all_matching else 1)
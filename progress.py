@@ -0,0 +1,160 @@
+from queue import Queue
+from threading import Lock
+from time import monotonic
+from typing import NamedTuple
+
+QUEUED = "queued"
+FETCHED = "fetched"
+PARSED = "parsed"
+UNCHANGED = "unchanged"
+FAILED = "failed"
+SAVED = "saved"
+FINISHED = "finished"
+
+
+class ImportEvent(NamedTuple):
+    kind: str
+    verb: str
+    detail: str
+    done: int
+    total: int
+    rate: float
+    eta: float
+
+    def describe(self) -> str:
+        """
+        :return: The state of the import in the wording of the app, e.g. 'Vokabeln geladen: 12/40 (3.1/s, noch ca. 9 s)'
+        """
+        if self.kind == FINISHED:
+            return f"Vokabeln geladen: {self.done}/{self.total}"
+        eta = f", noch ca. {round(self.eta)} s" if self.eta is not None else ""
+        return f"Vokabeln geladen: {self.done}/{self.total} ({self.rate:.1f}/s{eta})"
+
+
+class ImportProgress:
+    """
+    Thread-safe channel of the per verb events of one bulk import or refresh (queued, fetched, parsed, unchanged,
+    failed with the reason, saved and finally finished), each carrying the progress, throughput and ETA at the time it was emitted \n
+    Consumers either iterate over it (blocking until the import is finished) or drain the events emitted so far. The
+    results are collected in succeeded and failures
+    """
+
+    def __init__(self, clock=monotonic):
+        """
+        :param clock: Callable returning the current time in seconds
+        """
+        self.clock = clock
+        self.lock = Lock()
+        self.events = Queue()
+        self.started = clock()
+        self.total = 0
+        self.expected = 0
+        self.done = 0
+        self.succeeded = []
+        self.failures = {}
+        self.finished = False
+
+    def __iter__(self):
+        while True:
+            event = self.events.get()
+            yield event
+            if event.kind == FINISHED:
+                return
+
+    def drain(self) -> list:
+        """
+        :return: All events emitted since the last drain, without blocking
+        """
+        found = []
+        while not self.events.empty():
+            found.append(self.events.get_nowait())
+        return found
+
+    @property
+    def rate(self) -> float:
+        """Verbs finished (parsed, unchanged or failed) per second"""
+        return self.done / elapsed if (elapsed := self.clock() - self.started) > 0 else 0.0
+
+    @property
+    def eta(self):
+        """Estimated seconds until all queued verbs are finished (None while no verb has finished yet)"""
+        return (self.total - self.done) / rate if (rate := self.rate) > 0 else None
+
+    def __emit(self, kind: str, verb: str = "", detail: str = "") -> None:
+        self.events.put(ImportEvent(kind, verb, detail, self.done, self.total, self.rate, self.eta))
+
+    def expect(self, count: int) -> None:
+        """
+        :param count: Amount of verbs that will be queued, known before their names (e.g. from the header of a pack)
+        :return: Adds count to the total right away, so the progress and the ETA do not grow during the import
+        """
+        with self.lock:
+            self.total += count
+            self.expected += count
+
+    def queue(self, verbs: list) -> None:
+        with self.lock:
+            counted = min(self.expected, len(verbs))
+            self.expected -= counted
+            self.total += len(verbs) - counted
+            for verb in verbs:
+                self.__emit(QUEUED, verb)
+
+    def fetched(self, verb: str, url: str) -> None:
+        with self.lock:
+            self.__emit(FETCHED, verb, url)
+
+    def parsed(self, verb: str, name: str) -> None:
+        """
+        :param name: The name the verb is stored under
+        """
+        with self.lock:
+            self.done += 1
+            self.succeeded.append(name)
+            self.__emit(PARSED, verb, name)
+
+    def unchanged(self, verb: str) -> None:
+        """
+        :return: Emits that a refreshed verb did not change (its page or its data)
+        """
+        with self.lock:
+            self.done += 1
+            self.__emit(UNCHANGED, verb)
+
+    def failed(self, verb: str, reason: str) -> None:
+        with self.lock:
+            self.done += 1
+            self.failures[verb] = reason
+            self.__emit(FAILED, verb, reason)
+
+    def saved(self) -> None:
+        """
+        :return: Emits a saved event for every verb that has been parsed so far
+        """
+        with self.lock:
+            for name in self.succeeded:
+                self.__emit(SAVED, name)
+
+    def finish(self) -> None:
+        with self.lock:
+            if not self.finished:
+                self.finished = True
+                # Expected verbs that were never queued
+                self.total -= self.expected
+                self.expected = 0
+                self.__emit(FINISHED)
+
+
+def print_progress(progress: ImportProgress) -> None:
+    """
+    :return: Prints the events of progress as they are emitted, until the import is finished
+    """
+    for event in progress:
+        if event.kind == FAILED:
+            print(f"{event.verb}: Fehler ({event.detail}) - {event.describe()}")
+        elif event.kind == PARSED:
+            print(f"{event.detail} hinzugefügt - {event.describe()}")
+        elif event.kind == UNCHANGED:
+            print(f"{event.verb} unverändert - {event.describe()}")
+        elif event.kind == FINISHED:
+            print(event.describe())
@@ -0,0 +1,168 @@
+from questions import iter_slots
+
+# Abbreviations mapped to the words they stand for, each word given as its alternatives (e.g. '1' is the 'I' of
+# 'Futur I' as well as the '1.' of '1. Person'). Tokens without an alias are resolved by the AliasTrie
+ALIASES = {
+    "imp": [("Imperfekt",)], "perf": [("Perfekt",)], "per": [("Perfekt",)], "fut": [("Futur",)],
+    "präs": [("Präsens",)], "prä": [("Präsens",)], "plus": [("Plusquamperfekt",)],
+    "plusquam": [("Plusquamperfekt",)], "plusquamperf": [("Plusquamperfekt",)], "gerundiv": [("Gerundivum",)],
+    "ind": [("Indikativ",)], "konj": [("Konjunktiv",)], "kon": [("Konjunktiv",)],
+    "fut1": [("Futur",), ("I",)], "fut2": [("Futur",), ("II",)], "futi": [("Futur",), ("I",)],
+    "futii": [("Futur",), ("II",)], "futuri": [("Futur",), ("I",)], "futurii": [("Futur",), ("II",)],
+    "futur1": [("Futur",), ("I",)], "futur2": [("Futur",), ("II",)],
+    "pass": [("Passiv",)], "passive": [("Passiv",)], "akt": [("Aktiv",)], "aktive": [("Aktiv",)],
+    "erste": [("1.",)], "zweite": [("2.",)], "dritte": [("3.",)], "pers": [("Person",)], "p": [("Person",)],
+    "sing": [("Singular",)], "sg": [("Singular",)], "s": [("Singular",)], "plur": [("Plural",)],
+    "plu": [("Plural",)], "pl": [("Plural",)],
+    "1": [("I", "1.")], "2": [("II", "2.")], "3": [("3.",)],
+}
+
+
+def normalize_token(token: str) -> str:
+    return token.strip().lower().rstrip(".")
+
+
+class AliasTrie:
+    """Character trie over the words of the paradigm keys, resolving a token to every word it is a prefix of"""
+
+    def __init__(self):
+        self.root = {}
+        self.words = {}
+
+    def add(self, word: str) -> None:
+        key = normalize_token(word)
+        if not key or word in self.words.get(key, ()):
+            return
+        self.words.setdefault(key, set()).add(word)
+        node = self.root
+        for char in key:
+            node = node.setdefault(char, {})
+            node.setdefault("", set()).add(word)
+
+    def complete(self, token: str) -> frozenset:
+        """
+        :return: The words token (normalized) is equal to, or else all words it is a prefix of
+        """
+        key = normalize_token(token)
+        if key in self.words:
+            return frozenset(self.words[key])
+        node = self.root
+        for char in key:
+            if (node := node.get(char)) is None:
+                return frozenset()
+        return frozenset(node.get("", ()))
+
+
+class QueryParser:
+    """
+    Resolves descriptions like 'Konj Plusq Pass 3 Pl' to the key path of a paradigm slot. Every token is resolved to
+    its alternative words (ALIASES, else the AliasTrie) and the slot is found through an inverted index from the
+    words to the slots containing them. Among all slots containing a distinct word for every token the one with the
+    fewest additional words wins, e.g. the implied 'Person' of '3 Pl' \n
+    The slots are learned from the paradigms passed to add_paradigm (or looked up)
+    """
+
+    def __init__(self):
+        self.trie = AliasTrie()
+        self.slots = []
+        self.slot_ids = {}
+        self.slot_words = []
+        self.inverted = {}
+        self.cache = {}
+
+    def add_paradigm(self, paradigm: dict) -> bool:
+        """
+        :return: Makes the slots of paradigm known and returns whether any of them was new
+        """
+        added = False
+        for tense, path, _, _, _ in iter_slots(paradigm):
+            if (tense, path) not in self.slot_ids:
+                self.__add_slot(tense, path)
+                added = True
+        return added
+
+    def __add_slot(self, tense: str, path: tuple) -> None:
+        sid = self.slot_ids[(tense, path)] = len(self.slots)
+        words = [word for key in (tense, *path) for word in key.split()]
+        self.slots.append((tense, path))
+        self.slot_words.append(words)
+        for word in set(words):
+            self.inverted.setdefault(word, set()).add(sid)
+            self.trie.add(word)
+        self.cache.clear()
+
+    def resolve(self, tokens: list) -> list:
+        """
+        :return: For every word the tokens stand for, the set of its alternatives
+        """
+        found = []
+        for token in tokens:
+            if (alias := ALIASES.get(normalize_token(token))) is not None:
+                found.extend(frozenset(alternatives) for alternatives in alias)
+            elif alternatives := self.trie.complete(token):
+                found.append(alternatives)
+            else:
+                found.append(frozenset((token.strip(),)))
+        return found
+
+    def match(self, description: str) -> tuple:
+        """
+        :param description: Tense, voice and person (abbreviated or not), e.g. 'Konj Plusq Pass 3 Pl'
+        :return: The (tense, path) of the matching slot, or None if no or no unique slot matches
+        """
+        tokens = tuple(description.replace(".", ". ").split())
+        if tokens not in self.cache:
+            if len(self.cache) >= 4096:
+                self.cache.clear()
+            self.cache[tokens] = self.__match(tokens)
+        return self.cache[tokens]
+
+    def __match(self, tokens: tuple):
+        resolved = self.resolve([token for token in tokens if normalize_token(token)])
+        candidates = None
+        for alternatives in resolved:
+            containing = set().union(*(self.inverted.get(word, ()) for word in alternatives))
+            candidates = containing if candidates is None else candidates & containing
+            if not candidates:
+                return None
+        # Every token needs a word of its own ('Futur I ... 1. Person' must not use the 'I' twice)
+        candidates = [sid for sid in candidates or () if self.__assignable(resolved, list(self.slot_words[sid]))]
+        if not candidates:
+            return None
+        fewest = min(len(self.slot_words[sid]) for sid in candidates)
+        if len(best := [sid for sid in candidates if len(self.slot_words[sid]) == fewest]) != 1:
+            return None
+        return self.slots[best[0]]
+
+    def __assignable(self, resolved: list, words: list) -> bool:
+        """
+        :return: Whether every entry of resolved can be assigned a distinct one of words
+        """
+        if not resolved:
+            return True
+        for i, word in enumerate(words):
+            if word in resolved[0] and self.__assignable(resolved[1:], words[:i] + words[i + 1:]):
+                return True
+        return False
+
+    def lookup(self, paradigm: dict, description: str):
+        """
+        :return: The answer of the slot of paradigm described by description, or None if it cannot be resolved
+        """
+        answer = self.__answer(paradigm, self.match(description))
+        if answer is None and self.add_paradigm(paradigm):
+            # The slot may only be resolvable with the slots of paradigm that were not known yet
+            answer = self.__answer(paradigm, self.match(description))
+        return answer
+
+    @staticmethod
+    def __answer(paradigm: dict, slot: tuple):
+        if slot is None:
+            return None
+        tense, path = slot
+        value = paradigm.get(tense)
+        for key in path:
+            if not hasattr(value, "get"):
+                return None
+            value = value.get(key)
+        return value if isinstance(value, str) else None
@@ -0,0 +1,753 @@
+import random
+from array import array
+from collections import deque
+from itertools import accumulate
+from threading import RLock, Condition, Thread
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+TENSES = ("Präsens Indikativ", "Präsens Konjunktiv", "Imperfekt Indikativ", "Imperfekt Konjunktiv", "Futur I",
+          "Perfekt Indikativ", "Perfekt Konjunktiv", "Plusquamperfekt Indikativ", "Plusquamperfekt Konjunktiv",
+          "Futur II", "Infinitiv", "Imperativ", "Gerundium", "Gerundivum", "Partizipien", "Supina")
+GENDERS = ("Maskulinum", "Femininum", "Neutrum")
+WEIGHT_PRESETS = {
+    "relevant": [6.5, 6.5, 6.5, 6.5, 6.5, 6.5, 6.5, 6.5, 6.5, 6.5, 4, 3, 4, 6.5, 14.5, 3],
+    "zeiten": [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0],
+    "basic": [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0],
+    "gerund": [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 0, 0],
+    "partizip": [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0],
+    "special": [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 3, 0],
+    "supina": [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
+}
+# Upper bound of the sampling mass of a verb (the row weights of a verb sum up to at most 1, see row_weights), used
+# for verbs whose data is not loaded yet
+PENDING_MASS = 1.0
+
+
+class Question(tuple):
+    """(question, answer) tuple that also knows the slot (verb, tense, path) it asks for"""
+
+    def __new__(cls, text: str, answer, slot: tuple = None):
+        question = super().__new__(cls, (text, answer))
+        question.slot = slot
+        return question
+
+
+def resolve_weights(weights, exclude_tense: list) -> tuple:
+    """
+    :param weights: Preset name or list of weights (len 16, or len 15 if the Supina are excluded)
+    :param exclude_tense: Which tenses to exclude
+    :return: A tuple of 16 weights in the order of TENSES with the excluded tenses set to 0
+    """
+    if isinstance(weights, str):
+        w = weights.lower()
+        if w.startswith("gerund"):
+            w = "gerund"
+        elif w.startswith("partizip"):
+            w = "partizip"
+        elif w in ["spezial", "abwandlungen"]:
+            w = "special"
+        if w not in WEIGHT_PRESETS:
+            raise ValueError(f"Got invalid preset for weights: {weights}")
+        weights = WEIGHT_PRESETS[w]
+    elif not isinstance(weights, list) or (len(weights) != 16 and
+                                           ("supina" not in exclude_tense and "Supina" not in exclude_tense)):
+        raise ValueError("Invalid value for weights was given")
+    elif ("supina" in exclude_tense or "Supina" in exclude_tense) and len(weights) != 15:
+        raise ValueError("Invalid length for weights")
+    elif "supina" in exclude_tense or "Supina" in exclude_tense:
+        weights = weights + [0]
+    return tuple(0 if tense in exclude_tense or (tense == "Supina" and "supina" in exclude_tense) else weight
+                 for tense, weight in zip(TENSES, weights))
+
+
+def iter_slots(paradigm: dict):
+    """
+    :param paradigm: The conjugation data of a single verb as returned by VerbenScraper.get_data
+    :return: Yields (tense, path, answer, share, fanout) for every answer slot of the paradigm, where share is the
+             probability of the slot when walking the paradigm uniformly below its tense and fanout is the amount of
+             branches directly below the tense
+    """
+    for tense, content in paradigm.items():
+        if isinstance(content, str):
+            yield tense, (), content, 1.0, 1
+        else:
+            for path, answer, share in _walk(content, (), 1.0):
+                yield tense, path, answer, share, len(content)
+
+
+def _walk(node: dict, path: tuple, share: float):
+    if not node:
+        return
+    share /= len(node)
+    for key, value in node.items():
+        if isinstance(value, str):
+            yield path + (key,), value, share
+        else:
+            yield from _walk(value, path + (key,), share)
+
+
+class AliasTable:
+    """Walker alias table for O(1) draws from a fixed discrete distribution"""
+
+    def __init__(self, weights: list):
+        """
+        :param weights: Non-negative weights, entries with a weight of 0 are never drawn
+        """
+        self.weights = array("d", weights)
+        self.items = array("l", [i for i, weight in enumerate(weights) if weight > 0])
+        self.total = sum(weights[i] for i in self.items)
+        n = len(self.items)
+        self.probability = array("d", [0.0] * n)
+        self.alias = array("l", range(n))
+        if not n:
+            return
+        scaled = [weights[i] * n / self.total for i in self.items]
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+        while small and large:
+            s, g = small.pop(), large[-1]
+            self.probability[s] = scaled[s]
+            self.alias[s] = g
+            scaled[g] -= 1 - scaled[s]
+            if scaled[g] < 1:
+                small.append(large.pop())
+        for i in small + large:
+            self.probability[i] = 1.0
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def draw(self) -> int:
+        """
+        :return: The position (in the weights given on initialization) of a randomly drawn entry
+        """
+        if not self.items:
+            raise ValueError("Cannot draw from an empty AliasTable")
+        column = random.randrange(len(self.items))
+        return self.items[column if random.random() < self.probability[column] else self.alias[column]]
+
+
+class FenwickTree:
+    """
+    Binary indexed tree over non-negative weights with O(log n) updates and weighted draws \n
+    The updates leave rounding residuals in the sums, so the amount of positive weights is counted separately (the
+    total is exactly 0 once there are none) and an entry with a weight of 0 is never drawn
+    """
+
+    def __init__(self, weights: list):
+        self.weights = array("d", weights)
+        self.positive = sum(weight > 0 for weight in self.weights)
+        self.__build()
+
+    def __build(self) -> None:
+        self.tree = array("d", [0.0]) + self.weights
+        for i in range(1, len(self.tree)):
+            if (parent := i + (i & -i)) < len(self.tree):
+                self.tree[parent] += self.tree[i]
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    @property
+    def total(self) -> float:
+        if not self.positive:
+            return 0.0
+        found, i = 0.0, len(self.weights)
+        while i:
+            found += self.tree[i]
+            i -= i & -i
+        return found
+
+    def set(self, i: int, weight: float) -> None:
+        delta = weight - self.weights[i]
+        self.positive += (weight > 0) - (self.weights[i] > 0)
+        self.weights[i] = weight
+        i += 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def find(self, value: float) -> int:
+        """
+        :return: The smallest index whose prefix sum (including itself) exceeds value
+        """
+        i, step = 0, 1 << len(self.weights).bit_length()
+        while step:
+            if i + step < len(self.tree) and self.tree[i + step] <= value:
+                i += step
+                value -= self.tree[i]
+            step >>= 1
+        return i
+
+    def draw(self) -> int:
+        """
+        :return: The index of a randomly drawn entry with a positive weight
+        """
+        if not self.positive:
+            raise ValueError("Cannot draw from a FenwickTree without positive weights")
+        rebuilt = False
+        while True:
+            i = self.find(random.random() * self.total)
+            if i < len(self.weights) and self.weights[i] > 0:
+                return i
+            if not rebuilt:
+                # Landed on a weight of 0 through the rounding residuals of the updates, so the sums are rebuilt
+                self.__build()
+                rebuilt = True
+
+
+class QuestionSampler:
+    """
+    Two-stage weighted sampler for one set of question options: a FenwickTree over the verbs (so toggling a verb
+    is a cheap mask update) and an AliasTable per verb over its rows \n
+    Pending verbs of the index (data not loaded yet) take part with PENDING_MASS. Once drawn they are loaded and
+    accepted with the probability of their actual mass, which keeps the distribution exact (rejection sampling)
+    """
+
+    def __init__(self, index, options: tuple):
+        """
+        :param index: The QuestionIndex to sample rows of
+        :param options: (weights, ignore_gender_parti, ignore_gender_gerundivum, exclude_imperativ_2,
+                         exclude_non_existing) as used by QuestionIndex.row_weights
+        """
+        self.index = index
+        self.options = options
+        self.tables = [None] * len(index.verbs)
+        self.masked = set()
+        self.flat = None
+        for vid, verb in enumerate(index.verbs):
+            if verb is not None and vid not in index.pending:
+                self.tables[vid] = AliasTable(index.row_weights(vid, *options))
+        self.tree = FenwickTree([self.__mass(vid) for vid in range(len(self.tables))])
+
+    def refresh(self, vid: int) -> None:
+        """
+        :return: Rebuilds the alias table of a verb after its rows have changed (or it was added/removed)
+        """
+        if vid >= len(self.tables):
+            self.tables.extend([None] * (max(vid + 1, 2 * len(self.tables)) - len(self.tables)))
+            self.tree = FenwickTree([self.__mass(i) for i in range(len(self.tables))])
+        if self.index.verbs[vid] is None or vid in self.index.pending:
+            self.tables[vid] = None
+            self.masked.discard(vid)
+        else:
+            self.tables[vid] = AliasTable(self.index.row_weights(vid, *self.options))
+        self.__update_tree(vid)
+
+    def mask(self, vid: int, masked: bool) -> None:
+        """
+        :return: Excludes (masked=True) or includes a verb in the draws in O(log n)
+        """
+        if masked != (vid in self.masked):
+            if masked:
+                self.masked.add(vid)
+            else:
+                self.masked.discard(vid)
+            self.__update_tree(vid)
+
+    def set_excluded(self, excluded: set) -> None:
+        """
+        :param excluded: Ids of all verbs that should be masked, compared against the current mask
+        """
+        for vid in self.masked - excluded:
+            self.mask(vid, False)
+        for vid in excluded - self.masked:
+            self.mask(vid, True)
+
+    def __mass(self, vid: int) -> float:
+        if vid in self.masked or vid >= len(self.index.verbs):
+            return 0.0
+        if (table := self.tables[vid]) is not None:
+            return table.total
+        return PENDING_MASS if vid in self.index.pending else 0.0
+
+    def __update_tree(self, vid: int) -> None:
+        self.flat = None
+        self.tree.set(vid, self.__mass(vid))
+
+    @property
+    def total(self) -> float:
+        return self.tree.total
+
+    def invalidate(self) -> None:
+        self.flat = None
+
+    def flatten(self) -> tuple:
+        """
+        :return: (rows, cumulative weights) over all rows of the unmasked verbs (as numpy arrays if available), cached
+                 until the next change of the index or the mask
+        """
+        if self.flat is None:
+            rows, weights = array("l"), array("d")
+            for vid, table in enumerate(self.tables):
+                if table is not None and table.total > 0 and vid not in self.masked:
+                    start = self.index.blocks[vid][0]
+                    rows.extend(range(start, start + len(table.weights)))
+                    weights.extend(table.weights)
+            if numpy is not None:
+                self.flat = numpy.frombuffer(rows, dtype=numpy.dtype("l")), numpy.cumsum(numpy.frombuffer(weights))
+            else:
+                self.flat = rows, list(accumulate(weights))
+        return self.flat
+
+    def draw_many(self, n: int, seed: int = None) -> list:
+        """
+        :param n: Amount of rows to draw (with replacement)
+        :param seed: Optional seed for reproducible draws
+        :return: A list of n rows drawn from the same distribution as draw, vectorized with numpy if available
+        """
+        for vid in [vid for vid in self.index.pending if vid not in self.masked]:
+            self.index.materialize(vid)
+        if self.total <= 0:
+            raise ValueError("No question is left to ask: every verb is excluded or the weights exclude all of "
+                             "their remaining tenses")
+        rows, cumulative = self.flatten()
+        if numpy is not None:
+            picks = numpy.searchsorted(cumulative, numpy.random.default_rng(seed).random(n) * cumulative[-1], side="right")
+            return rows[numpy.minimum(picks, len(rows) - 1)].tolist()
+        return random.Random(seed).choices(rows, cum_weights=cumulative, k=n)
+
+    def draw(self) -> int:
+        """
+        :return: A randomly drawn row of the index (O(log n) for the verb and O(1) for the row)
+        """
+        while True:
+            if self.total <= 0:
+                raise ValueError("No question is left to ask: every verb is excluded or the weights exclude all of "
+                                 "their remaining tenses")
+            vid = self.tree.draw()
+            if vid in self.index.pending:
+                self.index.materialize(vid)
+                if random.random() * PENDING_MASS >= self.__mass(vid):
+                    continue
+            return self.index.blocks[vid][0] + self.tables[vid].draw()
+
+
+class QuestionIndex:
+    """
+    Flat, array-backed table of every answer slot contained in the data of a VerbenScraper \n
+    Verbs can also be added as pending (see add_pending): they get an id right away, but their rows are only built
+    (from the data returned by loader) once they are drawn or loaded by load_pending
+    """
+
+    def __init__(self, data: dict = None, loader=None):
+        """
+        :param data: Verbs mapped to their conjugation data to index right away
+        :param loader: Callable returning the conjugation data of a pending verb
+        """
+        self.lock = RLock()
+        self.loader = loader
+        self.pending = set()
+        self.tenses = list(TENSES)
+        self.tense_ids = {tense: i for i, tense in enumerate(self.tenses)}
+        self.verbs = []
+        self.verb_ids = {}
+        self.blocks = []
+        self.verb_tenses = []
+        self.row_verb = array("l")
+        self.row_tense = array("h")
+        self.row_path = []
+        self.row_answer = []
+        self.row_share = array("d")
+        self.row_fanout = array("H")
+        self.row_valid = bytearray()
+        self.row_group = array("l")
+        self.dead_rows = 0
+        self.samplers = {}
+        if data:
+            self.update(data)
+
+    def __len__(self) -> int:
+        return len(self.row_answer) - self.dead_rows
+
+    def __contains__(self, verb: str) -> bool:
+        return verb in self.verb_ids
+
+    @staticmethod
+    def is_valid(answer) -> bool:
+        return bool(answer) and "existiert nicht" not in answer
+
+    def update(self, new_data: dict) -> None:
+        """
+        :param new_data: Verbs mapped to their conjugation data
+        :return: Adds the answer slots of the given verbs, replacing the slots of verbs that were already contained
+        """
+        with self.lock:
+            for verb, paradigm in new_data.items():
+                if verb in self.verb_ids:
+                    vid = self.verb_ids[verb]
+                    start, stop = self.blocks[vid]
+                    self.dead_rows += stop - start
+                    self.pending.discard(vid)
+                else:
+                    vid = self.__new_verb_id(verb)
+                self.blocks[vid] = self.__append_rows(vid, paradigm)
+                self.__changed(vid)
+
+    def remove(self, verb: str) -> None:
+        with self.lock:
+            if (vid := self.verb_ids.pop(verb, None)) is not None:
+                start, stop = self.blocks[vid]
+                self.dead_rows += stop - start
+                self.pending.discard(vid)
+                self.verbs[vid] = None
+                self.blocks[vid] = (0, 0)
+                self.verb_tenses[vid] = frozenset()
+                self.__changed(vid)
+
+    def sync(self, data: dict) -> None:
+        """
+        :param data: The data this index should mirror
+        :return: Adds and removes verbs so that the index contains the same verbs as data (contents of verbs that
+                 are contained in both are not compared, use update for that)
+        """
+        with self.lock:
+            if len(data) != len(self.verb_ids) or any(verb not in self.verb_ids for verb in data):
+                for verb in [verb for verb in self.verb_ids if verb not in data]:
+                    self.remove(verb)
+                if missing := [verb for verb in data if verb not in self.verb_ids]:
+                    if self.loader is not None:
+                        self.add_pending(missing)
+                    else:
+                        self.update({verb: data[verb] for verb in missing})
+
+    def add_pending(self, verbs) -> None:
+        """
+        :param verbs: Verbs that are added without loading their data (requires a loader)
+        """
+        with self.lock:
+            for verb in verbs:
+                if verb not in self.verb_ids:
+                    vid = self.__new_verb_id(verb)
+                    self.pending.add(vid)
+                    self.__changed(vid)
+
+    def materialize(self, vid: int) -> None:
+        """
+        :return: Loads the data of a pending verb and builds its rows
+        """
+        with self.lock:
+            if vid in self.pending:
+                self.pending.discard(vid)
+                try:
+                    paradigm = self.loader(self.verbs[vid])
+                except KeyError:
+                    self.remove(self.verbs[vid])
+                    return
+                self.blocks[vid] = self.__append_rows(vid, paradigm)
+                self.__changed(vid)
+
+    def load_pending(self) -> None:
+        """
+        :return: Loads all pending verbs, one at a time so that sampling can go on in between (e.g. in the background)
+        """
+        while self.pending:
+            with self.lock:
+                if self.pending:
+                    self.materialize(next(iter(self.pending)))
+
+    def __new_verb_id(self, verb: str) -> int:
+        vid = len(self.verbs)
+        self.verbs.append(verb)
+        self.blocks.append((0, 0))
+        self.verb_tenses.append(frozenset())
+        self.verb_ids[verb] = vid
+        return vid
+
+    def __append_rows(self, vid: int, paradigm: dict) -> tuple:
+        start = len(self.row_answer)
+        tenses = set()
+        group_parent, group_leader = None, -1
+        for tense, path, answer, share, fanout in iter_slots(paradigm):
+            if (tid := self.tense_ids.get(tense)) is None:
+                tid = self.tense_ids[tense] = len(self.tenses)
+                self.tenses.append(tense)
+            tenses.add(tid)
+            row = len(self.row_answer)
+            if path and path[-1] in GENDERS:
+                if (tid, path[:-1]) != group_parent:
+                    group_parent, group_leader = (tid, path[:-1]), row
+                self.row_group.append(group_leader)
+            else:
+                group_parent = None
+                self.row_group.append(-1)
+            self.row_verb.append(vid)
+            self.row_tense.append(tid)
+            self.row_path.append(path)
+            self.row_answer.append(answer)
+            self.row_share.append(share)
+            self.row_fanout.append(fanout)
+            self.row_valid.append(self.is_valid(answer))
+        self.verb_tenses[vid] = frozenset(tenses)
+        return start, len(self.row_answer)
+
+    def __changed(self, vid: int) -> None:
+        for sampler in self.samplers.values():
+            sampler.refresh(vid)
+        if self.dead_rows and self.dead_rows * 2 > len(self.row_answer):
+            self.__compact()
+
+    def __compact(self) -> None:
+        columns = (self.row_verb, self.row_tense, self.row_path, self.row_answer, self.row_share, self.row_fanout,
+                   self.row_valid)
+        compacted = [column[:0] for column in columns]
+        groups = array("l")
+        for vid, verb in enumerate(self.verbs):
+            if verb is not None:
+                start, stop = self.blocks[vid]
+                offset = len(groups) - start
+                for new, old in zip(compacted, columns):
+                    new.extend(old[start:stop])
+                groups.extend(leader + offset if leader >= 0 else -1 for leader in self.row_group[start:stop])
+                self.blocks[vid] = (start + offset, stop + offset)
+        (self.row_verb, self.row_tense, self.row_path, self.row_answer, self.row_share, self.row_fanout,
+         self.row_valid) = compacted
+        self.row_group = groups
+        self.dead_rows = 0
+        for sampler in self.samplers.values():
+            sampler.invalidate()
+
+    def group_valid(self, row: int) -> bool:
+        leader = self.row_group[row]
+        i = leader
+        while i < len(self.row_group) and self.row_group[i] == leader:
+            if not self.row_valid[i]:
+                return False
+            i += 1
+        return True
+
+    def group_answer(self, row: int) -> list:
+        leader = self.row_group[row]
+        found = {}
+        i = leader
+        while i < len(self.row_group) and self.row_group[i] == leader:
+            found[self.row_path[i][-1]] = self.row_answer[i]
+            i += 1
+        return [found.get(gender) for gender in GENDERS]
+
+    def row_weights(self, vid: int, weights: tuple, ignore_gender_parti: bool, ignore_gender_gerundivum: bool,
+                    exclude_imperativ_2: bool, exclude_non_existing: bool) -> list:
+        """
+        :return: The sampling weights of all rows of the given verb, normalized so that they sum up to the
+                 probability of the original tree walk (verb -> tense -> ... -> answer) arriving at a valid question
+        """
+        start, stop = self.blocks[vid]
+        tense_total = sum(weights[tid] for tid in self.verb_tenses[vid] if tid < len(weights))
+        if not tense_total:
+            return [0.0] * (stop - start)
+        imperativ, parti, geru = self.tense_ids["Imperativ"], self.tense_ids["Partizipien"], self.tense_ids["Gerundivum"]
+        found = []
+        for row in range(start, stop):
+            tid = self.row_tense[row]
+            weight = weights[tid] if tid < len(weights) else 0
+            if not weight:
+                found.append(0.0)
+                continue
+            share = self.row_share[row]
+            if tid == imperativ and exclude_imperativ_2:
+                if self.row_path[row][:1] != ("Imperativ I",):
+                    found.append(0.0)
+                    continue
+                share *= self.row_fanout[row]
+            if exclude_non_existing:
+                grouped = self.row_group[row] >= 0 and ((tid == parti and ignore_gender_parti) or
+                                                        (tid == geru and ignore_gender_gerundivum))
+                if not (self.group_valid(row) if grouped else self.row_valid[row]):
+                    found.append(0.0)
+                    continue
+            found.append(weight / tense_total * share)
+        return found
+
+    def question(self, row: int, ignore_gender_parti: bool = False, ignore_gender_gerundivum: bool = False,
+                 exclude_imperativ_2: bool = True) -> tuple:
+        """
+        :return: A tuple with the question (str) at index 0 and the answer(s) (list -> multiple or str -> one) at
+                 index 1 for the given row
+        """
+        tense = self.tenses[self.row_tense[row]]
+        path = self.row_path[row]
+        answer = self.row_answer[row]
+        if self.row_group[row] >= 0 and ((tense == "Partizipien" and ignore_gender_parti) or
+                                         (tense == "Gerundivum" and ignore_gender_gerundivum)):
+            path = path[:-1]
+            answer = self.group_answer(row)
+        if tense == "Partizipien":
+            words = path
+        elif tense == "Imperativ":
+            words = (tense, *path[1:]) if exclude_imperativ_2 else path
+        else:
+            words = (tense, *path)
+        verb = self.verbs[self.row_verb[row]]
+        return Question(f"Was ist {' '.join(words)} von {verb}? ", answer, (verb, tense, path))
+
+    def slot_question(self, slot: tuple, exclude_tense: list = None, ignore_gender_parti: bool = False,
+                      ignore_gender_gerundivum: bool = False, exclude_imperativ_2: bool = True,
+                      exclude_non_existing: bool = True, weights="relevant", exclude_choice: list = None):
+        """
+        :param slot: (verb, tense, path) as in Question.slot
+        :return: The question for slot, or None if the slot does not exist (anymore) or the options exclude it (see
+                 sample for the options)
+        """
+        verb, tense, path = slot
+        options = (resolve_weights(weights, exclude_tense if exclude_tense is not None else ["Supina"]),
+                   ignore_gender_parti, ignore_gender_gerundivum, exclude_imperativ_2, exclude_non_existing)
+        with self.lock:
+            if (vid := self.verb_ids.get(verb)) is None or verb in (exclude_choice or ()):
+                return None
+            self.materialize(vid)
+            if self.verbs[vid] is None or (tid := self.tense_ids.get(tense)) is None:
+                return None
+            start, stop = self.blocks[vid]
+            row_weights = self.row_weights(vid, *options)
+            for row in range(start, stop):
+                if self.row_tense[row] == tid and self.row_path[row][:len(path)] == path and row_weights[row - start]:
+                    question = self.question(row, ignore_gender_parti, ignore_gender_gerundivum, exclude_imperativ_2)
+                    if question.slot == slot:
+                        return question
+            return None
+
+    def sample(self, exclude_tense: list = None, ignore_gender_parti: bool = False,
+               ignore_gender_gerundivum: bool = False, exclude_imperativ_2: bool = True,
+               exclude_non_existing: bool = True, weights="relevant", exclude_choice: list = None) -> tuple:
+        """
+        Draws a question with a single weighted sample over all rows, applying every exclusion up front. The
+        samplers are cached per weight preset and options, so changing exclude_choice only updates their verb masks
+
+        :return: A tuple with the question (str) at index 0 and the answer(s) (list -> multiple or str -> one) at index 1
+        """
+        options = (resolve_weights(weights, exclude_tense if exclude_tense is not None else ["Supina"]),
+                   ignore_gender_parti, ignore_gender_gerundivum, exclude_imperativ_2, exclude_non_existing)
+        with self.lock:
+            sampler = self.sampler(options)
+            sampler.set_excluded({self.verb_ids[verb] for verb in exclude_choice or () if verb in self.verb_ids})
+            return self.question(sampler.draw(), ignore_gender_parti, ignore_gender_gerundivum, exclude_imperativ_2)
+
+    def sample_many(self, n: int, exclude_tense: list = None, ignore_gender_parti: bool = False,
+                    ignore_gender_gerundivum: bool = False, exclude_imperativ_2: bool = True,
+                    exclude_non_existing: bool = True, weights="relevant", exclude_choice: list = None,
+                    seed: int = None) -> list:
+        """
+        Draws n questions at once, following the same distribution and options as sample
+
+        :return: A list of tuples with the question (str) at index 0 and the answer(s) at index 1
+        """
+        options = (resolve_weights(weights, exclude_tense if exclude_tense is not None else ["Supina"]),
+                   ignore_gender_parti, ignore_gender_gerundivum, exclude_imperativ_2, exclude_non_existing)
+        with self.lock:
+            sampler = self.sampler(options)
+            sampler.set_excluded({self.verb_ids[verb] for verb in exclude_choice or () if verb in self.verb_ids})
+            rows = sampler.draw_many(n, seed=seed)
+            questions = {row: self.question(row, ignore_gender_parti, ignore_gender_gerundivum, exclude_imperativ_2)
+                         for row in set(rows)}
+        return [questions[row] for row in rows]
+
+    def sampler(self, options: tuple) -> QuestionSampler:
+        """
+        :param options: (weights, ignore_gender_parti, ignore_gender_gerundivum, exclude_imperativ_2,
+                         exclude_non_existing) with weights as returned by resolve_weights
+        :return: The (cached) QuestionSampler for the given options, which is kept up to date by update and remove
+        """
+        with self.lock:
+            if (sampler := self.samplers.get(options)) is None:
+                if len(self.samplers) >= 16:
+                    self.samplers.pop(next(iter(self.samplers)))
+                sampler = self.samplers[options] = QuestionSampler(self, options)
+            return sampler
+
+
+class QuestionQueue:
+    """Bounded background producer keeping a ring buffer of ready questions for the current settings"""
+
+    def __init__(self, producer, size: int = 8, discard=None):
+        """
+        :param producer: Callable returning a single question for the keyword arguments given to configure
+                         (e.g. VerbenScraper.get_random_question)
+        :param size: Maximum amount of questions kept ready
+        :param discard: Optional callable receiving the list of prepared questions that are dropped without being
+                        popped (e.g. VerbenScraper.release_questions)
+        """
+        self.producer = producer
+        self.size = size
+        self.discard = discard
+        self.buffer = deque(maxlen=size)
+        self.settings = None
+        self.generation = 0
+        self.error = None
+        self.running = True
+        self.condition = Condition()
+        Thread(target=self.__produce, daemon=True).start()
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    def configure(self, **settings) -> None:
+        """
+        :param settings: Keyword arguments for the producer, the buffer is only invalidated if they changed
+        """
+        with self.condition:
+            if settings == self.settings:
+                return
+            self.settings = settings
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """
+        :return: Drops all prepared questions (e.g. because the underlying data changed) and lets the producer refill
+                 the buffer
+        """
+        with self.condition:
+            self.generation += 1
+            dropped = list(self.buffer)
+            self.buffer.clear()
+            self.error = None
+            self.condition.notify_all()
+        if dropped and self.discard is not None:
+            self.discard(dropped)
+
+    def pop(self, timeout: float = 0.05):
+        """
+        :param timeout: Maximum seconds to wait for the producer if the buffer is empty
+        :return: The next prepared question in O(1), or None if none is ready in time. The producer never runs on the
+                 calling thread, if it failed for the current settings its exception is kept in error
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.buffer or self.error is not None or not self.running, timeout)
+            if not self.buffer:
+                return None
+            question = self.buffer.popleft()
+            self.condition.notify_all()
+            return question
+
+    def stop(self) -> None:
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+
+    def __produce(self) -> None:
+        while True:
+            with self.condition:
+                while self.running and (self.settings is None or self.error is not None or
+                                        len(self.buffer) >= self.size):
+                    self.condition.wait()
+                if not self.running:
+                    return
+                generation, settings = self.generation, self.settings
+            try:
+                question = self.producer(**settings)
+            except Exception as e:
+                with self.condition:
+                    if generation == self.generation:
+                        self.error = e
+                        self.condition.notify_all()
+                continue
+            with self.condition:
+                if kept := (generation == self.generation and len(self.buffer) < self.size):
+                    self.buffer.append(question)
+                    self.condition.notify_all()
+            if not kept and self.discard is not None:
+                self.discard([question])
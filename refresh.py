@@ -0,0 +1,112 @@
+import hashlib
+from threading import Lock
+
+from compact import CompactParadigm
+
+
+def page_digest(page: str, exclude_supina: bool = False) -> str:
+    """
+    :return: Content hash of a conjugation page as parsed with exclude_supina
+    """
+    digest = hashlib.blake2b(page.encode(), digest_size=16)
+    digest.update(b"\x00" if exclude_supina else b"\x01")
+    return digest.hexdigest()
+
+
+def paradigm_digest(paradigm: CompactParadigm) -> str:
+    """
+    :return: Content hash of the conjugation data of a verb (as stored by the StorageService)
+    """
+    nodes, forms = paradigm.encode()
+    digest = hashlib.blake2b(nodes, digest_size=16)
+    digest.update(forms.encode())
+    return digest.hexdigest()
+
+
+class RefreshJob:
+    """
+    Resumable refresh of the stored verbs with change detection \n
+    For every verb the hash of its page and of its parsed data is kept, so a page that did not change is not parsed
+    again and a verb whose data did not change is not written again. The verbs the running refresh still has to do
+    are persisted as well and only removed once a verb is done (after its changed data was handed to the storage), so
+    a refresh that was interrupted (e.g. because the process was killed) continues with the remaining verbs
+    """
+
+    def __init__(self, storage):
+        """
+        :param storage: StorageService the hashes and the remaining verbs are loaded from and saved to
+        """
+        self.storage = storage
+        self.lock = Lock()
+        self.hashes = storage.load_hashes()
+        self.remaining = dict.fromkeys(storage.load_refresh())
+
+    @property
+    def pending(self) -> bool:
+        """Whether a refresh was interrupted before it was finished"""
+        return bool(self.remaining)
+
+    def start(self, names: list, persist: bool = True) -> list:
+        """
+        :param names: All verbs to refresh
+        :param persist: Whether to persist the verbs remaining (so the refresh can be resumed)
+        :return: The verbs still to refresh: the remaining ones of an interrupted refresh if there is one, else names
+        """
+        with self.lock:
+            if not self.remaining:
+                self.remaining = dict.fromkeys(names)
+                if persist:
+                    self.storage.put_refresh(dict.fromkeys(names, True))
+            return list(self.remaining)
+
+    def page_unchanged(self, name: str, page: str) -> bool:
+        """
+        :param page: Hash of the page just fetched for name (see page_digest)
+        """
+        return page is not None and self.hashes.get(name, (None,))[0] == page
+
+    def paradigm_changed(self, name: str, paradigm: CompactParadigm, current: CompactParadigm = None) -> bool:
+        """
+        :param paradigm: The data just parsed for name
+        :param current: The stored data of name, hashed if no hash is known yet (None if name is not stored)
+        """
+        if (known := self.hashes.get(name, (None, None))[1]) is None and current is not None:
+            known = paradigm_digest(current)
+        return known != paradigm_digest(paradigm)
+
+    def done(self, verb: str, name: str = None, page: str = None, paradigm: CompactParadigm = None,
+             persist: bool = True) -> None:
+        """
+        :param verb: The refreshed verb
+        :param name: Name the data of verb is stored under, if it was parsed
+        :param page: Hash of the parsed page (None if it should be parsed again next time)
+        :param paradigm: The parsed data of verb
+        :param persist: Whether to persist the hashes and that verb is done (has to be called after its changed data
+                        was handed to the storage, so the data is written in the same or an earlier transaction)
+        """
+        with self.lock:
+            self.remaining.pop(verb, None)
+            hashes = {}
+            if name is not None and paradigm is not None:
+                hashes[name] = self.hashes[name] = (page, paradigm_digest(paradigm))
+        if persist:
+            self.storage.put_hashes(hashes)
+            self.storage.put_refresh({verb: None})
+
+    def forget(self, name: str) -> None:
+        """
+        :return: Drops the hashes of name and skips it in the running refresh (e.g. because it was deleted, the
+                 storage drops the persisted state with the verb)
+        """
+        with self.lock:
+            self.hashes.pop(name, None)
+            self.remaining.pop(name, None)
+
+    def finish(self, persist: bool = True) -> None:
+        """
+        :return: Ends the refresh, verbs that failed are not carried over to the next one
+        """
+        with self.lock:
+            remaining, self.remaining = self.remaining, {}
+        if persist:
+            self.storage.put_refresh(dict.fromkeys(remaining))
@@ -0,0 +1,181 @@
+import heapq
+import time
+from threading import RLock
+from typing import NamedTuple
+
+SLOT_SEPARATOR = "\x1f"
+DAY = 24 * 60 * 60
+# Delay after which a slot that was answered wrongly is asked again
+RELEARN_DELAY = 10 * 60
+# Time a handed out question is held back for, so prepared but unanswered questions come back afterwards
+LEASE = 2 * 60
+GRADE_CORRECT = 4
+GRADE_HARD = 3
+GRADE_WRONG = 1
+
+
+def encode_slot(slot: tuple) -> str:
+    verb, tense, path = slot
+    return SLOT_SEPARATOR.join((verb, tense, *path))
+
+
+def decode_slot(key: str) -> tuple:
+    verb, tense, *path = key.split(SLOT_SEPARATOR)
+    return verb, tense, tuple(path)
+
+
+class ReviewState(NamedTuple):
+    ease: float = 2.5
+    interval: float = 0.0
+    repetitions: int = 0
+    lapses: int = 0
+    due: float = 0.0
+
+    def review(self, grade: int, now: float) -> "ReviewState":
+        """
+        :param grade: Quality of the answer from 0 (no idea) to 5 (perfect), below 3 counts as wrong (SM-2)
+        :param now: Time of the answer (seconds since the epoch)
+        :return: The state after the answer
+        """
+        ease = max(1.3, self.ease + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+        if grade < 3:
+            return ReviewState(ease, RELEARN_DELAY, 0, self.lapses + 1, now + RELEARN_DELAY)
+        interval = DAY if not self.repetitions else 6 * DAY if self.repetitions == 1 else self.interval * ease
+        return ReviewState(ease, interval, self.repetitions + 1, self.lapses, now + interval)
+
+
+class SpacedRepetition:
+    """
+    SM-2 scheduler over the answer slots (verb, tense, path) that were asked so far \n
+    The due times are kept in a heap with lazy deletion (outdated entries are dropped when they reach the top), so
+    recording an answer and finding the next due slot are O(log n). Due slots that cannot be asked with the current
+    options are parked outside of the heap until unpark is called (when the options change), so they are not checked
+    again for every question. Changed states are handed to the storage right away and written by its writer thread
+    """
+
+    def __init__(self, storage=None, clock=time.time):
+        """
+        :param storage: StorageService the review states are loaded from and saved to (None to not persist them)
+        :param clock: Callable returning the current time in seconds
+        """
+        self.lock = RLock()
+        self.storage = storage
+        self.clock = clock
+        self.states = {}
+        self.leases = {}
+        self.parked = {}
+        self.heap = []
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def __contains__(self, slot: tuple) -> bool:
+        return slot in self.states
+
+    def load(self) -> None:
+        """
+        :return: Loads the stored review states (keeping states recorded in the meantime)
+        """
+        if self.storage is None:
+            return
+        loaded = {decode_slot(key): ReviewState(*row) for key, row in self.storage.load_reviews().items()}
+        with self.lock:
+            loaded.update(self.states)
+            self.states = loaded
+            self.heap = [(self.__due(slot), slot) for slot in loaded if slot not in self.parked]
+            heapq.heapify(self.heap)
+
+    def __due(self, slot: tuple) -> float:
+        return self.leases.get(slot, self.states[slot].due)
+
+    def record(self, slot: tuple, grade: int) -> ReviewState:
+        """
+        :param slot: (verb, tense, path) of the answered question
+        :param grade: Quality of the answer (see ReviewState.review, e.g. GRADE_CORRECT or GRADE_WRONG)
+        :return: The new state of the slot
+        """
+        with self.lock:
+            state = self.states[slot] = self.states.get(slot, ReviewState()).review(grade, self.clock())
+            self.leases.pop(slot, None)
+            self.parked.pop(slot, None)
+            heapq.heappush(self.heap, (state.due, slot))
+        if self.storage is not None:
+            self.storage.put_reviews({encode_slot(slot): tuple(state)})
+        return state
+
+    def forget(self, verb: str) -> None:
+        """
+        :return: Removes the states of all slots of verb (e.g. because it was deleted)
+        """
+        with self.lock:
+            slots = [slot for slot in self.states if slot[0] == verb]
+            for slot in slots:
+                del self.states[slot]
+                self.leases.pop(slot, None)
+                self.parked.pop(slot, None)
+        if self.storage is not None and slots:
+            self.storage.put_reviews(dict.fromkeys(map(encode_slot, slots)))
+
+    def next_due(self, build, excluded=None):
+        """
+        :param build: Callable returning the question for a slot, or None if the slot cannot be asked right now
+                      (e.g. because its verb or tense is excluded). It is called without holding the lock, as it may
+                      have to load the verb first
+        :param excluded: Optional cheap check whether the options exclude a slot (e.g. by its verb or tense), so build
+                         is not called for it
+        :return: The question of the slot that has been due the longest and can be asked, or None if there is none.
+                 The slot is leased (held back for LEASE seconds) until its answer is recorded or the lease is
+                 released. Due slots that cannot be asked are parked until unpark is called
+        """
+        while (leased := self.__lease_due(excluded)) is not None:
+            slot, lease = leased
+            if (found := build(slot)) is not None:
+                return found
+            with self.lock:
+                # Unless the slot was answered in the meantime, its lease is replaced by parking it
+                if self.leases.get(slot) == lease:
+                    del self.leases[slot]
+                    self.parked[slot] = None
+        return None
+
+    def __lease_due(self, excluded):
+        """
+        :return: (slot, lease expiry) of the slot that has been due the longest and is not excluded, leasing it so
+                 no other caller gets it, or None if no slot is due. Excluded slots are parked on the way
+        """
+        with self.lock:
+            now = self.clock()
+            while self.heap and self.heap[0][0] <= now:
+                due, slot = heapq.heappop(self.heap)
+                if slot not in self.states or self.__due(slot) != due:
+                    continue
+                self.leases.pop(slot, None)
+                if excluded is not None and excluded(slot):
+                    self.parked[slot] = None
+                    continue
+                lease = self.leases[slot] = now + LEASE
+                heapq.heappush(self.heap, (lease, slot))
+                return slot, lease
+            return None
+
+    def release(self, slots: list) -> None:
+        """
+        :param slots: Slots handed out by next_due whose questions were dropped without being asked (e.g. prepared
+                      questions discarded because the options changed)
+        :return: Ends the leases of slots, so they are due again right away
+        """
+        with self.lock:
+            for slot in slots:
+                if self.leases.pop(slot, None) is not None and slot in self.states and slot not in self.parked:
+                    heapq.heappush(self.heap, (self.states[slot].due, slot))
+
+    def unpark(self) -> None:
+        """
+        :return: Puts the parked slots back into the heap (to be called when the options or the verbs changed, so
+                 they might be asked again)
+        """
+        with self.lock:
+            for slot in self.parked:
+                if slot in self.states:
+                    heapq.heappush(self.heap, (self.__due(slot), slot))
+            self.parked = {}
@@ -0,0 +1,427 @@
+import atexit
+import json
+import sqlite3
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from threading import Condition, Lock, Thread
+
+from compact import CompactParadigm, Schema
+
+
+class StorageService:
+    """
+    Single owner of everything the app persists: the conjugation data (one compact record per verb, see
+    compact.CompactParadigm), the options (one JSON record per top level key), the review states of the
+    spaced repetition (see srs.SpacedRepetition) and the content hashes and remaining verbs of the refresh (see
+    refresh.RefreshJob) in one versioned SQLite database, which is read through a memory map \n
+    Writes are queued and handed to a single writer thread, which coalesces everything queued since its last write
+    (later writes of the same verb / the options replace earlier ones) into one transaction. No other code path
+    writes the database, so concurrent saves (e.g. a finished update and on_pause) can neither race nor leave a
+    half written state behind \n
+    On first use the data of both legacy data.json layouts (the raw verb dict and the app store with "data" and
+    "options" keys) is migrated
+    """
+    SCHEMA_VERSION = 4
+
+    def __init__(self, path: str = "./verbs.db", legacy_path: str = "./data.json"):
+        """
+        :param path: Path of the SQLite database
+        :param legacy_path: data.json the verbs and options are migrated from (if the database holds none yet)
+        """
+        self.lock = Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(f"PRAGMA mmap_size={256 * 2 ** 20}")
+        self.schema = Schema()
+        self.__migrate(legacy_path)
+
+        self.condition = Condition()
+        self.pending_verbs = {}
+        self.pending_options = None
+        self.pending_reviews = {}
+        self.pending_hashes = {}
+        self.pending_refresh = {}
+        self.writing_verbs = {}
+        self.writing = False
+        self.error = None
+        self.closed = False
+        self.writer = Thread(target=self.__write, daemon=True)
+        self.writer.start()
+        atexit.register(self.close)
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self.pending_verbs) or self.pending_options is not None or bool(self.pending_reviews) or \
+            bool(self.pending_hashes) or bool(self.pending_refresh)
+
+    def load_verbs(self) -> dict:
+        """
+        :return: All stored verbs mapped to their conjugation data (CompactParadigms, decoded on first access)
+        """
+        with self.lock:
+            return {name: CompactParadigm(self.schema, nodes, forms) for name, nodes, forms in
+                    self.connection.execute("SELECT name, nodes, forms FROM verbs").fetchall()}
+
+    def load_names(self) -> list:
+        """
+        :return: The names of all stored verbs (without loading their data)
+        """
+        with self.lock:
+            return [name for name, in self.connection.execute("SELECT name FROM verbs").fetchall()]
+
+    def load_verb(self, name: str):
+        """
+        :return: The conjugation data of a single verb (including changes that are queued but not written yet) or
+                 None if it is not stored
+        """
+        with self.condition:
+            for queued in (self.pending_verbs, self.writing_verbs):
+                if name in queued:
+                    return queued[name]
+        with self.lock:
+            row = self.connection.execute("SELECT nodes, forms FROM verbs WHERE name = ?", (name,)).fetchone()
+        return CompactParadigm(self.schema, *row) if row is not None else None
+
+    def load_options(self) -> dict:
+        with self.lock:
+            return {key: json.loads(value) for key, value in
+                    self.connection.execute("SELECT key, value FROM options").fetchall()}
+
+    def load_reviews(self) -> dict:
+        """
+        :return: The encoded slots mapped to their review state (ease, interval, repetitions, lapses, due)
+        """
+        with self.lock:
+            return {slot: tuple(state) for slot, *state in
+                    self.connection.execute("SELECT slot, ease, interval, repetitions, lapses, due FROM reviews")}
+
+    def put_reviews(self, changed: dict) -> None:
+        """
+        :param changed: Encoded slots mapped to their new review state, or to None if they should be removed
+        """
+        if changed:
+            with self.condition:
+                self.pending_reviews.update(changed)
+                self.error = None
+                self.condition.notify_all()
+
+    def load_hashes(self) -> dict:
+        """
+        :return: The verbs mapped to the content hashes of their page and of their parsed data
+        """
+        with self.lock:
+            return {name: (page, paradigm) for name, page, paradigm in
+                    self.connection.execute("SELECT name, page, paradigm FROM hashes")}
+
+    def put_hashes(self, changed: dict) -> None:
+        """
+        :param changed: Verbs mapped to the new content hashes (page, paradigm), or to None if they should be removed
+        """
+        if changed:
+            with self.condition:
+                self.pending_hashes.update(changed)
+                self.error = None
+                self.condition.notify_all()
+
+    def load_refresh(self) -> list:
+        """
+        :return: The verbs the last refresh did not get to (empty if it was finished)
+        """
+        with self.lock:
+            return [name for name, in self.connection.execute("SELECT name FROM refresh")]
+
+    def put_refresh(self, changed: dict) -> None:
+        """
+        :param changed: Verbs mapped to True if they still have to be refreshed, or to None once they are
+        """
+        if changed:
+            with self.condition:
+                self.pending_refresh.update(changed)
+                self.error = None
+                self.condition.notify_all()
+
+    def put_verbs(self, changed: dict) -> None:
+        """
+        :param changed: Verbs mapped to their new conjugation data (dict or CompactParadigm), or to None if they were
+                        deleted (the data must not be mutated afterwards, it is serialized by the writer thread)
+        """
+        if changed:
+            with self.condition:
+                self.pending_verbs.update(changed)
+                self.error = None
+                self.condition.notify_all()
+
+    def put_options(self, options: dict) -> None:
+        """
+        :param options: The complete options, replacing the stored ones (serialized right away, so they can be
+                        mutated afterwards)
+        """
+        serialized = {key: json.dumps(value) for key, value in options.items()}
+        with self.condition:
+            self.pending_options = serialized
+            self.error = None
+            self.condition.notify_all()
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        :param timeout: Maximum amount of seconds to wait (None to wait until written)
+        :return: Blocks until everything queued so far is written and returns whether it was (raises the error of
+                 the writer if the write failed, the failed changes stay queued)
+        """
+        with self.condition:
+            self.error = None
+            self.condition.notify_all()
+            written = self.condition.wait_for(lambda: self.error is not None or not (self.has_pending or self.writing),
+                                              timeout=timeout)
+            if self.error is not None:
+                raise self.error
+            return written
+
+    def close(self, timeout: float = 5) -> None:
+        """
+        :return: Writes everything still queued and stops the writer thread (also called on interpreter exit)
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.writer.join(timeout)
+
+    def __write(self) -> None:
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.closed or (self.error is None and self.has_pending))
+                if self.error is not None or not self.has_pending:
+                    return
+                verbs, options, reviews = self.pending_verbs, self.pending_options, self.pending_reviews
+                hashes, refresh = self.pending_hashes, self.pending_refresh
+                self.pending_verbs, self.pending_options, self.pending_reviews = {}, None, {}
+                self.pending_hashes, self.pending_refresh = {}, {}
+                self.writing_verbs = verbs
+                self.writing = True
+            try:
+                self.__commit(verbs, options, reviews, hashes, refresh)
+                error = None
+            except Exception as e:
+                error = e
+            with self.condition:
+                self.writing = False
+                self.writing_verbs = {}
+                if error is not None:
+                    # Keep the failed changes queued (without replacing anything queued in the meantime)
+                    verbs.update(self.pending_verbs)
+                    self.pending_verbs = verbs
+                    if self.pending_options is None:
+                        self.pending_options = options
+                    reviews.update(self.pending_reviews)
+                    self.pending_reviews = reviews
+                    hashes.update(self.pending_hashes)
+                    self.pending_hashes = hashes
+                    refresh.update(self.pending_refresh)
+                    self.pending_refresh = refresh
+                    self.error = error
+                self.condition.notify_all()
+
+    def __commit(self, verbs: dict, options: dict, reviews: dict, hashes: dict, refresh: dict) -> None:
+        deleted = [(name,) for name, paradigm in verbs.items() if paradigm is None]
+        # The hashes and the refresh state of deleted verbs are dropped with them
+        hashes.update(dict.fromkeys((name for name, in deleted)))
+        refresh.update(dict.fromkeys((name for name, in deleted)))
+        updated = [(name, *self.schema.compact(paradigm).encode()) for name, paradigm in verbs.items()
+                   if paradigm is not None]
+        with self.lock, self.connection:
+            nodes = self.__insert_nodes()
+            self.connection.executemany("DELETE FROM verbs WHERE name = ?", deleted)
+            self.connection.executemany("INSERT OR REPLACE INTO verbs VALUES (?, ?, ?)", updated)
+            if options is not None:
+                self.connection.execute("DELETE FROM options")
+                self.connection.executemany("INSERT INTO options VALUES (?, ?)", options.items())
+            self.connection.executemany("DELETE FROM reviews WHERE slot = ?",
+                                        [(slot,) for slot, state in reviews.items() if state is None])
+            self.connection.executemany("INSERT OR REPLACE INTO reviews VALUES (?, ?, ?, ?, ?, ?)",
+                                        [(slot, *state) for slot, state in reviews.items() if state is not None])
+            self.connection.executemany("DELETE FROM hashes WHERE name = ?",
+                                        [(name,) for name, digests in hashes.items() if digests is None])
+            self.connection.executemany("INSERT OR REPLACE INTO hashes VALUES (?, ?, ?)",
+                                        [(name, *digests) for name, digests in hashes.items() if digests is not None])
+            self.connection.executemany("DELETE FROM refresh WHERE name = ?",
+                                        [(name,) for name, pending in refresh.items() if pending is None])
+            self.connection.executemany("INSERT OR IGNORE INTO refresh VALUES (?)",
+                                        [(name,) for name, pending in refresh.items() if pending is not None])
+        self.schema.mark_persisted(nodes)
+
+    def __insert_nodes(self) -> int:
+        """
+        :return: Inserts the schema nodes added since the last commit and returns the amount of nodes then persisted
+        """
+        nodes = self.schema.unpersisted()
+        self.connection.executemany("INSERT INTO nodes VALUES (?, ?, ?)", nodes)
+        return nodes[-1][0] + 1 if nodes else self.schema.persisted
+
+    def __migrate(self, legacy_path: str) -> None:
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version > self.SCHEMA_VERSION:
+            raise ValueError(f"The storage has schema version {version}, but only up to {self.SCHEMA_VERSION} is "
+                             f"supported")
+        if version < self.SCHEMA_VERSION:
+            with self.lock:
+                # One explicit transaction, so the DDL statements are rolled back as well if a migration fails
+                self.connection.execute("BEGIN IMMEDIATE")
+                try:
+                    if version < 1:
+                        self.__migrate_legacy(legacy_path)
+                    if version < 2:
+                        self.__migrate_compact()
+                    if version < 3:
+                        self.__migrate_reviews()
+                    if version < 4:
+                        self.__migrate_refresh()
+                    self.connection.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+                    self.connection.commit()
+                except BaseException:
+                    self.connection.rollback()
+                    raise
+        self.schema = Schema(self.connection.execute("SELECT id, parent, key FROM nodes ORDER BY id").fetchall())
+
+    def __migrate_legacy(self, legacy_path: str) -> None:
+        """
+        :return: Schema 0 -> 1: Verbs (as JSON) and options from data.json into whichever table is still empty
+        """
+        self.connection.execute("CREATE TABLE IF NOT EXISTS verbs (name TEXT PRIMARY KEY, paradigm TEXT NOT NULL)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS options (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        verbs, options = self.__read_legacy(legacy_path)
+        if self.connection.execute("SELECT 1 FROM verbs LIMIT 1").fetchone() is None:
+            self.connection.executemany("INSERT INTO verbs VALUES (?, ?)",
+                                        [(name, json.dumps(paradigm)) for name, paradigm in verbs.items()
+                                         if isinstance(paradigm, dict)])
+        if self.connection.execute("SELECT 1 FROM options LIMIT 1").fetchone() is None:
+            self.connection.executemany("INSERT INTO options VALUES (?, ?)",
+                                        [(key, json.dumps(value)) for key, value in options.items()])
+
+    def __migrate_compact(self) -> None:
+        """
+        :return: Schema 1 -> 2: Verbs from JSON to compact records with interned keys
+        """
+        verbs = self.connection.execute("SELECT name, paradigm FROM verbs").fetchall()
+        self.connection.execute("DROP TABLE verbs")
+        self.connection.execute("CREATE TABLE verbs (name TEXT PRIMARY KEY, nodes BLOB NOT NULL, forms TEXT NOT NULL)")
+        self.connection.execute("CREATE TABLE nodes (id INTEGER PRIMARY KEY, parent INTEGER NOT NULL, "
+                                "key TEXT NOT NULL)")
+        self.connection.executemany("INSERT INTO verbs VALUES (?, ?, ?)",
+                                    [(name, *self.schema.compact(json.loads(paradigm)).encode())
+                                     for name, paradigm in verbs])
+        self.__insert_nodes()
+
+    def __migrate_reviews(self) -> None:
+        """
+        :return: Schema 2 -> 3: Table of the review states of the spaced repetition
+        """
+        self.connection.execute("CREATE TABLE reviews (slot TEXT PRIMARY KEY, ease REAL NOT NULL, "
+                                "interval REAL NOT NULL, repetitions INTEGER NOT NULL, lapses INTEGER NOT NULL, "
+                                "due REAL NOT NULL)")
+
+    def __migrate_refresh(self) -> None:
+        """
+        :return: Schema 3 -> 4: Tables of the content hashes of the verbs and of the verbs a refresh still has to do
+        """
+        self.connection.execute("CREATE TABLE hashes (name TEXT PRIMARY KEY, page TEXT, paradigm TEXT NOT NULL)")
+        self.connection.execute("CREATE TABLE refresh (name TEXT PRIMARY KEY)")
+
+    @staticmethod
+    def __read_legacy(legacy_path: str) -> tuple:
+        """
+        :return: The verbs and options of data.json, which holds either the raw verb dict (written by the Scraper) or
+                 the app store ({"data": ..., "options": ...})
+        """
+        if legacy_path is None:
+            return {}, {}
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as data_file:
+                data = json.load(data_file)
+        except Exception:
+            return {}, {}
+        if not isinstance(data, dict):
+            return {}, {}
+        if "options" in data.keys() or "data" in data.keys():
+            return data.get("data") or {}, data.get("options") or {}
+        return data, {}
+
+
+class LazyVerbData(MutableMapping):
+    """
+    Dict-like view of the verbs of a StorageService that only loads the verb names up front. The data of a verb is
+    loaded on first access and kept in a bounded LRU cache. Verbs that were set or deleted are kept until they are
+    handed to the storage with save \n
+    version is increased whenever a verb is set or deleted, so mirrors (e.g. the QuestionIndex) can cheaply tell
+    whether they are still in sync
+    """
+
+    def __init__(self, storage: StorageService, capacity: int = 64):
+        """
+        :param storage: StorageService the verbs are loaded from
+        :param capacity: Maximum amount of unchanged verbs kept in memory
+        """
+        self.storage = storage
+        self.capacity = capacity
+        self.lock = Lock()
+        self.names = dict.fromkeys(storage.load_names())
+        self.cache = OrderedDict()
+        self.changes = {}
+        self.version = 0
+
+    def __contains__(self, name) -> bool:
+        return name in self.names
+
+    def __getitem__(self, name: str):
+        with self.lock:
+            if name not in self.names:
+                raise KeyError(name)
+            if name in self.changes:
+                return self.changes[name]
+            if name in self.cache:
+                self.cache.move_to_end(name)
+                return self.cache[name]
+        if (paradigm := self.storage.load_verb(name)) is None:
+            raise KeyError(name)
+        with self.lock:
+            self.__cache(name, paradigm)
+        return paradigm
+
+    def __setitem__(self, name: str, paradigm) -> None:
+        with self.lock:
+            self.names[name] = None
+            self.changes[name] = paradigm
+            self.cache.pop(name, None)
+            self.version += 1
+
+    def __delitem__(self, name: str) -> None:
+        with self.lock:
+            if name not in self.names:
+                raise KeyError(name)
+            del self.names[name]
+            self.cache.pop(name, None)
+            self.changes[name] = None
+            self.version += 1
+
+    def __iter__(self):
+        return iter(list(self.names))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __cache(self, name: str, paradigm) -> None:
+        self.cache[name] = paradigm
+        self.cache.move_to_end(name)
+        while len(self.cache) > self.capacity:
+            self.cache.popitem(last=False)
+
+    def save(self) -> None:
+        """
+        :return: Queues the verbs set or deleted since the last save for the writer of the storage
+        """
+        with self.lock:
+            changes, self.changes = self.changes, {}
+            self.storage.put_verbs(changes)
+            for name, paradigm in changes.items():
+                if paradigm is not None:
+                    self.__cache(name, paradigm)
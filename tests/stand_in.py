@@ -0,0 +1,117 @@
+"""
+Local stand-in for frag-caesar.de: serves the saved pages of tests/pages over HTTP on localhost, so the fetcher and
+the VerbenScraper (with base_address pointing at it) can be tested without the live site \n
+Responses can be scripted per path (statuses returned before the page is served, a delay per request), and the
+server records every request and the highest amount of requests in flight at the same time
+"""
+import os
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from urllib.parse import urlsplit
+
+PAGES = os.path.join(os.path.dirname(__file__), "pages")
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    server: "StandInServer"
+
+    def do_GET(self) -> None:
+        path = urlsplit(self.path).path
+        with self.server.lock:
+            self.server.requests.append(path)
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+            statuses = self.server.statuses.get(path)
+            status = statuses.pop(0) if statuses else None
+        try:
+            time.sleep(self.server.delays.get(path, self.server.delay))
+            if status is not None:
+                self.send_error(status)
+            elif (page := self.server.page(path)) is None:
+                self.send_error(404)
+            else:
+                body = page.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client gave up (e.g. because of its timeout)
+        finally:
+            with self.server.lock:
+                self.server.in_flight -= 1
+
+    def log_message(self, *_) -> None:
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, delay: float = 0):
+        """
+        :param port: Port to listen on (0 for a free one)
+        :param delay: Seconds every request is delayed by (unless a delay is set for its path)
+        """
+        super().__init__(("127.0.0.1", port), StandInHandler)
+        self.lock = Lock()
+        self.delay = delay
+        self.delays = {}
+        self.statuses = {}
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def address(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    @property
+    def base_address(self) -> str:
+        """Address to pass as base_address to the VerbenScraper"""
+        return f"{self.address}/lateinwoerterbuch/"
+
+    def script(self, path: str, *statuses: int) -> None:
+        """
+        :return: Answers the next requests of path with the given error statuses (in order) before serving it
+        """
+        with self.lock:
+            self.statuses.setdefault(path, []).extend(statuses)
+
+    @staticmethod
+    def page(path: str):
+        """
+        :return: The saved page for path: search pages (/lateinwoerterbuch/<word>-uebersetzung.html, the not found
+                 page for words without one) and conjugation pages (/konj/<verb>.html), or None if there is none
+        """
+        directory, _, name = path.rpartition("/")
+        if directory == "/lateinwoerterbuch" and name.endswith("-uebersetzung.html"):
+            candidates = (name, "nicht-gefunden.html")
+        elif directory == "/konj" and name.endswith(".html"):
+            candidates = (name,)
+        else:
+            return None
+        for candidate in candidates:
+            if os.path.isfile(file := os.path.join(PAGES, candidate)):
+                with open(file, "r", encoding="utf-8") as page:
+                    return page.read()
+        return None
+
+    def __enter__(self) -> "StandInServer":
+        Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == '__main__':
+    # Serves the saved pages for manual runs, e.g. VerbenScraper(base_address="http://127.0.0.1:8765/lateinwoerterbuch/")
+    with StandInServer(int(sys.argv[1]) if len(sys.argv) > 1 else 8765) as server:
+        print(f"Serving {PAGES} at {server.base_address}")
+        while True:
+            time.sleep(3600)
@@ -0,0 +1,125 @@
+"""
+Tests of the AsyncFetcher and the VerbenScraper against the local stand-in server (see stand_in.py), run from the
+repository root with python -m pytest or python -m unittest discover tests
+"""
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from fetching import AsyncFetcher, FetchError
+from progress import ImportProgress
+from Scraper import VerbenScraper
+from storage import StorageService
+from stand_in import PAGES, StandInServer
+
+
+def golden(name: str):
+    with open(os.path.join(PAGES, f"{name}.json"), "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+class StandInTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer().__enter__()
+        self.addCleanup(self.server.__exit__)
+
+    def fetch_all(self, fetcher: AsyncFetcher, urls: list) -> list:
+        async def worker(fetch, url):
+            return await fetch(url)
+
+        return fetcher.run(urls, worker)
+
+
+class AsyncFetcherTest(StandInTest):
+    def test_concurrency_limit(self):
+        self.server.delay = 0.2
+        fetcher = AsyncFetcher(concurrency=4, requests_per_second=0, retries=0)
+        start = time.monotonic()
+        results = self.fetch_all(fetcher, [f"{self.server.address}/konj/amare.html"] * 12)
+        elapsed = time.monotonic() - start
+        self.assertTrue(all(isinstance(result, str) for result in results))
+        self.assertEqual(self.server.max_in_flight, 4)
+        # 3 rounds of 4 concurrent requests instead of 12 sequential ones
+        self.assertGreaterEqual(elapsed, 0.6)
+        self.assertLess(elapsed, 12 * 0.2)
+
+    def test_rate_limit_per_host(self):
+        fetcher = AsyncFetcher(concurrency=10, requests_per_second=20, retries=0)
+        start = time.monotonic()
+        self.fetch_all(fetcher, [f"{self.server.address}/konj/amare.html"] * 5)
+        # The starts of 5 requests are spaced out by 1/20 s
+        self.assertGreaterEqual(time.monotonic() - start, 4 / 20)
+
+    def test_retries_429_and_5xx_with_backoff(self):
+        path = "/konj/amare.html"
+        self.server.script(path, 429, 503)
+        fetcher = AsyncFetcher(requests_per_second=0, retries=3, backoff=0.1)
+        start = time.monotonic()
+        result, = self.fetch_all(fetcher, [f"{self.server.address}{path}"])
+        elapsed = time.monotonic() - start
+        self.assertIn('id="vtab-1"', result)
+        self.assertEqual(self.server.requests.count(path), 3)
+        # Backoff of 0.1 s before the first and 0.2 s before the second retry
+        self.assertGreaterEqual(elapsed, 0.3)
+
+    def test_gives_up_after_retries(self):
+        path = "/konj/amare.html"
+        self.server.script(path, 500, 502, 500)
+        fetcher = AsyncFetcher(requests_per_second=0, retries=2, backoff=0.01)
+        result, = self.fetch_all(fetcher, [f"{self.server.address}{path}"])
+        self.assertIsInstance(result, FetchError)
+        self.assertEqual(self.server.requests.count(path), 3)
+
+    def test_client_errors_are_not_retried(self):
+        fetcher = AsyncFetcher(requests_per_second=0, retries=3, backoff=0.01)
+        self.fetch_all(fetcher, [f"{self.server.address}/konj/unbekannt.html"])
+        self.assertEqual(self.server.requests.count("/konj/unbekannt.html"), 1)
+
+    def test_timeout(self):
+        path = "/konj/amare.html"
+        self.server.delays[path] = 1.5
+        fetcher = AsyncFetcher(requests_per_second=0, retries=1, backoff=0.01, timeout=0.2)
+        start = time.monotonic()
+        result, = self.fetch_all(fetcher, [f"{self.server.address}{path}"])
+        self.assertIsInstance(result, FetchError)
+        self.assertEqual(self.server.requests.count(path), 2)
+        self.assertLess(time.monotonic() - start, 1.5)
+
+
+class ScraperStandInTest(StandInTest):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.storage = StorageService(os.path.join(directory.name, "verbs.db"), legacy_path=None)
+        self.addCleanup(self.storage.close)
+        self.scraper = VerbenScraper(base_address=self.server.base_address,
+                                     cache_path=os.path.join(directory.name, "cache.db"), storage=self.storage)
+
+    def test_get_data_follows_search_page(self):
+        self.assertEqual(self.scraper.get_data("amare"), golden("amare"))
+        self.assertEqual(self.server.requests, ["/lateinwoerterbuch/amare-uebersetzung.html", "/konj/amare.html"])
+
+    def test_import_reports_every_verb(self):
+        self.server.delay = 0.05
+        self.server.script("/konj/amare.html", 503)
+        progress = ImportProgress()
+        self.scraper.assert_data_contains(["amare", "amor"], joining=False, progress=progress)
+        events = list(progress)
+        self.assertEqual((events[-1].done, events[-1].total), (2, 2))
+        self.assertEqual(progress.succeeded, ["amare"])
+        self.assertEqual(progress.failures, {"amor": "nicht gefunden"})
+        self.assertEqual(self.scraper.data["amare"].to_dict(), golden("amare")["amare"])
+
+    def test_resolved_url_skips_search_page(self):
+        self.scraper.get_data("amare")
+        self.server.requests.clear()
+        self.scraper.cache.clear()
+        self.scraper.get_data("amare")
+        self.assertEqual(self.server.requests, ["/konj/amare.html"])
+
+
+if __name__ == '__main__':
+    unittest.main()
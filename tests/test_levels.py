@@ -0,0 +1,97 @@
+"""
+Tests of the level progression: the default LevelCurve has to reproduce the ladder the app used before (run from
+the repository root with python -m pytest or python -m unittest discover tests)
+"""
+import unittest
+
+from levels import LevelCurve, LevelState
+
+
+def ladder_answer(level: int, streak: int) -> tuple:
+    """
+    :param streak: Streak after the answer
+    :return: (level, streak) after the answer as determined by the former determine_level of the app
+    """
+    if streak > -2:
+        for below, needed in ((1, 1), (3, 2), (5, 3), (8, 5), (10, 6), (13, 8)):
+            if level < below:
+                break
+        else:
+            needed = 9
+        return (level + 1, 0) if streak > needed else (level, streak)
+    if level:
+        level -= 1
+        for below, new_streak in ((1, 1), (3, 2), (5, 3), (8, 5), (10, 6), (13, 8)):
+            if level < below:
+                return level, new_streak
+        return level, 9
+    return level, streak
+
+
+def ladder_delay(level: int) -> float:
+    """
+    :return: The delay factor of level as determined by the former get_level_increase of the app
+    """
+    return {0: 1.5, 1: 1.2, 2: 1.1, 3: 1, 4: 0.95, 5: 0.9, 6: 0.85, 7: 0.8, 8: 0.75, 9: 0.7, 10: 0.65, 11: 0.6,
+            12: 0.55}.get(level, 1) if level < 13 else 0.5
+
+
+class DefaultCurveTest(unittest.TestCase):
+    def setUp(self):
+        self.curve = LevelCurve()
+
+    def test_matches_the_former_ladder(self):
+        for level in range(20):
+            for streak in range(-1, self.curve.threshold(level)):
+                for correct in (True, False):
+                    if not level and streak + (1 if correct else -1) <= self.curve.demotion_streak:
+                        continue  # The documented difference at level 0, see test_level_zero_is_clamped
+                    with self.subTest(level=level, streak=streak, correct=correct):
+                        expected = ladder_answer(level, streak + (1 if correct else -1))
+                        state = self.curve.answer(level, streak, correct)
+                        self.assertEqual((state.level, state.streak), expected)
+                        self.assertEqual(state.delay_factor, ladder_delay(state.level))
+
+    def test_delay_factors(self):
+        for level in range(20):
+            self.assertEqual(self.curve.delay_factor(level), ladder_delay(level))
+
+    def test_promotion_and_demotion(self):
+        self.assertEqual(self.curve.answer(4, 3, True), LevelState(5, 0, 0.9))
+        # Dropping a level continues just below the threshold of the new level
+        self.assertEqual(self.curve.answer(5, -1, False), LevelState(4, 3, 0.95))
+        self.assertEqual(self.curve.answer(1, -1, False), LevelState(0, 1, 1.5))
+
+    def test_level_zero_is_clamped(self):
+        # The former ladder let the streak fall further at level 0, the curve keeps it just above the demotion streak
+        state = self.curve.answer(0, -1, False)
+        self.assertEqual(state, LevelState(0, -1, 1.5))
+        self.assertEqual(self.curve.answer(*state[:2], False), state)
+        self.assertEqual(state.label(), "Level: 0-0")
+
+
+class CustomCurveTest(unittest.TestCase):
+    def test_from_options(self):
+        curve = LevelCurve.from_options({"bounds": [2], "thresholds": [1, 2], "delay_factors": [1, 0.5],
+                                         "demotion_streak": -1})
+        self.assertEqual(curve.answer(0, 0, True), LevelState(1, 0, 0.5))
+        self.assertEqual(curve.answer(2, 1, True), LevelState(3, 0, 0.5))
+        self.assertEqual(curve.answer(3, 0, False), LevelState(2, 1, 0.5))
+        self.assertEqual(LevelCurve.from_options(None).thresholds, LevelCurve().thresholds)
+
+    def test_invalid_curves(self):
+        for options in ({"thresholds": [2, 3]}, {"bounds": [3, 1], "thresholds": [1, 2, 3]},
+                        {"bounds": [0], "thresholds": [1, 2]}, {"bounds": [2, 2], "thresholds": [1, 2, 3]},
+                        {"delay_factors": []}, {"demotion_streak": 0}, {"thresholds": [2, 3, 0, 6, 7, 9, 10]},
+                        {"bounds": ["a"], "thresholds": [1, 2]}):
+            with self.subTest(options=options), self.assertRaises(ValueError):
+                LevelCurve.from_options(options)
+
+    def test_malformed_options(self):
+        for options in ([1, 2], {"unknown": 1}, {"bounds": 3}):
+            with self.subTest(options=options), self.assertRaises(TypeError):
+                LevelCurve.from_options(options)
+
+
+if __name__ == '__main__':
+    unittest.main()
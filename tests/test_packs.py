@@ -0,0 +1,99 @@
+"""
+Tests of the vocabulary packs: validation of the conjugation data and importing packs into the VerbenScraper (run
+from the repository root with python -m pytest or python -m unittest discover tests)
+"""
+import gzip
+import json
+import os
+import tempfile
+import unittest
+
+from packs import PACK_FORMAT, PACK_VERSION, validate_paradigm, write_pack
+from progress import QUEUED, ImportProgress
+from Scraper import VerbenScraper
+from storage import StorageService
+
+PAGES = os.path.join(os.path.dirname(__file__), "pages")
+
+
+def golden(name: str) -> dict:
+    with open(os.path.join(PAGES, f"{name}.json"), "r", encoding="utf-8") as file:
+        return json.load(file)[name]
+
+
+class ValidateParadigmTest(unittest.TestCase):
+    def test_scraped_data_is_valid(self):
+        validate_paradigm(golden("amare"))
+        validate_paradigm(golden("posse"))
+
+    def test_invalid_data(self):
+        for paradigm in ({}, [], "amo", {"Bogus": {"x": "y"}}, {"Präsens Indikativ": "amo"},
+                         {"Präsens Indikativ": {"Aktiv": {}}}, {"Präsens Indikativ": {"Aktiv": {"": "amo"}}},
+                         {"Präsens Indikativ": {"Aktiv": {"1. Person Singular": 1}}},
+                         {**golden("amare"), "Bogus": {"x": "y"}}):
+            with self.subTest(paradigm=paradigm), self.assertRaises(ValueError):
+                validate_paradigm(paradigm)
+
+
+class ImportPackTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.storage = StorageService(os.path.join(self.directory, "verbs.db"), legacy_path=None)
+        self.addCleanup(self.storage.close)
+        self.scraper = VerbenScraper(cache_path=os.path.join(self.directory, "cache.db"), offline=True,
+                                     storage=self.storage)
+
+    def write_lines(self, records: list, count: int = None) -> str:
+        path = os.path.join(self.directory, "pack.lvpack")
+        with gzip.open(path, "wt", encoding="utf-8") as pack:
+            pack.write(json.dumps({"format": PACK_FORMAT, "version": PACK_VERSION,
+                                   "count": len(records) if count is None else count}) + "\n")
+            for record in records:
+                pack.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return path
+
+    def test_round_trip(self):
+        path = os.path.join(self.directory, "pack.lvpack")
+        self.assertEqual(write_pack(path, {"amare": golden("amare"), "posse": golden("posse")}, ["amare", "posse"]), 2)
+        self.assertEqual(self.scraper.import_pack(path), ["amare", "posse"])
+        self.assertEqual(self.scraper.data["amare"].to_dict(), golden("amare"))
+        self.assertEqual(self.scraper.data["posse"].to_dict(), golden("posse"))
+
+    def test_unknown_tenses_are_rejected(self):
+        progress = ImportProgress()
+        path = self.write_lines([{"name": "foo", "paradigm": {"Bogus": {"x": "y"}}},
+                                 {"name": "amare", "paradigm": golden("amare")}])
+        self.assertEqual(self.scraper.import_pack(path, progress=progress), ["amare"])
+        self.assertEqual(progress.failures, {"foo": "ungültig"})
+        self.assertNotIn("foo", self.scraper.data)
+        self.assertEqual(self.scraper.get_random_question(exclude_tense=[], scheduled=False).slot[0], "amare")
+
+    def test_total_is_known_up_front(self):
+        progress = ImportProgress()
+        path = self.write_lines([{"name": name, "paradigm": golden("amare")} for name in ("a", "b", "c")])
+        self.scraper.import_pack(path, progress=progress)
+        events = list(progress)
+        self.assertEqual({event.total for event in events}, {3})
+        self.assertEqual([event.verb for event in events if event.kind == QUEUED], ["a", "b", "c"])
+
+    def test_total_is_corrected_if_the_header_is_wrong(self):
+        for count in (1, 5):
+            with self.subTest(count=count):
+                progress = ImportProgress()
+                self.scraper.import_pack(self.write_lines([{"name": name, "paradigm": golden("amare")}
+                                                           for name in ("a", "b")], count), progress=progress)
+                last = list(progress)[-1]
+                self.assertEqual((last.done, last.total), (2, 2))
+
+    def test_no_pack(self):
+        path = os.path.join(self.directory, "data.json")
+        with gzip.open(path, "wt", encoding="utf-8") as file:
+            file.write("{}\n")
+        with self.assertRaises(ValueError):
+            self.scraper.import_pack(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
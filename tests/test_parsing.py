@@ -0,0 +1,78 @@
+"""
+Golden-file tests of the parser backends: every available backend has to produce the content of <page>.json for
+the saved pages in tests/pages (run from the repository root with python -m pytest or python -m unittest discover tests)
+"""
+import glob
+import json
+import os
+import unittest
+
+from parsing import PARSERS, LxmlParser, SoupParser, compare_backends, get_parser, lxml
+
+PAGES = os.path.join(os.path.dirname(__file__), "pages")
+BASE_ADDRESS = "https://www.frag-caesar.de/lateinwoerterbuch/"
+
+
+def read(name: str):
+    with open(os.path.join(PAGES, name), "r", encoding="utf-8") as file:
+        return json.load(file) if name.endswith(".json") else file.read()
+
+
+def backends() -> list:
+    return [get_parser(name) for name in PARSERS if name != LxmlParser.name or lxml is not None]
+
+
+class GoldenPagesTest(unittest.TestCase):
+    def assert_golden(self, page: str, **kwargs):
+        golden = read(f"{page}.json")
+        for backend in backends():
+            with self.subTest(backend=backend.name):
+                self.assertEqual(backend.parse_page(read(f"{page}.html"), BASE_ADDRESS, **kwargs), golden)
+
+    def test_conjugation_page(self):
+        self.assert_golden("amare")
+
+    def test_irregular_page_without_supina_forms(self):
+        self.assert_golden("posse")
+        self.assertEqual(read("posse.json")["posse"]["Supina"], {"Supin I": "existiert nicht",
+                                                                  "Supin II": "existiert nicht"})
+
+    def test_search_page_links_to_conjugation_page(self):
+        self.assert_golden("amare-uebersetzung")
+        self.assertEqual(read("amare-uebersetzung.json"), "https://www.frag-caesar.de/konj/amare.html")
+
+    def test_not_found_page(self):
+        self.assert_golden("nicht-gefunden")
+        self.assertEqual(read("nicht-gefunden.json"), {})
+
+    def test_excluded_supina(self):
+        for page in ("amare", "posse"):
+            golden = read(f"{page}.json")
+            for name in golden.values():
+                del name["Supina"]
+            for backend in backends():
+                with self.subTest(page=page, backend=backend.name):
+                    self.assertEqual(backend.parse_page(read(f"{page}.html"), BASE_ADDRESS, exclude_supina=True),
+                                     golden)
+
+    def test_search_page_is_not_followed(self):
+        for backend in backends():
+            with self.subTest(backend=backend.name):
+                self.assertEqual(backend.parse_page(read("amare-uebersetzung.html"), BASE_ADDRESS, follow=False), {})
+
+    def test_compare_backends(self):
+        self.assertTrue(compare_backends(sorted(glob.glob(os.path.join(PAGES, "*.html")))))
+
+    @unittest.skipIf(lxml is None, "lxml is not installed")
+    def test_lxml_only_keeps_the_extracted_subtrees(self):
+        document = LxmlParser().document(read("amare.html"))
+        self.assertEqual(document.xpath("//div[@class='footer'] | //div[@class='header'] | //head"), [])
+        self.assertEqual(len(document.xpath("//div[@id='vtab-1']")), 1)
+
+    def test_default_backend(self):
+        self.assertIsInstance(get_parser(), SoupParser)
+        self.assertNotIsInstance(get_parser(), LxmlParser)
+
+
+if __name__ == '__main__':
+    unittest.main()
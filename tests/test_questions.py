@@ -0,0 +1,137 @@
+"""
+Tests of the question sampling and the prepared question queue (run from the repository root with python -m pytest
+or python -m unittest discover tests)
+"""
+import json
+import os
+import random
+import threading
+import time
+import unittest
+
+from questions import FenwickTree, QuestionIndex, QuestionQueue
+
+DATA = os.path.join(os.path.dirname(__file__), os.pardir, "data.json")
+
+
+def float_weights(rng: random.Random) -> list:
+    """
+    :return: Custom weights for all 16 tenses that are no exact binary fractions, so the sums of the samplers keep
+             rounding residuals after updates
+    """
+    return [rng.uniform(0.1, 7) for _ in range(16)]
+
+
+class FenwickTreeTest(unittest.TestCase):
+    def test_zeroed_weights_leave_no_mass(self):
+        for seed in range(20):
+            rng = random.Random(seed)
+            tree = FenwickTree([rng.uniform(0.1, 7) for _ in range(100)])
+            for i in rng.sample(range(100), 100):
+                tree.set(i, 0.0)
+            with self.subTest(seed=seed):
+                self.assertEqual(tree.total, 0.0)
+                self.assertRaises(ValueError, tree.draw)
+
+    def test_never_draws_a_weight_of_zero(self):
+        rng = random.Random(0)
+        tree = FenwickTree([rng.uniform(0.1, 7) for _ in range(100)])
+        kept = set(rng.sample(range(100), 3))
+        for i in range(100):
+            if i not in kept:
+                tree.set(i, 0.0)
+        self.assertLessEqual({tree.draw() for _ in range(2000)}, kept)
+
+
+class SamplingTest(unittest.TestCase):
+    def setUp(self):
+        with open(DATA, "r", encoding="utf-8") as file:
+            self.data = json.load(file)["data"]
+
+    def mask_one_by_one(self, rng: random.Random, weights: list, keep: int) -> tuple:
+        """
+        :return: (index, verbs to exclude): all but keep verbs, all of them except the last one already excluded one at
+                 a time, so every exclusion is a float delta update of the sampler's Fenwick tree
+        """
+        index = QuestionIndex()
+        index.update(self.data)
+        index.sample(exclude_tense=[], weights=weights)
+        verbs = list(self.data)
+        rng.shuffle(verbs)
+        for count in range(1, len(verbs) - keep):
+            index.sample(exclude_tense=[], weights=weights, exclude_choice=verbs[:count])
+        return index, verbs[:len(verbs) - keep]
+
+    def test_every_verb_masked_raises(self):
+        # With float custom weights, masking every verb used to leave a residual total, so a question of an
+        # excluded verb was still returned
+        for seed in range(60):
+            rng = random.Random(seed)
+            weights = float_weights(rng)
+            index, excluded = self.mask_one_by_one(rng, weights, 0)
+            with self.subTest(seed=seed), self.assertRaises(ValueError):
+                index.sample(exclude_tense=[], weights=weights, exclude_choice=excluded)
+
+    def test_masked_verbs_are_never_drawn(self):
+        for seed in range(10):
+            rng = random.Random(seed)
+            weights = float_weights(rng)
+            index, excluded = self.mask_one_by_one(rng, weights, 1)
+            with self.subTest(seed=seed):
+                drawn = {index.sample(exclude_tense=[], weights=weights, exclude_choice=excluded).slot[0]
+                         for _ in range(200)}
+                self.assertEqual(drawn, set(self.data) - set(excluded))
+
+
+class QuestionQueueTest(unittest.TestCase):
+    def make_queue(self, producer, size: int = 2) -> QuestionQueue:
+        queue = QuestionQueue(producer, size=size)
+        self.addCleanup(queue.stop)
+        return queue
+
+    def test_pop_never_runs_the_producer_on_the_calling_thread(self):
+        threads, release = [], threading.Event()
+
+        def producer(**_):
+            threads.append(threading.get_ident())
+            release.wait()
+            return "frage", "antwort"
+
+        queue = self.make_queue(producer)
+        queue.configure(weights="relevant")
+        start = time.monotonic()
+        self.assertIsNone(queue.pop(timeout=0.05))
+        self.assertLess(time.monotonic() - start, 1)
+        release.set()
+        self.assertEqual(queue.pop(timeout=2), ("frage", "antwort"))
+        self.assertNotIn(threading.get_ident(), threads)
+
+    def test_producer_errors_are_kept_until_invalidated(self):
+        calls = []
+
+        def producer(**_):
+            calls.append(None)
+            raise ValueError("No question is left to ask")
+
+        queue = self.make_queue(producer)
+        queue.configure(weights="relevant")
+        self.assertIsNone(queue.pop(timeout=2))
+        self.assertIsInstance(queue.error, ValueError)
+        self.assertIsNone(queue.pop(timeout=0.05))
+        self.assertEqual(len(calls), 1)
+        queue.invalidate()
+        self.assertIsNone(queue.pop(timeout=2))
+        self.assertEqual(len(calls), 2)
+
+    def test_invalidate_drops_prepared_questions(self):
+        generation = [0]
+        queue = self.make_queue(lambda **_: ("frage", generation[0]))
+        queue.configure(weights="relevant")
+        self.assertEqual(queue.pop(timeout=2)[1], 0)
+        generation[0] = 1
+        queue.invalidate()
+        self.assertEqual(queue.pop(timeout=2)[1], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
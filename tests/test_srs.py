@@ -0,0 +1,237 @@
+"""
+Tests of the SM-2 review states and the SpacedRepetition scheduler, driven by a fake clock (run from the repository
+root with python -m pytest or python -m unittest discover tests)
+"""
+import json
+import os
+import tempfile
+import unittest
+
+from srs import DAY, GRADE_CORRECT, GRADE_HARD, GRADE_WRONG, LEASE, RELEARN_DELAY, ReviewState, SpacedRepetition, \
+    decode_slot, encode_slot
+from Scraper import VerbenScraper
+from storage import StorageService
+
+PAGES = os.path.join(os.path.dirname(__file__), "pages")
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class FakeStorage:
+    def __init__(self, reviews: dict = None):
+        self.reviews = dict(reviews or {})
+
+    def load_reviews(self) -> dict:
+        return dict(self.reviews)
+
+    def put_reviews(self, changed: dict) -> None:
+        for slot, state in changed.items():
+            if state is None:
+                self.reviews.pop(slot, None)
+            else:
+                self.reviews[slot] = state
+
+
+def slot(verb: str = "amare", tense: str = "Präsens Indikativ", *path: str) -> tuple:
+    return verb, tense, path or ("Aktiv", "1. Person Singular")
+
+
+class ReviewStateTest(unittest.TestCase):
+    def test_interval_growth(self):
+        state = ReviewState()
+        state = state.review(GRADE_CORRECT, 0)
+        self.assertEqual((state.interval, state.repetitions, state.due), (DAY, 1, DAY))
+        state = state.review(GRADE_CORRECT, DAY)
+        self.assertEqual((state.interval, state.repetitions, state.due), (6 * DAY, 2, 7 * DAY))
+        previous, state = state, state.review(GRADE_CORRECT, 7 * DAY)
+        self.assertAlmostEqual(state.interval, previous.interval * state.ease)
+        self.assertEqual(state.repetitions, 3)
+
+    def test_ease(self):
+        self.assertAlmostEqual(ReviewState().review(5, 0).ease, 2.6)
+        self.assertAlmostEqual(ReviewState().review(GRADE_CORRECT, 0).ease, 2.5)
+        self.assertAlmostEqual(ReviewState().review(GRADE_HARD, 0).ease, 2.36)
+        state = ReviewState()
+        for _ in range(20):
+            state = state.review(GRADE_WRONG, 0)
+        self.assertEqual(state.ease, 1.3)
+
+    def test_lapse(self):
+        state = ReviewState().review(GRADE_CORRECT, 0).review(GRADE_CORRECT, DAY)
+        state = state.review(GRADE_WRONG, 2 * DAY)
+        self.assertEqual((state.interval, state.repetitions, state.lapses, state.due),
+                         (RELEARN_DELAY, 0, 1, 2 * DAY + RELEARN_DELAY))
+        # After a lapse the intervals start over
+        self.assertEqual(state.review(GRADE_CORRECT, 3 * DAY).interval, DAY)
+
+    def test_slot_encoding(self):
+        self.assertEqual(decode_slot(encode_slot(slot())), slot())
+        self.assertEqual(decode_slot(encode_slot(("esse", "Supina", ()))), ("esse", "Supina", ()))
+
+
+class SpacedRepetitionTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.storage = FakeStorage()
+        self.scheduler = SpacedRepetition(self.storage, clock=self.clock)
+
+    def due_slots(self, build=lambda slot: slot, excluded=None) -> list:
+        found = []
+        while (question := self.scheduler.next_due(build, excluded)) is not None:
+            found.append(question)
+        return found
+
+    def test_nothing_is_due_before_its_time(self):
+        self.scheduler.record(slot(), GRADE_WRONG)
+        self.assertIsNone(self.scheduler.next_due(lambda slot: slot))
+        self.clock.advance(RELEARN_DELAY)
+        self.assertEqual(self.scheduler.next_due(lambda slot: slot), slot())
+
+    def test_due_order_and_lazy_deletion(self):
+        first, second, third = slot("amare"), slot("monere"), slot("audire")
+        self.scheduler.record(second, GRADE_WRONG)
+        self.clock.advance(1)
+        self.scheduler.record(first, GRADE_WRONG)
+        self.scheduler.record(third, GRADE_WRONG)
+        self.clock.advance(1)
+        # Answering second again leaves its first heap entry behind, it must not be returned for it
+        self.scheduler.record(second, GRADE_WRONG)
+        self.assertEqual(len(self.scheduler.heap), 4)
+        self.clock.advance(RELEARN_DELAY)
+        self.assertEqual(self.due_slots(), [first, third, second])
+
+    def test_lease(self):
+        self.scheduler.record(slot(), GRADE_WRONG)
+        self.clock.advance(RELEARN_DELAY)
+        self.assertEqual(self.scheduler.next_due(lambda slot: slot), slot())
+        # Handed out, but not answered: held back until the lease expires
+        self.assertIsNone(self.scheduler.next_due(lambda slot: slot))
+        self.clock.advance(LEASE)
+        self.assertEqual(self.scheduler.next_due(lambda slot: slot), slot())
+
+    def test_answer_ends_the_lease(self):
+        self.scheduler.record(slot(), GRADE_WRONG)
+        self.clock.advance(RELEARN_DELAY)
+        self.scheduler.next_due(lambda slot: slot)
+        self.scheduler.record(slot(), GRADE_CORRECT)
+        self.clock.advance(LEASE)
+        self.assertIsNone(self.scheduler.next_due(lambda slot: slot))
+        self.clock.advance(DAY)
+        self.assertEqual(self.scheduler.next_due(lambda slot: slot), slot())
+
+    def test_release(self):
+        slots = [slot("amare"), slot("monere")]
+        for answered in slots:
+            self.scheduler.record(answered, GRADE_WRONG)
+        self.clock.advance(RELEARN_DELAY)
+        self.assertEqual(self.due_slots(), slots)
+        self.scheduler.release(slots)
+        self.assertEqual(self.due_slots(), slots)
+        # Releasing a slot that is not leased (e.g. answered in the meantime) changes nothing
+        self.scheduler.record(slots[0], GRADE_CORRECT)
+        self.scheduler.release(slots[:1])
+        self.assertEqual(self.due_slots(), [])
+
+    def test_park_and_unpark(self):
+        excluded, asked = slot("amare"), slot("monere")
+        self.scheduler.record(excluded, GRADE_WRONG)
+        self.scheduler.record(asked, GRADE_WRONG)
+        self.clock.advance(RELEARN_DELAY)
+        checked = []
+
+        def is_excluded(slot):
+            checked.append(slot)
+            return slot[0] == "amare"
+
+        self.assertEqual(self.due_slots(excluded=is_excluded), [asked])
+        self.assertIn(excluded, self.scheduler.parked)
+        # A parked slot is not checked again until the options change
+        self.clock.advance(LEASE)
+        checked.clear()
+        self.assertEqual(self.due_slots(excluded=is_excluded), [asked])
+        self.assertNotIn(excluded, checked)
+        self.scheduler.unpark()
+        self.clock.advance(LEASE)
+        self.assertEqual(self.due_slots(), [excluded, asked])
+
+    def test_slots_that_cannot_be_built_are_parked(self):
+        self.scheduler.record(slot(), GRADE_WRONG)
+        self.clock.advance(RELEARN_DELAY)
+        self.assertIsNone(self.scheduler.next_due(lambda slot: None))
+        self.assertIn(slot(), self.scheduler.parked)
+        self.assertNotIn(slot(), self.scheduler.leases)
+        # Answering a parked slot schedules it again
+        self.scheduler.record(slot(), GRADE_WRONG)
+        self.assertNotIn(slot(), self.scheduler.parked)
+        self.clock.advance(RELEARN_DELAY)
+        self.assertEqual(self.scheduler.next_due(lambda slot: slot), slot())
+
+    def test_forget(self):
+        kept, forgotten = slot("monere"), slot("amare")
+        other_tense = slot("amare", "Futur I")
+        for answered in (kept, forgotten, other_tense):
+            self.scheduler.record(answered, GRADE_WRONG)
+        self.clock.advance(RELEARN_DELAY)
+        self.scheduler.next_due(lambda slot: None if slot == other_tense else slot, lambda slot: slot == kept)
+        self.scheduler.forget("amare")
+        self.assertEqual(len(self.scheduler), 1)
+        self.assertNotIn(forgotten, self.scheduler.leases)
+        self.assertNotIn(other_tense, self.scheduler.parked)
+        self.assertEqual(list(self.storage.reviews), [encode_slot(kept)])
+        self.scheduler.unpark()
+        self.clock.advance(LEASE)
+        self.assertEqual(self.due_slots(), [kept])
+
+    def test_load_keeps_recorded_states(self):
+        stored = ReviewState().review(GRADE_WRONG, self.clock.now - RELEARN_DELAY)
+        self.storage.reviews = {encode_slot(slot("amare")): tuple(stored),
+                                encode_slot(slot("monere")): tuple(stored)}
+        recorded = self.scheduler.record(slot("monere"), GRADE_CORRECT)
+        self.scheduler.load()
+        self.assertEqual(len(self.scheduler), 2)
+        self.assertEqual(self.scheduler.states[slot("monere")], recorded)
+        self.assertEqual(self.due_slots(), [slot("amare")])
+
+
+class ScraperSchedulingTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.storage = StorageService(os.path.join(directory.name, "verbs.db"), legacy_path=None)
+        self.addCleanup(self.storage.close)
+        self.scraper = VerbenScraper(cache_path=os.path.join(directory.name, "cache.db"), offline=True,
+                                     storage=self.storage)
+        for verb in ("amare", "posse"):
+            with open(os.path.join(PAGES, f"{verb}.json"), "r", encoding="utf-8") as file:
+                self.scraper.add_data(verb, json.load(file))
+        self.clock = self.scraper.scheduler.clock = FakeClock()
+
+    def test_due_slots_excluded_by_the_options_come_back_when_they_change(self):
+        question = self.scraper.get_random_question(exclude_choice=["posse"], scheduled=False)
+        self.scraper.record_answer(question, GRADE_WRONG)
+        self.clock.advance(RELEARN_DELAY)
+        for _ in range(5):
+            self.assertEqual(self.scraper.get_random_question(exclude_choice=["amare"]).slot[0], "posse")
+        self.assertIn(question.slot, self.scraper.scheduler.parked)
+        self.assertEqual(self.scraper.get_random_question().slot, question.slot)
+
+    def test_released_questions_are_due_again(self):
+        question = self.scraper.get_random_question(scheduled=False)
+        self.scraper.record_answer(question, GRADE_WRONG)
+        self.clock.advance(RELEARN_DELAY)
+        self.assertEqual(self.scraper.get_random_question().slot, question.slot)
+        self.scraper.release_questions([question])
+        self.assertEqual(self.scraper.get_random_question().slot, question.slot)
+
+
+if __name__ == '__main__':
+    unittest.main()